@@ -0,0 +1,70 @@
+"""
+Measures the cost of creating one `GuildWars2Client` per API key.
+
+Clients create their API objects on first access. The "eager" rows touch
+ every API object right after creating a client, which is what creating a
+ client used to cost when every object was copied onto it up front:
+
+    python benchmarks/clients.py --clients 2000
+"""
+
+import argparse
+import gc
+import pathlib
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from gw2api import GuildWars2Client  # noqa: E402
+from gw2api.objects import api_objects  # noqa: E402
+
+
+def build_clients(count, eager, http_adapter):
+    clients = []
+    for i in range(count):
+        client = GuildWars2Client(api_key=f'api-key-{i}', http_adapter=http_adapter)
+        if eager:
+            for name in api_objects(client.version):
+                getattr(client, name)
+        clients.append(client)
+    return clients
+
+
+def measure(count, eager, http_adapter):
+    """Returns the clients created per second, and the bytes allocated per client"""
+    gc.collect()
+    start = time.perf_counter()
+    clients = build_clients(count, eager, http_adapter)
+    seconds = time.perf_counter() - start
+    del clients
+
+    gc.collect()
+    tracemalloc.start()
+    clients = build_clients(count, eager, http_adapter)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del clients
+
+    return count / seconds, allocated / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=1000, help='Number of clients to create')
+    args = parser.parse_args()
+
+    api_objects('v2')  # Importing the API objects is a one-off cost, keep it out of the measures
+    shared_adapter = GuildWars2Client.build_http_adapter()
+
+    print('%-32s %14s %16s' % ('mode', 'clients/sec', 'bytes/client'))
+    for eager in (True, False):
+        for label, http_adapter in (('own adapter', None), ('shared adapter', shared_adapter)):
+            per_second, per_client = measure(args.clients, eager, http_adapter)
+            mode = '%s, %s' % ('eager' if eager else 'lazy', label)
+            print('%-32s %14.0f %16.0f' % (mode, per_second, per_client))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares the throughput of the JSON decoders of `gw2api.decoders`.
+
+The payloads of `test/mocks` are scaled up to the size of bulk responses by
+ repeating their records, then decoded by every installed decoder:
+
+    python benchmarks/decode.py --size 16
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from gw2api.decoders import available_decoders, get_decoder  # noqa: E402
+
+
+MOCKS_PATH = pathlib.Path(__file__).resolve().parent.parent / 'test' / 'mocks'
+
+
+def scale_payload(payload, size):
+    """Repeats the records of a payload until its encoded form reaches `size` bytes"""
+    records = payload if isinstance(payload, list) else [payload]
+    record_size = len(json.dumps(records).encode('utf-8')) / len(records)
+    copies = max(1, int(size / record_size))
+    return json.dumps([records[i % len(records)] for i in range(copies)]).encode('utf-8')
+
+
+def measure(decode, body, repeat):
+    """Returns the best time of `repeat` decodes of `body`"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=float, default=8, help='Size of each scaled payload, in MiB')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of decodes per payload, the best is kept')
+    parser.add_argument('--mocks', nargs='*', help='Stems of the mock files to use, defaults to all of them')
+    args = parser.parse_args()
+
+    paths = [MOCKS_PATH / f'{stem}.json' for stem in args.mocks] if args.mocks else sorted(MOCKS_PATH.glob('*.json'))
+    decoders = {name: get_decoder(name) for name in available_decoders()}
+
+    print('%-50s %10s' % ('payload', 'MiB') + ''.join('%12s' % name for name in decoders) + '   (MiB/s)')
+
+    totals = dict.fromkeys(decoders, 0.0)
+    total_size = 0
+    for path in paths:
+        body = scale_payload(json.loads(path.read_text(encoding='utf-8')), args.size * 2 ** 20)
+        size = len(body) / 2 ** 20
+        total_size += size
+
+        row = '%-50s %10.1f' % (path.stem, size)
+        for name, decode in decoders.items():
+            seconds = measure(decode, body, args.repeat)
+            totals[name] += seconds
+            row += '%12.0f' % (size / seconds)
+        print(row)
+
+    print('%-50s %10.1f' % ('overall', total_size) + ''.join('%12.0f' % (total_size / totals[name])
+                                                             for name in decoders))
+
+
+if __name__ == '__main__':
+    main()
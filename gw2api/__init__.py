@@ -1,5 +1,53 @@
 import copy
+import importlib
 import requests
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+
+from gw2api.cache import PersistentCache, ResponseCache
+from gw2api.continents import ContinentsCrawler
+from gw2api.decoders import get_decoder
+from gw2api.guildlog import GuildLogFollower
+from gw2api.loader import BatchLoader, RecordNotFound
+from gw2api.objects import api_objects
+from gw2api.ratelimit import CompositeRateLimiter, FileTokenBucket, TokenBucket
+from gw2api.retry import RetryPolicy
+from gw2api.session import GuildWars2Session
+from gw2api.singleflight import SingleFlight
+from gw2api.snapshot import AccountSnapshot, take_account_snapshot
+from gw2api.transactions import TransactionCheckpoints
+from gw2api.watcher import BuildWatcher
+
+__all__ = [
+    'AccountSnapshot', 'AsyncGuildWars2Client', 'BatchLoader', 'BuildWatcher', 'ClientPool', 'CompositeRateLimiter',
+    'ContinentsCrawler', 'FileTokenBucket', 'GuildLogFollower', 'GuildWars2Client', 'GuildWars2Session', 'OrderBook',
+    'PersistentCache', 'PriceHistory', 'PriceSweep', 'RecordNotFound', 'ResponseCache', 'RetryPolicy', 'SingleFlight',
+    'SpatialIndex', 'TokenBucket', 'TransactionCheckpoints', 'api_objects', 'get_decoder', 'take_account_snapshot',
+]
+
+# Loaded on first access, as they import optional dependencies (aiohttp, NumPy)
+_LAZY_ATTRIBUTES = {
+    'AsyncGuildWars2Client': 'gw2api.aio',
+    'ClientPool': 'gw2api.pool',
+    'OrderBook': 'gw2api.commerce',
+    'PriceHistory': 'gw2api.history',
+    'PriceSweep': 'gw2api.commerce',
+    'SpatialIndex': 'gw2api.spatial',
+}
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
 
 
 class GuildWars2Client:
@@ -10,7 +58,50 @@ class GuildWars2Client:
     BASE_URL = 'https://api.guildwars2.com'
 
     def __init__(self, base_url=BASE_URL, version=VERSION, lang=LANG,
-                 api_key=None, proxy=None, verify_ssl=True):
+                 api_key=None, proxy=None, verify_ssl=True,
+                 pool_connections=DEFAULT_POOLSIZE, pool_maxsize=DEFAULT_POOLSIZE,
+                 pool_block=DEFAULT_POOLBLOCK, keep_alive=True, http_adapter=None,
+                 cache=None, disk_cache=None, rate_limit=None, burst=None, rate_limiter=None,
+                 retry=None, coalesce=False, json_decoder=None):
+        """
+        :param pool_connections: Number of host connection pools to cache
+        :param pool_maxsize: Maximum number of connections kept alive per host,
+                              should be at least the number of threads sending
+                              requests through this client
+        :param pool_block: Whether to wait for a free connection once `pool_maxsize`
+                            connections are in use, rather than opening (and then
+                            discarding) an extra one
+        :param keep_alive: Whether to keep connections open between requests
+        :param http_adapter: An `HTTPAdapter` to send requests through instead of
+                              building one from the pool settings above. Passing
+                              the same adapter to several clients (i.e. one per
+                              API key) makes them share a single connection pool,
+                              see `GuildWars2Client.build_http_adapter`
+        :param cache: A `ResponseCache` to serve repeated requests from. It may
+                       be shared between clients, as entries are keyed by API
+                       key and language
+        :param disk_cache: A `PersistentCache` static endpoints (i.e. items,
+                            recipes) are read through, surviving restarts
+        :param rate_limit: Maximum sustained number of requests per second
+        :param burst: Number of requests that may be sent at once before
+                       `rate_limit` kicks in, defaults to `rate_limit`
+        :param rate_limiter: A `TokenBucket` to take request tokens from
+                              instead of building one from `rate_limit` and
+                              `burst`. Share it between clients (or use a
+                              `FileTokenBucket` between processes) to limit
+                              them as a whole
+        :param retry: A `RetryPolicy` to retry requests failing with transient
+                       errors (429, 5xx, connection errors) with
+        :param coalesce: Whether concurrent callers sending the same request
+                          (URL, language and API key) should wait on a single
+                          one and share its response. Pass a `SingleFlight`
+                          to coalesce requests across clients
+        :param json_decoder: The JSON decoder of responses, either the name of
+                              one of `gw2api.decoders` ('orjson', 'msgspec',
+                              'simdjson', 'json', or 'auto' for the fastest one
+                              installed) or a callable taking the `bytes` of a
+                              body. Defaults to `requests`' own decoding
+        """
 
         assert version in ('v1', 'v2')
         assert lang in ('en', 'es', 'de', 'fr', 'ko', 'zh')
@@ -21,6 +112,20 @@ class GuildWars2Client:
         self.version = version
         self.base_url = base_url
         self.verify_ssl = verify_ssl
+        self.keep_alive = keep_alive
+        self.cache = cache
+        self.disk_cache = disk_cache
+        self.rate_limiter = rate_limiter
+        if self.rate_limiter is None and rate_limit:
+            self.rate_limiter = TokenBucket(rate_limit, capacity=burst)
+        self.retry = retry
+        self.flights = coalesce if isinstance(coalesce, SingleFlight) else None
+        if self.flights is None and coalesce:
+            self.flights = SingleFlight()
+        self.json_decoder = get_decoder(json_decoder) if isinstance(json_decoder, str) else json_decoder
+        self.http_adapter = http_adapter or self.build_http_adapter(pool_connections=pool_connections,
+                                                                    pool_maxsize=pool_maxsize,
+                                                                    pool_block=pool_block)
 
         if not self.verify_ssl:
             # Disable SSL Warnings in that case to avoid unnecessary verbosity
@@ -30,16 +135,17 @@ class GuildWars2Client:
         GuildWars2Client.VERSION = version
         GuildWars2Client.BASE_URL = base_url
 
-        # This must be done before we build and assign the API objects (below)
-        #  so as to avoid initializing them with a null session
         self.session = self.__build_requests_session()
 
-        # Constructs a list of API Objects to be assigned to this instance
-        self.__build_object_clients()
+        # API objects are created on first access (see `__getattr__`), only
+        #  import them now so that an invalid version fails right away
+        api_objects(self.version)
 
     def __build_requests_session(self):
         """Build Request Session that handles all HTTP requests"""
-        session = requests.Session()
+        session = GuildWars2Session(cache=self.cache, disk_cache=self.disk_cache,
+                                    rate_limiter=self.rate_limiter, retry=self.retry,
+                                    flights=self.flights, json_decoder=self.json_decoder)
 
         # Particularly useful then passing requests through a local proxy
         session.verify = self.verify_ssl
@@ -50,10 +156,16 @@ class GuildWars2Client:
             'Accept-Language': GuildWars2Client.LANG
         })
 
+        if not self.keep_alive:
+            session.headers.update({'Connection': 'close'})
+
         if self.api_key:
             assert isinstance(self.api_key, str)
             session.headers.update({'Authorization': 'Bearer ' + self.api_key})
 
+        session.mount('https://', self.http_adapter)
+        session.mount('http://', self.http_adapter)
+
         if self.proxy:
             # If this hits, the proxy format should be:
             # {
@@ -65,24 +177,57 @@ class GuildWars2Client:
 
         return session
 
-    def __build_object_clients(self):
-        """Creates and assigned API Objects to the class instance"""
-
-        if GuildWars2Client.VERSION == 'v1':
-            from gw2api.objects.api_version_1 import API_OBJECTS
-        elif GuildWars2Client.VERSION == 'v2':
-            from gw2api.objects.api_version_2 import API_OBJECTS
-        else:
-            raise ValueError('Unable to import API Objects, make '
-                             'sure the version passed is valid - ' + GuildWars2Client.VERSION)
-
-        objects = API_OBJECTS
-
-        for object_ in objects:
-            object_ = copy.copy(object_)
-            object_.session = self.session
-            setattr(self, object_.__class__.__name__.lower(), object_)
+    @staticmethod
+    def build_http_adapter(pool_connections=DEFAULT_POOLSIZE, pool_maxsize=DEFAULT_POOLSIZE,
+                           pool_block=DEFAULT_POOLBLOCK):
+        """
+        Builds the `HTTPAdapter` holding the connection pool of a client. Build
+         one yourself to share it between clients:
+
+        >>> adapter = GuildWars2Client.build_http_adapter(pool_maxsize=32, pool_block=True)
+        >>> clients = [GuildWars2Client(api_key=key, http_adapter=adapter) for key in api_keys]
+        """
+        return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+
+    def account_snapshot(self, max_workers=None):
+        """
+        Reads every `Account*` endpoint the API key has permissions for, concurrently.
+
+        The permissions of the key are read from `tokeninfo` first, endpoints
+         requiring others are skipped rather than failing. Endpoints failing
+         for any other reason are reported in the snapshot's `errors`.
+
+        >>> snapshot = client.account_snapshot()
+        >>> snapshot['account/wallet']
+        [{'id': 1, 'value': 1203476}, ...]
+        >>> snapshot.timings['account/bank']
+        0.182
+
+        :param max_workers: Number of requests sent at the same time, defaults
+                             to all of them (make sure `pool_maxsize` is large
+                             enough to keep their connections)
+        :returns: An `AccountSnapshot`
+        """
+        if self.version != 'v2':
+            raise ValueError('Account snapshots require version v2 of the API')
+
+        return take_account_snapshot(self, max_workers=max_workers)
+
+    def __getattr__(self, name):
+        """Creates API objects on first access, rather than every one of them for every client"""
+        try:
+            prototype = api_objects(self.__dict__['version'])[name]
+        except KeyError:
+            raise AttributeError(f'{self.__class__.__name__!r} object has no attribute {name!r}') from None
+
+        object_ = copy.copy(prototype)
+        object_.session = self.session
+        setattr(self, name, object_)
+        return object_
+
+    def __dir__(self):
+        return [*super().__dir__(), *api_objects(self.version)]
 
     def __repr__(self):
         return '<GuildWars2Client %s\nVersion: %s\nAPI Key: %s\nLanguage: %s\nProxy: %s\nVerify SSL?: %s>'\
-             % (self.base_url, self.version, self.api_key, self.lang, self.proxy, self.verify_ssl)
\ No newline at end of file
+             % (self.base_url, self.version, self.api_key, self.lang, self.proxy, self.verify_ssl)
@@ -0,0 +1,397 @@
+"""
+asyncio counterpart of :class:`gw2api.GuildWars2Client`.
+
+The API objects in `gw2api.objects` only know how to build URLs and
+ post-process a `requests.Response`. Rather than duplicating every one of
+ them, the asynchronous client runs an object's `get` once to capture the URL
+ it would request, and once more - after the URL has been fetched through
+ `aiohttp` - to let it post-process the response exactly as the blocking
+ client would. This keeps every custom `get` signature
+ (`CharactersInventory.get(char_id)`, `Continents.get(**levels)`, ...) intact.
+"""
+
+import asyncio
+import contextvars
+import copy
+import itertools
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from gw2api import GuildWars2Client
+from gw2api.cache import ResponseCache
+from gw2api.decoders import get_decoder
+from gw2api.loader import AsyncBatchLoader
+from gw2api.objects import api_objects
+from gw2api.objects.base_object import BaseAPIObject
+from gw2api.singleflight import SingleFlight
+from gw2api.snapshot import take_account_snapshot_async
+
+
+_CONNECTION_ERRORS = (aiohttp.ClientConnectionError,) if aiohttp is not None else ()
+
+# Responses already fetched for the API object currently being run, keyed by URL
+_replayed_responses = contextvars.ContextVar('replayed_responses', default=None)
+
+
+class _RequestCaptured(Exception):
+    """Raised by `_BridgeSession` to hand a URL that has yet to be fetched back to the client"""
+
+    def __init__(self, url, headers=None):
+        super().__init__(url)
+        self.url = url
+        self.headers = headers
+
+
+class _BridgeSession:
+    """
+    Stands in for the `requests.Session` of the API objects owned by an
+     `AsyncGuildWars2Client`. It never touches the network by itself.
+    """
+
+    def __init__(self, headers, cache=None, disk_cache=None, json_decoder=None):
+        self.headers = headers
+        self.cache = cache
+        self.disk_cache = disk_cache
+        self.json_decoder = json_decoder
+
+    def get(self, url, headers=None, **kwargs):
+        responses = _replayed_responses.get()
+
+        if responses is None or url not in responses:
+            raise _RequestCaptured(url, headers)
+
+        return responses[url]
+
+
+class AsyncAPIObject:
+    """
+    Awaitable view over an API object. Attributes are looked up on the wrapped
+     object, nested API objects (i.e. `commercetransactions.history.buys`) are
+     wrapped as well.
+
+    Only metadata (`object_type`, `MAX_IDS_PER_REQUEST`, ...) is forwarded:
+     methods of the wrapped object without an asynchronous counterpart here
+     (`sweep`, `iter_stream`, `sync`, ...) would block on the network, and
+     raise `AttributeError` instead.
+    """
+
+    def __init__(self, api_object, client):
+        self._api_object = api_object
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._api_object, name)
+
+        if isinstance(attr, BaseAPIObject):
+            return AsyncAPIObject(attr, self._client)
+
+        if callable(attr):
+            raise AttributeError(f'{type(self._api_object).__name__}.{name}() has no asynchronous counterpart, '
+                                 f'use it from a blocking `GuildWars2Client`')
+
+        return attr
+
+    async def get(self, *args, **kwargs):
+        """Same signature and return value as the wrapped object's `get`"""
+        ids = kwargs.get('ids')
+        max_ids = getattr(self._api_object, 'MAX_IDS_PER_REQUEST', None)
+
+        if max_ids and not args and ids is not None and not isinstance(ids, str):
+            # Fan out here rather than in the wrapped object, which would use threads
+            kwargs['ids'] = ids = list(ids)
+            if len(ids) > max_ids:
+                return [record async for record in self.iter_ids(ids, url=kwargs.get('url'),
+                                                                 max_workers=kwargs.get('max_workers'))]
+
+        return await self._client._call(self._api_object.get, *args, **kwargs)
+
+    async def iter_ids(self, ids, url=None, max_workers=None, ordered=True):
+        """Asynchronous counterpart of `BaseAPIv2Object.iter_ids`"""
+        api_object = self._api_object
+        semaphore = asyncio.Semaphore(max_workers or api_object.MAX_WORKERS)
+
+        async def get_chunk(chunk):
+            async with semaphore:
+                try:
+                    records = await self._client._call(api_object.get, url=url, ids=chunk)
+                except requests.HTTPError as e:
+                    # See `BaseAPIv2Object._get_chunk`
+                    if e.response is None or e.response.status_code != 404:
+                        raise
+                    return []
+            return api_object._order_records(records, chunk)
+
+        tasks = [asyncio.ensure_future(get_chunk(chunk)) for chunk in api_object._split_ids(ids)]
+        try:
+            for task in (tasks if ordered else asyncio.as_completed(tasks)):
+                for record in await task:
+                    yield record
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def iter_pages(self, url=None, page_size=None, max_workers=None, ordered=False):
+        """Asynchronous counterpart of `BaseAPIv2Object.iter_pages`"""
+        api_object = self._api_object
+        page_size = page_size or api_object.MAX_PAGE_SIZE
+        semaphore = asyncio.Semaphore(max_workers or api_object.MAX_WORKERS)
+
+        first_page = await self._client._call(BaseAPIObject.get, api_object, url=url, page_size=page_size)
+        for item in api_object._decode(first_page):
+            yield item
+
+        async def get_page(page):
+            async with semaphore:
+                return await self._client._call(api_object.get, url=url, page=page, page_size=page_size)
+
+        tasks = [asyncio.ensure_future(get_page(page))
+                 for page in range(1, api_object._page_total(first_page, page_size))]
+        try:
+            for task in (tasks if ordered else asyncio.as_completed(tasks)):
+                for item in await task:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_all_pages(self, url=None, page_size=None, max_workers=None):
+        """Asynchronous counterpart of `BaseAPIv2Object.get_all_pages`"""
+        return [item async for item in self.iter_pages(url=url, page_size=page_size,
+                                                       max_workers=max_workers, ordered=True)]
+
+    def loader(self, window=0.005, max_batch_size=None):
+        """Asynchronous counterpart of `BaseAPIv2Object.loader`"""
+        return AsyncBatchLoader(self, window=window, max_batch_size=max_batch_size)
+
+    def __repr__(self):
+        return '<AsyncAPIObject %r>' % self._api_object.object_type
+
+
+class AsyncGuildWars2Client:
+    """Parent client that stores the API Objects and metadata, sending requests through `aiohttp`"""
+
+    LANG = GuildWars2Client.LANG
+    VERSION = GuildWars2Client.VERSION
+    BASE_URL = GuildWars2Client.BASE_URL
+
+    def __init__(self, base_url=BASE_URL, version=VERSION, lang=LANG,
+                 api_key=None, proxy=None, verify_ssl=True,
+                 connector_limit=256, connector_limit_per_host=0, session=None, cache=None,
+                 disk_cache=None, rate_limiter=None, retry=None,
+                 coalesce=False, json_decoder=None):
+        """
+        Accepts the same settings as `GuildWars2Client` along with:
+
+        :param connector_limit: Total number of simultaneous connections kept
+                                 by the pooled connector (0 for no limit)
+        :param connector_limit_per_host: Number of simultaneous connections to
+                                          the same host (0 for no limit)
+        :param session: An already configured `aiohttp.ClientSession` to send
+                         requests through, i.e. to share one connector between
+                         several clients. It is not closed by `close()`.
+        :param cache: A `ResponseCache` to serve repeated requests from, it may
+                       be shared with other (blocking or asynchronous) clients
+        :param disk_cache: A `PersistentCache` static endpoints are read through
+        :param rate_limiter: A `TokenBucket` every request takes a token from,
+                              it may be shared with other clients
+        :param retry: A `RetryPolicy` deciding whether to send failed requests
+                       again, waiting without blocking the event loop
+        :param coalesce: Whether concurrent coroutines sending the same request
+                          should await a single one and share its response. A
+                          `SingleFlight` may be shared with other clients
+        :param json_decoder: The JSON decoder of responses, see `GuildWars2Client`
+        """
+
+        if aiohttp is None and session is None:
+            raise ImportError('AsyncGuildWars2Client requires aiohttp, install it with '
+                              '`pip install GuildWars2-API-Client[async]`')
+
+        assert version in ('v1', 'v2')
+        assert lang in ('en', 'es', 'de', 'fr', 'ko', 'zh')
+
+        self.lang = lang
+        self.proxy = proxy
+        self.api_key = api_key
+        self.version = version
+        self.base_url = base_url
+        self.verify_ssl = verify_ssl
+        self.connector_limit = connector_limit
+        self.connector_limit_per_host = connector_limit_per_host
+        self.cache = cache
+        self.disk_cache = disk_cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.flights = coalesce if isinstance(coalesce, SingleFlight) else None
+        if self.flights is None and coalesce:
+            self.flights = SingleFlight()
+        self.json_decoder = get_decoder(json_decoder) if isinstance(json_decoder, str) else json_decoder
+
+        if self.api_key:
+            assert isinstance(self.api_key, str)
+
+        if self.proxy:
+            # Same format as `GuildWars2Client`, aiohttp only takes a single proxy URL
+            assert isinstance(self.proxy, dict)
+
+        GuildWars2Client.LANG = lang
+        GuildWars2Client.VERSION = version
+        GuildWars2Client.BASE_URL = base_url
+
+        self._session = session
+        self._owns_session = session is None
+
+        self.session = _BridgeSession(self._build_headers(), cache=self.cache, disk_cache=self.disk_cache,
+                                      json_decoder=self.json_decoder)
+        api_objects(self.version)
+
+    async def account_snapshot(self):
+        """Asynchronous counterpart of `GuildWars2Client.account_snapshot`"""
+        if self.version != 'v2':
+            raise ValueError('Account snapshots require version v2 of the API')
+
+        return await take_account_snapshot_async(self)
+
+    def __getattr__(self, name):
+        """Creates API objects on first access, see `GuildWars2Client.__getattr__`"""
+        try:
+            prototype = api_objects(self.__dict__['version'])[name]
+        except KeyError:
+            raise AttributeError(f'{self.__class__.__name__!r} object has no attribute {name!r}') from None
+
+        object_ = copy.copy(prototype)
+        object_.session = self.session
+        api_object = AsyncAPIObject(object_, self)
+        setattr(self, name, api_object)
+        return api_object
+
+    def __dir__(self):
+        return [*super().__dir__(), *api_objects(self.version)]
+
+    def _build_headers(self):
+        headers = {
+            'User-Agent': 'juxhindb-gw2-api-interface-python-wrapper',
+            'Accept': 'application/json',
+            'Accept-Language': self.lang
+        }
+
+        if self.api_key:
+            headers['Authorization'] = 'Bearer ' + self.api_key
+
+        return headers
+
+    def _get_session(self):
+        """Lazily builds the `aiohttp.ClientSession`, as it has to be created inside a running event loop"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.connector_limit,
+                                             limit_per_host=self.connector_limit_per_host,
+                                             ssl=self.verify_ssl)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self._build_headers())
+
+        return self._session
+
+    async def _call(self, method, *args, **kwargs):
+        """
+        Runs an API object's `get`, fetching the URLs it asks for asynchronously.
+
+        Every time the object requests a URL that has not been fetched yet, the
+         URL is fetched and the object run again from the start. Objects that
+         validate their arguments and return early, or that are served from a
+         cache, complete on the first run without requesting anything.
+        """
+        responses = {}
+
+        while True:
+            token = _replayed_responses.set(responses)
+            try:
+                return method(*args, **kwargs)
+            except _RequestCaptured as captured:
+                url, headers = captured.url, captured.headers
+            finally:
+                _replayed_responses.reset(token)
+
+            responses[url] = await self._fetch(url, headers)
+
+    async def _fetch(self, url, headers=None):
+        """Fetches a URL, sharing the response of an identical request already in flight if coalescing"""
+        if self.flights is None:
+            return await self._request(url, headers)
+
+        key = (ResponseCache.make_key(url, self._build_headers()), frozenset((headers or {}).items()))
+        return await self.flights.do_async(key, lambda: self._request(url, headers))
+
+    async def _request(self, url, headers=None):
+        """Sends a GET request, retrying it as `retry` allows, and wraps the result as a `requests.Response`"""
+        for attempt in itertools.count(1):
+            try:
+                response = await self._send(url, headers)
+            except requests.RequestException as e:
+                if self.retry is None or not self.retry.should_retry('GET', attempt, error=e):
+                    raise
+                response = None
+            else:
+                if self.retry is None or not self.retry.should_retry('GET', attempt, response=response):
+                    return response
+
+            delay = self.retry.backoff(attempt, response)
+            self.retry.record(url, delay)
+            await asyncio.sleep(delay)
+
+    async def _send(self, url, headers=None):
+        """Sends a single GET request through aiohttp"""
+        session = self._get_session()
+
+        kwargs = {}
+        if self.proxy:
+            proxy = self.proxy.get('https') or self.proxy.get('http')
+            kwargs['proxy'] = proxy if '://' in proxy else 'http://' + proxy
+        if not self._owns_session:
+            # A shared session may carry another client's credentials
+            kwargs['headers'] = dict(self._build_headers(), **(headers or {}))
+        elif headers:
+            kwargs['headers'] = headers
+
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        try:
+            async with session.get(url, **kwargs) as aio_response:
+                content = await aio_response.read()
+
+                response = requests.Response()
+                response.url = url
+                response.status_code = aio_response.status
+                response.reason = aio_response.reason
+                response.headers = CaseInsensitiveDict(aio_response.headers)
+                response.encoding = aio_response.charset
+                response._content = content
+        except asyncio.TimeoutError as e:
+            raise requests.Timeout(e) from e
+        except _CONNECTION_ERRORS as e:
+            # Surface transport errors the way the blocking client does
+            raise requests.ConnectionError(e) from e
+
+        return response
+
+    async def close(self):
+        """Closes the underlying `aiohttp.ClientSession` if it was created by this client"""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __repr__(self):
+        return '<AsyncGuildWars2Client %s\nVersion: %s\nAPI Key: %s\nLanguage: %s\nProxy: %s\nVerify SSL?: %s>'\
+             % (self.base_url, self.version, self.api_key, self.lang, self.proxy, self.verify_ssl)
@@ -0,0 +1,344 @@
+"""In-memory and on-disk caching of API responses"""
+
+import collections
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class ResponseCache:
+    """
+    Bounded, thread-safe LRU cache of API responses.
+
+    Responses are keyed by their final request URL, language and (hashed) API
+     key, so a single cache can safely be shared by several clients. Each entry
+     expires after the TTL configured for its endpoint.
+
+    Expired responses that came with an `ETag` or `Last-Modified` header are
+     kept (until evicted) to revalidate them: the next request for them is sent
+     with `If-None-Match`/`If-Modified-Since`, and if the API answers with a
+     `304 Not Modified` the cached response is served again as is, without
+     downloading or decoding its body. Note that decoded payloads are shared
+     between everyone served the same response and should not be modified.
+
+    >>> cache = ResponseCache(maxsize=10000, ttls={'commerce/prices': 30})
+    >>> client = GuildWars2Client(cache=cache)
+    >>> cache.info()
+    CacheInfo(hits=0, misses=0, maxsize=10000, currsize=0)
+    """
+
+    # Endpoints whose data only changes with game builds
+    STATIC_TTL = 60 * 60
+    DEFAULT_TTLS = {
+        'achievements': STATIC_TTL,
+        'colors': STATIC_TTL,
+        'continents': STATIC_TTL,
+        'items': STATIC_TTL,
+        'itemstats': STATIC_TTL,
+        'recipes': STATIC_TTL,
+        'skins': STATIC_TTL,
+    }
+
+    def __init__(self, maxsize=4096, ttl=60, ttls=None, clock=time.monotonic):
+        """
+        :param maxsize: Maximum number of responses kept, least recently
+                         used ones are evicted first
+        :param ttl: Seconds a response is kept for endpoints missing from `ttls`
+        :param ttls: Mapping of endpoint (i.e. 'items', 'commerce/prices') to
+                      the seconds its responses are kept, merged over
+                      `DEFAULT_TTLS`. With a TTL of 0 responses are
+                      revalidated on every request, `None` disables caching
+                      for that endpoint altogether
+        :param clock: Callable returning the current time in seconds
+        """
+        if maxsize < 1:
+            raise ValueError('ResponseCache requires a `maxsize` of at least 1')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url, headers):
+        """Builds the cache key of a request from its URL and the session headers"""
+        authorization = headers.get('Authorization')
+        if authorization:
+            authorization = hashlib.sha256(authorization.encode('utf-8')).hexdigest()
+
+        return url, headers.get('Accept-Language'), authorization
+
+    def ttl_for(self, object_type):
+        """Returns the seconds responses of an endpoint are kept for"""
+        return self.ttls.get(object_type, self.ttl)
+
+    @staticmethod
+    def validators(response):
+        """Returns the conditional request headers to revalidate a response with"""
+        headers = {}
+
+        if response.headers.get('ETag'):
+            headers['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = response.headers['Last-Modified']
+
+        return headers
+
+    def get(self, key):
+        """Returns the cached response for `key`, or `None` if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, _, response = entry
+            if expires_at <= self.clock():
+                if not self.validators(response):
+                    del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def get_stale(self, key):
+        """Returns the expired response for `key` if it can be revalidated, or `None`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] > self.clock():
+                return None
+
+            return entry[2]
+
+    def revalidate(self, key, object_type):
+        """Marks an expired response as fresh again after a `304 Not Modified`, which counts as a cache hit"""
+        ttl = self.ttl_for(object_type) or 0
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+
+            self._entries[key] = (self.clock() + ttl, object_type, entry[2])
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.revalidations += 1
+
+    def set(self, key, response, object_type):
+        """Stores a freshly fetched response, which counts as a cache miss"""
+        ttl = self.ttl_for(object_type)
+
+        with self._lock:
+            self.misses += 1
+            if ttl is None or not (ttl or self.validators(response)):
+                return
+
+            self._entries[key] = (self.clock() + ttl, object_type, response)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, object_type=None):
+        """Drops every response of an endpoint, or all of them if `object_type` is not given"""
+        with self._lock:
+            if object_type is None:
+                self._entries.clear()
+                return
+
+            for key in [key for key, (_, type_, _) in self._entries.items() if type_ == object_type]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drops every response and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.revalidations = 0
+
+    def info(self):
+        """Returns the hit and miss counters along with the size of the cache"""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return '<ResponseCache %r>' % (self.info(),)
+
+
+class PersistentCache:
+    """
+    On-disk (SQLite) cache of static API data that survives restarts.
+
+    Entries are namespaced by game build id and language, and stay valid until
+     a new build id is set - at which point every entry of older builds is
+     dropped. Records requested by id are stored individually, so any later
+     request for a subset (or superset) of those ids is served from disk.
+
+    The last known build id is persisted too: on a warm start nothing is
+     requested from the API until it is told about a new build, either through
+     `set_build_id` or a `gw2api.watcher.BuildWatcher`.
+
+    >>> disk_cache = PersistentCache('~/.cache/gw2api.sqlite3')
+    >>> client = GuildWars2Client(disk_cache=disk_cache)
+    >>> client.items.get(ids=range(1, 30000))  # Only hits the API once per build
+    """
+
+    # Endpoints whose data only changes with game builds
+    DEFAULT_ENDPOINTS = frozenset({
+        'achievements', 'achievements/categories', 'achievements/groups',
+        'colors', 'continents', 'currencies', 'finishers', 'gliders',
+        'items', 'itemstats', 'legends', 'mailcarriers', 'maps', 'masteries',
+        'materials', 'minis', 'mounts/skins', 'mounts/types', 'novelties',
+        'outfits', 'pets', 'professions', 'quests', 'races', 'recipes',
+        'skills', 'skins', 'specializations', 'stories', 'titles', 'traits',
+    })
+
+    def __init__(self, path, endpoints=DEFAULT_ENDPOINTS):
+        """
+        :param path: Path of the SQLite database, created if it does not exist
+        :param endpoints: Endpoints (i.e. 'items') read through the cache
+        """
+        self.path = path
+        self.endpoints = frozenset(endpoints)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.expanduser(path), check_same_thread=False,
+                                           isolation_level=None)
+
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS records (
+                    namespace TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    PRIMARY KEY (namespace, endpoint, record_id)
+                );
+                CREATE TABLE IF NOT EXISTS responses (
+                    namespace TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    PRIMARY KEY (namespace, url)
+                );
+            ''')
+
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'build_id'").fetchone()
+            self._build_id = int(row[0]) if row else None
+
+    @property
+    def build_id(self):
+        """The game build the cached entries belong to, `None` until one has been set"""
+        return self._build_id
+
+    def set_build_id(self, build_id):
+        """
+        Sets the current game build, dropping every entry of previous builds.
+
+        :returns: Whether the build id changed
+        """
+        build_id = int(build_id)
+
+        with self._lock:
+            if build_id == self._build_id:
+                return False
+
+            with self._transaction():
+                self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('build_id', ?)",
+                                         (str(build_id),))
+                prefix = '{}:%'.format(build_id)
+                self._connection.execute('DELETE FROM records WHERE namespace NOT LIKE ?', (prefix,))
+                self._connection.execute('DELETE FROM responses WHERE namespace NOT LIKE ?', (prefix,))
+
+            self._build_id = build_id
+            return True
+
+    def namespace(self, lang):
+        """Returns the namespace of entries for the current build in a given language"""
+        if self._build_id is None:
+            raise ValueError('PersistentCache has no build id yet, see `set_build_id`')
+
+        return '{}:{}'.format(self._build_id, lang)
+
+    def get_records(self, namespace, endpoint, ids):
+        """Returns the cached records of an endpoint as a dictionary of `str(id)` to record"""
+        ids = [str(_id) for _id in ids]
+        records = {}
+
+        with self._lock:
+            # Stay well below SQLite's limit on the number of query parameters
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = self._connection.execute(
+                    'SELECT record_id, body FROM records WHERE namespace = ? AND endpoint = ? '
+                    'AND record_id IN ({})'.format(','.join('?' * len(chunk))),
+                    [namespace, endpoint] + chunk)
+                records.update((record_id, json.loads(body)) for record_id, body in rows)
+
+        return records
+
+    def set_records(self, namespace, endpoint, records):
+        """Stores records, which must all have an `id`"""
+        rows = [(namespace, endpoint, str(record['id']), json.dumps(record)) for record in records]
+
+        with self._lock, self._transaction():
+            self._connection.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)', rows)
+
+    def get_response(self, namespace, url):
+        """Returns the cached decoded response for a URL, or `None`"""
+        with self._lock:
+            row = self._connection.execute('SELECT body FROM responses WHERE namespace = ? AND url = ?',
+                                           (namespace, url)).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set_response(self, namespace, url, payload):
+        """Stores the decoded response for a URL"""
+        with self._lock, self._transaction():
+            self._connection.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                                     (namespace, url, json.dumps(payload)))
+
+    def clear(self):
+        """Drops every cached entry, keeping the build id"""
+        with self._lock, self._transaction():
+            self._connection.execute('DELETE FROM records')
+            self._connection.execute('DELETE FROM responses')
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Runs the enclosed statements in a single transaction"""
+        self._connection.execute('BEGIN')
+        try:
+            yield
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        else:
+            self._connection.execute('COMMIT')
+
+    def __repr__(self):
+        return '<PersistentCache %r\nBuild: %r>' % (self.path, self._build_id)
+
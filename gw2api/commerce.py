@@ -0,0 +1,266 @@
+"""Compact representations of trading post data"""
+
+import array
+import json
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class PriceSweep:
+    """
+    Prices of many items at one point in time, stored column by column.
+
+    Every column is an `array.array` of C ints, rows being in `item_id`
+     order. Columns take a few bytes per item rather than the hundreds a
+     decoded record takes, and can be viewed as NumPy arrays without copying:
+
+    >>> sweep = client.commerceprices.sweep()
+    >>> len(sweep), sweep.duration
+    (27391, 2.41)
+    >>> numpy.asarray(sweep.sell_price) - numpy.asarray(sweep.buy_price)
+    array([ 13,   8, 112, ...], dtype=int32)
+    """
+
+    COLUMNS = ('item_id', 'buy_price', 'buy_qty', 'sell_price', 'sell_qty')
+    TYPECODE = 'i'
+
+    def __init__(self, timestamp, duration=None):
+        """
+        :param timestamp: When the sweep started, in seconds since the epoch
+        :param duration: Seconds the sweep took, once complete
+        """
+        self.timestamp = timestamp
+        self.duration = duration
+
+        for column in self.COLUMNS:
+            setattr(self, column, array.array(self.TYPECODE))
+
+    def add_records(self, records):
+        """Appends the rows of `commerce/prices` records"""
+        for record in records:
+            buys, sells = record['buys'], record['sells']
+            self.item_id.append(record['id'])
+            self.buy_price.append(buys['unit_price'])
+            self.buy_qty.append(buys['quantity'])
+            self.sell_price.append(sells['unit_price'])
+            self.sell_qty.append(sells['quantity'])
+
+    def extend(self, other):
+        """Appends the rows of another `PriceSweep`"""
+        for column in self.COLUMNS:
+            getattr(self, column).extend(getattr(other, column))
+
+    def columns(self):
+        """Returns the columns by name"""
+        return {column: getattr(self, column) for column in self.COLUMNS}
+
+    def rows(self):
+        """Yields `(item_id, buy_price, buy_qty, sell_price, sell_qty)` tuples"""
+        return zip(*(getattr(self, column) for column in self.COLUMNS))
+
+    def __len__(self):
+        return len(self.item_id)
+
+    def __repr__(self):
+        return '<PriceSweep %r items\nTimestamp: %r\nDuration: %r>' % (len(self), self.timestamp, self.duration)
+
+
+class _ListingsParser:
+    """
+    Collects the listings of a `commerce/listings` response while `json` decodes it.
+
+    Used as the `object_pairs_hook` of `json.loads`, which calls it with the
+     key/value pairs of every object as soon as the object is decoded. Price
+     levels are appended to flat arrays and replaced by their row number, so
+     that the hook of their item only receives the rows of each side.
+    """
+
+    def __init__(self):
+        self.price = array.array(PriceSweep.TYPECODE)
+        self.quantity = array.array(PriceSweep.TYPECODE)
+        self.listings = array.array(PriceSweep.TYPECODE)
+
+        self.item_ids = array.array(PriceSweep.TYPECODE)
+        # First row and number of rows of the buys, then of the sells, of every item
+        self.segment_starts = array.array(PriceSweep.TYPECODE)
+        self.segment_lengths = array.array(PriceSweep.TYPECODE)
+
+    def __call__(self, pairs):
+        item_id, buys, sells = None, (), ()
+        unit_price = quantity = listings = 0
+
+        for key, value in pairs:
+            if key == 'unit_price':
+                unit_price = value
+            elif key == 'quantity':
+                quantity = value
+            elif key == 'listings':
+                listings = value
+            elif key == 'id':
+                item_id = value
+            elif key == 'buys':
+                buys = value
+            elif key == 'sells':
+                sells = value
+
+        if item_id is None:
+            self.price.append(unit_price)
+            self.quantity.append(quantity)
+            self.listings.append(listings)
+            return len(self.price) - 1
+
+        self.item_ids.append(item_id)
+        for rows in (buys, sells):
+            # The levels of a side are decoded one after the other
+            self.segment_starts.append(rows[0] if rows else 0)
+            self.segment_lengths.append(len(rows))
+
+
+class OrderBook:
+    """
+    Buy and sell listings of many items, backed by contiguous NumPy arrays.
+
+    The price levels of every item are stored in three flat arrays (`price`,
+     `quantity` and `listings`): the buys of the item at position `i` are the
+     rows `offsets[2 * i]:offsets[2 * i + 1]`, sorted from the highest price
+     down, followed by its sells up to `offsets[2 * i + 2]`, sorted from the
+     lowest price up. Requires NumPy.
+
+    >>> book = client.commercelistings.order_book(ids=item_ids)
+    >>> book.best_bid(19684), book.best_ask(19684)
+    (184, 189)
+    >>> book.cost_to_buy(19684, 2500)
+    478250
+    >>> book.spread()  # Of every item at once
+    array([ 5, 12,  0, ...])
+    """
+
+    def __init__(self, item_ids, offsets, price, quantity, listings):
+        if numpy is None:
+            raise ImportError('OrderBook requires numpy, install it with '
+                              '`pip install GuildWars2-API-Client[numpy]`')
+
+        self.item_ids = item_ids
+        self.offsets = offsets
+        self.price = price
+        self.quantity = quantity
+        self.listings = listings
+
+        self._positions = {item_id: position for position, item_id in enumerate(item_ids.tolist())}
+
+    @classmethod
+    def from_responses(cls, bodies):
+        """
+        Builds an order book from the bodies of `commerce/listings` responses.
+
+        The bodies are decoded with the standard library `json`, straight into
+         arrays: no dict is created for the items or their price levels.
+        """
+        if numpy is None:
+            raise ImportError('OrderBook requires numpy, install it with '
+                              '`pip install GuildWars2-API-Client[numpy]`')
+
+        parser = _ListingsParser()
+        for body in bodies:
+            json.loads(body, object_pairs_hook=parser)
+
+        def as_numpy(values):
+            return numpy.frombuffer(values, dtype=numpy.int32) if len(values) else numpy.zeros(0, numpy.int32)
+
+        starts, lengths = as_numpy(parser.segment_starts), as_numpy(parser.segment_lengths)
+        offsets = numpy.zeros(len(lengths) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=offsets[1:])
+
+        # Move the rows of every side of every item together, buys first
+        rows = numpy.repeat(starts - offsets[:-1], lengths) + numpy.arange(offsets[-1])
+        segments = numpy.repeat(numpy.arange(len(lengths)), lengths)
+        price = as_numpy(parser.price)[rows]
+
+        # Then sort each side from its best price, which the API already does
+        #  in practice, but nothing guarantees
+        is_buy = segments % 2 == 0
+        rows = rows[numpy.lexsort((numpy.where(is_buy, -price, price), segments))]
+
+        return cls(as_numpy(parser.item_ids).copy(), offsets, as_numpy(parser.price)[rows],
+                   as_numpy(parser.quantity)[rows], as_numpy(parser.listings)[rows])
+
+    def bids(self, item_id):
+        """Returns the `(price, quantity, listings)` arrays of the buy orders of an item, best first"""
+        return self._side(item_id, 0)
+
+    def asks(self, item_id):
+        """Returns the `(price, quantity, listings)` arrays of the sell offers of an item, best first"""
+        return self._side(item_id, 1)
+
+    def best_bid(self, item_id=None):
+        """Highest buy price of an item, or of every item if `item_id` is None (0 without buy orders)"""
+        return self._best(item_id, 0)
+
+    def best_ask(self, item_id=None):
+        """Lowest sell price of an item, or of every item if `item_id` is None (0 without sell offers)"""
+        return self._best(item_id, 1)
+
+    def spread(self, item_id=None):
+        """Difference between the best ask and bid of an item, or of every item (0 if a side is empty)"""
+        bid, ask = self.best_bid(item_id), self.best_ask(item_id)
+        if item_id is not None:
+            return ask - bid if bid and ask else 0
+
+        return numpy.where((bid > 0) & (ask > 0), ask - bid, 0)
+
+    def depth(self, item_id, price, side='sells'):
+        """
+        Number of units offered at `price` or better.
+
+        :param side: 'sells' for the units that can be bought for at most
+                      `price`, 'buys' for those that can be sold for at least `price`
+        """
+        prices, quantities, _ = self.asks(item_id) if side == 'sells' else self.bids(item_id)
+        within = prices <= price if side == 'sells' else prices >= price
+        return int(quantities[within].sum())
+
+    def cost_to_buy(self, item_id, quantity):
+        """Copper needed to buy `quantity` units of an item from the cheapest offers, None if there are not enough"""
+        prices, quantities, _ = self.asks(item_id)
+        filled = numpy.cumsum(quantities, dtype=numpy.int64)
+        if not len(filled) or filled[-1] < quantity:
+            return None
+
+        # Levels fully bought, then part of the last one
+        last = int(numpy.searchsorted(filled, quantity))
+        bought = int((prices[:last].astype(numpy.int64) * quantities[:last]).sum())
+        return bought + (quantity - (int(filled[last - 1]) if last else 0)) * int(prices[last])
+
+    @property
+    def nbytes(self):
+        """Memory held by the arrays of the order book"""
+        return sum(values.nbytes for values in (self.item_ids, self.offsets, self.price, self.quantity,
+                                                 self.listings))
+
+    def _side(self, item_id, side):
+        position = self._positions[item_id]
+        start, end = self.offsets[2 * position + side], self.offsets[2 * position + side + 1]
+        return self.price[start:end], self.quantity[start:end], self.listings[start:end]
+
+    def _best(self, item_id, side):
+        if item_id is not None:
+            prices = self._side(item_id, side)[0]
+            return int(prices[0]) if len(prices) else 0
+
+        starts, ends = self.offsets[side:-1:2], self.offsets[side + 1::2]
+        best = numpy.zeros(len(self.item_ids), dtype=self.price.dtype)
+        present = ends > starts
+        best[present] = self.price[starts[present]]
+        return best
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._positions
+
+    def __repr__(self):
+        return '<OrderBook %r items\nPrice levels: %r>' % (len(self), len(self.price))
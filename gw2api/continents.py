@@ -0,0 +1,144 @@
+"""Crawling of the whole continents hierarchy, down to every sector, point of interest and task"""
+
+import hashlib
+import json
+import threading
+import time
+
+
+class ContinentsCrawler:
+    """
+    Crawls every continent and floor, keeping each node between crawls.
+
+    The continents are requested first, in a single `ids=all` request which
+     also lists their floors. Floors are then requested concurrently, a few
+     per request (`FLOORS_PER_REQUEST`): whole floors carry their regions,
+     maps and everything on the maps, so no deeper level has to be walked,
+     and a continent requested at once would be a single response of many
+     megabytes.
+
+    Floors are kept by `(continent_id, floor_id)` along with a digest of their
+     content. Later crawls only request the floors that are new or were
+     invalidated (or every floor if `refresh`), and `changed` lists the floors
+     that were added, removed or whose content differs from the previous
+     crawl, i.e. to only rebuild what depends on those.
+
+    Maps and sectors are deduplicated across floors: identical records are
+     shared by every floor they appear on rather than held once per floor.
+
+    >>> crawler = client.continents.crawler(max_workers=8)
+    >>> world = crawler.crawl()
+    >>> world[1]['floors'][1]['regions']['4']['maps']['15']['sectors']
+    {'513': {'name': 'Shaemoor Fields', ...}, ...}
+    >>> watcher.add_callback(lambda old_build_id, new_build_id: crawler.crawl(refresh=True))
+    """
+
+    # Default number of floors per request, floors weighing up to a few megabytes each
+    FLOORS_PER_REQUEST = 4
+
+    def __init__(self, api_object, max_workers=None, floors_per_request=None):
+        """
+        :param api_object: The `Continents` API object to request with
+        :param max_workers: Number of requests sent concurrently, defaults to
+                             the `MAX_WORKERS` of the API object
+        :param floors_per_request: Number of floors requested at once, defaults
+                                    to `FLOORS_PER_REQUEST`
+        """
+        self.api_object = api_object
+        self.max_workers = max_workers
+        self.floors_per_request = floors_per_request or self.FLOORS_PER_REQUEST
+
+        self.continents = {}
+        self.floors = {}  # `(continent_id, floor_id)` to `(digest, floor)`
+        self.stale = set()  # Floors requested again by the next crawl
+        self.changed = set()
+        self.requests = 0
+        self.duration = None
+
+        self._interned = {}
+        self._lock = threading.Lock()
+
+    def crawl(self, refresh=False):
+        """
+        Crawls the continents, requesting the floors not known yet (or all of them if `refresh`).
+
+        :returns: A dictionary of continent id to its record, whose `floors`
+                   map floor ids to whole floors
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self.requests = 0
+        if refresh:
+            # Records of the floors replaced since would otherwise be kept forever
+            self._interned.clear()
+
+        continents = {continent['id']: continent for continent in self._request(self.api_object.get_continents)}
+        listed = {(continent_id, floor_id) for continent_id, continent in continents.items()
+                  for floor_id in continent['floors']}
+
+        missing = sorted(listed if refresh else (listed - set(self.floors)) | (listed & self.stale))
+        size, requests = self.floors_per_request, []
+        for continent_id in continents:
+            floor_ids = [floor_id for _continent_id, floor_id in missing if _continent_id == continent_id]
+            requests.extend((continent_id, floor_ids[i:i + size]) for i in range(0, len(floor_ids), size))
+
+        changed = {key for key in self.floors if key not in listed}
+        for key in changed:
+            del self.floors[key]
+
+        for continent_id, floors in self.api_object._map_concurrently(self._get_floors, requests, self.max_workers,
+                                                                      ordered=False):
+            for floor in floors:
+                key = (continent_id, floor['id'])
+                digest = _digest(floor)
+                if key not in self.floors or self.floors[key][0] != digest:
+                    self.floors[key] = (digest, self._deduplicate(floor))
+                    changed.add(key)
+
+        self.continents = continents
+        self.changed = changed
+        self.stale.clear()
+        self.duration = time.perf_counter() - start
+        return self.tree()
+
+    def tree(self):
+        """Assembles the continents and floors of the last crawl, see `crawl`"""
+        tree = {continent_id: dict(continent, floors={}) for continent_id, continent in self.continents.items()}
+        for (continent_id, floor_id), (_, floor) in sorted(self.floors.items()):
+            tree[continent_id]['floors'][floor_id] = floor
+        return tree
+
+    def invalidate(self, continent_id=None, floor_ids=None):
+        """Marks floors (of a continent, or all of them) to be requested again by the next crawl"""
+        self.stale.update(key for key in self.floors if continent_id is None or (
+            key[0] == continent_id and (floor_ids is None or key[1] in floor_ids)))
+
+    def _get_floors(self, request):
+        continent_id, floor_ids = request
+        return continent_id, self._request(self.api_object.get_floors, continent_id, floor_ids)
+
+    def _request(self, func, *args):
+        with self._lock:
+            self.requests += 1
+        return func(*args)
+
+    def _deduplicate(self, floor):
+        """Replaces the maps and sectors of a floor by the identical records of other floors, if any"""
+        for region in floor.get('regions', {}).values():
+            maps = region.get('maps', {})
+            for map_id, map_ in maps.items():
+                sectors = map_.get('sectors', {})
+                for sector_id, sector in sectors.items():
+                    sectors[sector_id] = self._intern(sector)
+                maps[map_id] = self._intern(map_)
+        return floor
+
+    def _intern(self, record):
+        return self._interned.setdefault(_digest(record), record)
+
+    def __repr__(self):
+        return '<ContinentsCrawler %r continents\nFloors: %r>' % (len(self.continents), len(self.floors))
+
+
+def _digest(record):
+    return hashlib.blake2b(json.dumps(record, sort_keys=True).encode('utf-8'), digest_size=16).digest()
@@ -0,0 +1,71 @@
+"""JSON decoders responses can be decoded with, from the fastest installed library down to `json`"""
+
+import json
+
+
+def _load_orjson():
+    import orjson
+    return orjson.loads
+
+
+def _load_msgspec():
+    import msgspec
+    return msgspec.json.Decoder().decode
+
+
+def _load_simdjson():
+    import simdjson
+    return simdjson.loads
+
+
+def _load_json():
+    return json.loads
+
+
+# In order of preference for the 'auto' decoder
+_LOADERS = {
+    'orjson': _load_orjson,
+    'msgspec': _load_msgspec,
+    'simdjson': _load_simdjson,
+    'json': _load_json,
+}
+
+
+def get_decoder(name='auto'):
+    """
+    Returns a callable decoding JSON from the `bytes` of a response body.
+
+    >>> decode = get_decoder('orjson')
+    >>> decode(b'{"id": 1}')
+    {'id': 1}
+
+    :param name: One of 'orjson', 'msgspec', 'simdjson' or 'json' (the standard
+                  library), or 'auto' for the first of them that is installed
+    :raises ImportError: If the library of the requested decoder is not installed
+    :raises ValueError: If `name` is not a known decoder
+    """
+    if name == 'auto':
+        for loader in _LOADERS.values():
+            try:
+                return loader()
+            except ImportError:
+                continue
+
+    try:
+        loader = _LOADERS[name]
+    except KeyError:
+        raise ValueError(f'Unknown JSON decoder {name!r}, expected one of {", ".join(["auto", *_LOADERS])}')
+
+    return loader()
+
+
+def available_decoders():
+    """Returns the names of the decoders whose library is installed"""
+    names = []
+    for name, loader in _LOADERS.items():
+        try:
+            loader()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
@@ -0,0 +1,189 @@
+"""Tailing of guild logs, polling each guild for the entries added since its last poll"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class _GuildCursor:
+    """Polling state of a single guild"""
+
+    def __init__(self, guild_id, since, interval):
+        self.guild_id = guild_id
+        self.since = since  # Id of the last entry seen, `None` until there is one
+        self.polled = since is not None  # Whether the entries before `since` are known
+        self.interval = interval
+        self.due = 0  # `time.monotonic()` from which the guild is polled again
+
+
+class GuildLogFollower:
+    """
+    Follows the logs of many guilds, yielding the entries added to them.
+
+    Every guild is polled with `since` set to the id of the last entry seen,
+     so the API only sends the entries added since. Guilds are polled on their
+     own interval: it drops back to `min_interval` as soon as a guild shows
+     activity, and grows by `backoff` with every empty poll up to
+     `max_interval`, so quiet guilds cost fewer requests. The guilds due are
+     polled concurrently, through the client's rate limiter if it has one.
+
+    The log endpoint requires an API key of the guild leader, with the
+     `guilds` scope.
+
+    >>> follower = GuildLogFollower(client, guild_ids, min_interval=10, max_interval=300)
+    >>> for guild_id, entry in follower:
+    ...     print(guild_id, entry['type'], entry['time'])
+    """
+
+    # Most entries the API returns at once, older ones are only in later pages of the in-game log
+    LOG_SIZE = 100
+
+    def __init__(self, client, guild_ids=(), since=None, min_interval=10, max_interval=300, backoff=2,
+                 max_workers=8, backlog=False):
+        """
+        :param client: The `GuildWars2Client` to poll with
+        :param guild_ids: The guilds to follow, more can be added with `add_guild`
+        :param since: Mapping of guild id to the id of the last entry seen,
+                       i.e. the `cursors` of a previous follower to resume from
+        :param min_interval: Fewest seconds between two polls of a guild
+        :param max_interval: Most seconds between two polls of a guild
+        :param backoff: Factor the interval of a guild grows by with every empty poll
+        :param max_workers: Number of guilds polled at the same time
+        :param backlog: Whether to yield the entries already in the log of
+                         guilds without a `since` on their first poll, rather
+                         than only the ones added afterwards
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError('GuildLogFollower requires 0 < `min_interval` <= `max_interval`')
+        if backoff < 1:
+            raise ValueError('GuildLogFollower requires a `backoff` of at least 1')
+
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.backlog = backlog
+
+        self._since = dict(since or {})
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._executor = None
+
+        for guild_id in guild_ids:
+            self.add_guild(guild_id)
+
+    @property
+    def cursors(self):
+        """Mapping of every guild polled to the id of the last entry seen, to resume from later"""
+        with self._lock:
+            return {guild_id: cursor.since for guild_id, cursor in self._cursors.items() if cursor.since is not None}
+
+    def add_guild(self, guild_id, since=None):
+        """Starts following a guild, from the entry after `since` if given"""
+        with self._lock:
+            if guild_id not in self._cursors:
+                since = since if since is not None else self._since.get(guild_id)
+                self._cursors[guild_id] = _GuildCursor(guild_id, since, self.min_interval)
+
+    def remove_guild(self, guild_id):
+        """Stops following a guild"""
+        with self._lock:
+            self._cursors.pop(guild_id, None)
+
+    def poll(self, force=False):
+        """
+        Polls the guilds that are due (or every guild if `force`) once.
+
+        :returns: The new `(guild_id, entry)` pairs, oldest first within a guild
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [cursor for cursor in self._cursors.values() if force or cursor.due <= now]
+        if not due:
+            return []
+
+        # Log responses would otherwise be served from the cache until it expires
+        cache = getattr(self.client, 'cache', None)
+        if cache is not None:
+            cache.invalidate(self.client.guildidlog.object_type)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='gw2api-guild-log')
+
+        entries = []
+        for new in self._executor.map(self._poll_guild, due):
+            entries.extend(new)
+        return entries
+
+    def follow(self):
+        """Yields `(guild_id, entry)` pairs as they are added to the logs, until `stop` is called"""
+        self._stopped.clear()
+
+        while not self._stopped.is_set():
+            yield from self.poll()
+
+            with self._lock:
+                due = min((cursor.due for cursor in self._cursors.values()), default=None)
+            self._stopped.wait(self.min_interval if due is None else max(0, due - time.monotonic()))
+
+    def stop(self):
+        """Makes `follow` return once the ongoing poll is over"""
+        self._stopped.set()
+
+    def close(self):
+        """Stops following, releasing the polling threads"""
+        self.stop()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _poll_guild(self, cursor):
+        try:
+            entries = self.client.guildidlog.get(cursor.guild_id, since=cursor.since)
+        except Exception:
+            # A guild that cannot be polled (i.e. a key that lost leadership)
+            #  is backed off like an idle one, but never stops the others
+            logger.exception('Failed to poll the log of guild %s', cursor.guild_id)
+            entries = None
+
+        with self._lock:
+            first_poll = not cursor.polled
+            cursor.polled = cursor.polled or entries is not None
+
+            if entries:
+                # Entries are listed newest first
+                entries = sorted(entries, key=lambda entry: entry['id'])
+                if cursor.since is not None and len(entries) >= self.LOG_SIZE and entries[0]['id'] > cursor.since + 1:
+                    logger.warning('The log of guild %s grew by more than %s entries between two polls, some were '
+                                   'missed', cursor.guild_id, self.LOG_SIZE)
+                cursor.since = entries[-1]['id']
+                cursor.interval = self.min_interval
+                if first_poll and not self.backlog:
+                    entries = []
+            else:
+                cursor.interval = min(cursor.interval * self.backoff, self.max_interval)
+            cursor.due = time.monotonic() + cursor.interval
+
+        return [(cursor.guild_id, entry) for entry in entries or ()]
+
+    def __iter__(self):
+        return self.follow()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cursors)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return '<GuildLogFollower %r guilds\nInterval: %r-%r>' % (len(self), self.min_interval, self.max_interval)
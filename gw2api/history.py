@@ -0,0 +1,359 @@
+"""Append-only on-disk history of trading post prices"""
+
+import json
+import os
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _record_dtype():
+    return numpy.dtype([
+        ('timestamp', '<i8'),
+        ('item_id', '<i4'),
+        ('buy_price', '<i4'),
+        ('buy_qty', '<i4'),
+        ('sell_price', '<i4'),
+        ('sell_qty', '<i4'),
+    ])
+
+
+class _Segment:
+    """
+    One segment file of a `PriceHistory`, holding up to `capacity` records in time order.
+
+    Once full, a segment is sealed: its records are copied, sorted by item
+     (and still by time within an item), to a `.items` file next to it, with
+     the first row of every item saved to an `.index.npy` file. The rows of
+     an item are then a slice of that copy.
+    """
+
+    def __init__(self, directory, number, capacity, dtype):
+        self.number = number
+        self.capacity = capacity
+        self.dtype = dtype
+        self.path = os.path.join(directory, '%06d.prices' % number)
+        self.items_path = os.path.join(directory, '%06d.items' % number)
+        self.index_path = os.path.join(directory, '%06d.index.npy' % number)
+
+        self._records = None
+        self._items = None
+        self._index = None  # `(item_ids, starts)`, `starts` ending with the number of records
+        self._active_index = None  # `(count, order, sorted_item_ids)` of an unsealed segment
+
+    @property
+    def count(self):
+        """Number of complete records in the segment file"""
+        try:
+            return min(os.path.getsize(self.path) // self.dtype.itemsize, self.capacity)
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def sealed(self):
+        return os.path.exists(self.items_path)
+
+    def records(self):
+        """Maps the records of the segment, in time order, without reading them"""
+        count = self.count
+        if self._records is None or len(self._records) != count:
+            if not count:
+                return numpy.zeros(0, dtype=self.dtype)
+            self._records = numpy.memmap(self.path, dtype=self.dtype, mode='r', shape=(count,))
+        return self._records
+
+    def seal(self):
+        """Writes the copy of the records sorted by item and its index"""
+        records = self.records()
+        order = numpy.argsort(records['item_id'], kind='stable')
+        item_ids = records['item_id'][order]
+
+        boundaries = numpy.flatnonzero(numpy.diff(item_ids)) + 1
+        starts = numpy.concatenate(([0], boundaries, [len(records)])).astype(numpy.int64)
+        unique_ids = item_ids[starts[:-1]].astype(numpy.int64)
+
+        # The ids are padded to the length of `starts` to save both as one
+        #  array. The index is written first, the `.items` file marking the
+        #  segment as sealed
+        _write_atomically(self.index_path, lambda f: numpy.save(f, numpy.stack((
+            numpy.append(unique_ids, -1), starts))))
+        _write_atomically(self.items_path, lambda f: records[order].tofile(f))
+
+    def window(self, start, end):
+        """Returns a view of the records from `start` (inclusive) to `end` (exclusive)"""
+        records = self.records()
+        return records[_time_slice(records['timestamp'], start, end)]
+
+    def item(self, item_id, start, end):
+        """Returns the records of an item from `start` to `end`, a view once the segment is sealed"""
+        if self.sealed:
+            item_ids, starts = self._load_index()
+            position = numpy.searchsorted(item_ids[:-1], item_id)
+            if position == len(item_ids) - 1 or item_ids[position] != item_id:
+                return numpy.zeros(0, dtype=self.dtype)
+
+            records = self._load_items()[starts[position]:starts[position + 1]]
+        else:
+            records = self.records()
+            _, order, sorted_item_ids = self._load_active_index(records)
+            rows = order[numpy.searchsorted(sorted_item_ids, item_id, 'left'):
+                         numpy.searchsorted(sorted_item_ids, item_id, 'right')]
+            records = records[rows]
+
+        return records[_time_slice(records['timestamp'], start, end)]
+
+    def close(self):
+        self._records = self._items = self._index = self._active_index = None
+
+    def _load_items(self):
+        if self._items is None:
+            self._items = numpy.memmap(self.items_path, dtype=self.dtype, mode='r')
+        return self._items
+
+    def _load_index(self):
+        if self._index is None:
+            self._index = numpy.load(self.index_path, mmap_mode='r')
+        return self._index
+
+    def _load_active_index(self, records):
+        # Built in memory, and again whenever records were appended since
+        if self._active_index is None or self._active_index[0] != len(records):
+            order = numpy.argsort(records['item_id'], kind='stable')
+            self._active_index = (len(records), order, records['item_id'][order])
+        return self._active_index
+
+
+class PriceHistory:
+    """
+    Time series of trading post prices, stored in memory-mapped segment files.
+
+    Every record holds the `timestamp` (in seconds since the epoch), the
+     `item_id` and the `buy_price`, `buy_qty`, `sell_price` and `sell_qty` of
+     an item, packed in 28 bytes. Records are only ever appended, in time
+     order, to segment files of `segment_records` records. Full segments are
+     indexed by item, so that reads of a single item do not scan them.
+
+    Reads return NumPy structured arrays mapped straight from the segment
+     files: nothing is decoded, and only the pages read are loaded. A time
+     window, or the rows of an item within a full segment, is a view of the
+     file rather than a copy. Requires NumPy.
+
+    >>> history = PriceHistory('prices/')
+    >>> client.commerceprices.sweep(sink=history.append)
+    >>> records = history.item(19684, start=time.time() - 7 * 24 * 60 * 60)
+    >>> records['timestamp'], records['sell_price'] - records['buy_price']
+    (memmap([1576713600, 1576713900, ...]), memmap([5, 4, 7, ...]))
+    """
+
+    SEGMENT_RECORDS = 1 << 20
+
+    def __init__(self, path, segment_records=SEGMENT_RECORDS):
+        """
+        :param path: The directory of the segment files, created if missing
+        :param segment_records: Number of records per segment file, only used
+                                 when creating the history: an existing one
+                                 keeps the size it was created with
+        """
+        if numpy is None:
+            raise ImportError('PriceHistory requires numpy, install it with '
+                              '`pip install GuildWars2-API-Client[numpy]`')
+
+        self.path = path
+        self.dtype = _record_dtype()
+        self._lock = threading.Lock()
+
+        if segment_records < 1:
+            raise ValueError('PriceHistory requires a `segment_records` of at least 1')
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, 'history.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['record_size'] != self.dtype.itemsize:
+                raise ValueError(f'{path} holds records of {meta["record_size"]} bytes, '
+                                 f'expected {self.dtype.itemsize}')
+            segment_records = meta['segment_records']
+        else:
+            meta = {'record_size': self.dtype.itemsize, 'segment_records': segment_records}
+            _write_atomically(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+
+        self.segment_records = segment_records
+
+        self._segments = []
+        self._refresh()
+
+    def append(self, sweep):
+        """
+        Appends the rows of a `PriceSweep` in a single write per segment.
+
+        Can be given as the `sink` of `CommercePrices.sweep` to record a sweep
+         as it arrives.
+
+        :returns: The number of records appended
+        :raises ValueError: If the sweep is older than the last records
+        """
+        records = numpy.empty(len(sweep), dtype=self.dtype)
+        records['timestamp'] = int(sweep.timestamp)
+        for column in ('item_id', 'buy_price', 'buy_qty', 'sell_price', 'sell_qty'):
+            records[column] = numpy.frombuffer(getattr(sweep, column), dtype=numpy.int32)
+
+        return self.append_records(records)
+
+    def append_records(self, records):
+        """Appends a structured array of `dtype` records, in time order"""
+        records = numpy.ascontiguousarray(records, dtype=self.dtype)
+        if not len(records):
+            return 0
+        if numpy.any(numpy.diff(records['timestamp']) < 0):
+            raise ValueError('Records must be appended in time order')
+
+        with self._lock:
+            self._refresh()
+            last = self.last_timestamp
+            if last is not None and records['timestamp'][0] < last:
+                raise ValueError(f'Cannot append records from {records["timestamp"][0]}, '
+                                 f'the history already reaches {last}')
+
+            written = 0
+            while written < len(records):
+                segment = self._segments[-1]
+                count = segment.count
+                if count == segment.capacity:
+                    segment.seal()
+                    segment = self._add_segment()
+                    count = 0
+
+                chunk = records[written:written + segment.capacity - count]
+                with open(segment.path, 'ab') as f:
+                    # Drop what is left of a torn write, if any, before appending
+                    f.truncate(count * self.dtype.itemsize)
+                    f.write(chunk.tobytes())
+                written += len(chunk)
+
+            if self._segments[-1].count == self.segment_records:
+                self._segments[-1].seal()
+                self._add_segment()
+
+        return written
+
+    def item(self, item_id, start=None, end=None):
+        """
+        Returns the records of an item, in time order.
+
+        :param start: First timestamp included, defaults to the first records
+        :param end: First timestamp excluded, defaults to after the last records
+        """
+        return _concatenate(list(self.iter_item(item_id, start, end)), self.dtype)
+
+    def window(self, start=None, end=None):
+        """Returns the records of every item from `start` (inclusive) to `end` (exclusive), in time order"""
+        return _concatenate(list(self.iter_window(start, end)), self.dtype)
+
+    def iter_item(self, item_id, start=None, end=None):
+        """Yields the records of an item segment by segment, see `item`"""
+        for segment in self._overlapping(start, end):
+            records = segment.item(item_id, start, end)
+            if len(records):
+                yield records
+
+    def iter_window(self, start=None, end=None):
+        """Yields the records of a time window segment by segment, as views of the files"""
+        for segment in self._overlapping(start, end):
+            records = segment.window(start, end)
+            if len(records):
+                yield records
+
+    @property
+    def first_timestamp(self):
+        records = self._segments[0].records()
+        return int(records['timestamp'][0]) if len(records) else None
+
+    @property
+    def last_timestamp(self):
+        for segment in reversed(self._segments):
+            records = segment.records()
+            if len(records):
+                return int(records['timestamp'][-1])
+        return None
+
+    def close(self):
+        """Releases the memory maps, which are opened again by the next read"""
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+
+    def _overlapping(self, start, end):
+        with self._lock:
+            self._refresh()
+            segments = list(self._segments)
+
+        for segment in segments:
+            timestamps = segment.records()['timestamp']
+            if not len(timestamps):
+                continue
+            if start is not None and timestamps[-1] < start:
+                continue
+            if end is not None and timestamps[0] >= end:
+                break
+            yield segment
+
+    def _refresh(self):
+        """Picks up segments added since, i.e. by another process appending to the same history"""
+        if not self._segments:
+            self._add_segment()
+
+        while True:
+            segment = self._segments[-1]
+            if segment.count < segment.capacity:
+                break
+            # Sealing may have been interrupted, in which case it is done again
+            if not segment.sealed:
+                segment.seal()
+            self._add_segment()
+
+    def _add_segment(self):
+        segment = _Segment(self.path, len(self._segments), self.segment_records, self.dtype)
+        self._segments.append(segment)
+        return segment
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return sum(segment.count for segment in self._segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return '<PriceHistory %r\nRecords: %r\nSegments: %r>' % (self.path, len(self), len(self._segments))
+
+
+def _time_slice(timestamps, start, end):
+    """Slice of the sorted `timestamps` from `start` (inclusive) to `end` (exclusive)"""
+    first = 0 if start is None else numpy.searchsorted(timestamps, start, 'left')
+    last = len(timestamps) if end is None else numpy.searchsorted(timestamps, end, 'left')
+    return slice(int(first), int(last))
+
+
+def _concatenate(parts, dtype):
+    # A single part is returned as is, to keep it a view of its file
+    if len(parts) == 1:
+        return parts[0]
+    if not parts:
+        return numpy.zeros(0, dtype=dtype)
+    return numpy.concatenate(parts)
+
+
+def _write_atomically(path, write):
+    """Writes a file through a temporary file, so that it is either complete or missing"""
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        write(f)
+    os.replace(temporary_path, path)
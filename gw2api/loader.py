@@ -0,0 +1,249 @@
+"""Batching of single-id lookups into `ids=` requests"""
+
+import abc
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+
+class RecordNotFound(KeyError):
+    """Raised for an id the API did not return a record for"""
+
+    def __init__(self, object_type, record_id):
+        super().__init__(object_type, record_id)
+        self.object_type = object_type
+        self.record_id = record_id
+
+    def __str__(self):
+        return f'No {self.object_type} record with id {self.record_id!r}'
+
+
+class _Batch:
+    """Ids requested within a window, mapped to the future of their record"""
+
+    def __init__(self):
+        self.futures = {}
+        self.ids = []
+
+
+class _BaseBatchLoader(abc.ABC):
+    """Collection of ids into batches, shared by the blocking and asynchronous loaders"""
+
+    def __init__(self, api_object, window=0.005, max_batch_size=None):
+        self.api_object = api_object
+        self.window = window
+        self.max_batch_size = max_batch_size or api_object.MAX_IDS_PER_REQUEST
+
+        self._batch = None
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def load_many(self, record_ids):
+        """Requests the records of `record_ids`, returning a list of futures"""
+        return [self.load(record_id) for record_id in record_ids]
+
+    def flush(self):
+        """Sends the pending batch without waiting for the window to end"""
+        with self._lock:
+            batch = self._take()
+
+        if batch is not None:
+            self._dispatch(batch)
+
+    def _add(self, record_id, create_future):
+        """
+        Adds an id to the pending batch, the lock must be held.
+
+        :returns: The future of the id, along with the batch if it is now full
+        """
+        if self._batch is None:
+            self._batch = _Batch()
+
+        batch = self._batch
+        key = str(record_id)
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = create_future()
+            batch.ids.append(record_id)
+
+        if len(batch.ids) < self.max_batch_size:
+            return future, None
+        return future, self._take()
+
+    def _take(self):
+        """Detaches the pending batch, the lock must be held"""
+        batch, self._batch = self._batch, None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _settle(self, batch, records=(), error=None):
+        """Resolves the futures of a batch with their records, or with `error`"""
+        # The API answers with a 404 when none of the ids exist
+        if isinstance(error, requests.HTTPError) and error.response is not None \
+                and error.response.status_code == 404:
+            error = None
+
+        by_id = {str(record['id']): record for record in records}
+
+        for record_id in batch.ids:
+            future = batch.futures[str(record_id)]
+            if future.done():  # Cancelled by its caller
+                continue
+
+            if error is not None:
+                future.set_exception(error)
+            elif str(record_id) in by_id:
+                future.set_result(by_id[str(record_id)])
+            else:
+                future.set_exception(RecordNotFound(self.api_object.object_type, record_id))
+
+    @abc.abstractmethod
+    def _dispatch(self, batch):
+        """Sends the request of a full or expired batch"""
+
+    def __repr__(self):
+        return '<%s %r\nWindow: %r>' % (self.__class__.__name__, self.api_object.object_type, self.window)
+
+
+class BatchLoader(_BaseBatchLoader):
+    """
+    Collects single-id lookups of a `BaseAPIv2Object` and resolves them in batches.
+
+    Ids requested through `load` within `window` seconds of the first one (or
+     until `max_batch_size` ids have been collected) are resolved by a single
+     `ids=` request, sent from a thread pool so that full batches do not wait
+     on each other. An id requested twice within a batch shares one future.
+     Ids the API does not return a record for resolve to `RecordNotFound`.
+
+    >>> loader = client.items.loader()
+    >>> futures = [loader.load(item_id) for item_id in item_ids]
+    >>> items = [future.result() for future in futures]
+    """
+
+    def __init__(self, api_object, window=0.005, max_batch_size=None, max_workers=None):
+        """
+        :param api_object: The `BaseAPIv2Object` to resolve ids with
+        :param window: Seconds to wait for more ids after the first one of a batch
+        :param max_batch_size: Number of ids after which a batch is sent right
+                                away, defaults to `MAX_IDS_PER_REQUEST`
+        :param max_workers: Number of batches sent concurrently, defaults to
+                             `MAX_WORKERS` of the API object
+        """
+        super().__init__(api_object, window=window, max_batch_size=max_batch_size)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or api_object.MAX_WORKERS,
+                                            thread_name_prefix='gw2api-loader')
+
+    def load(self, record_id):
+        """Requests the record of `record_id`, returning a `concurrent.futures.Future` of it"""
+        with self._lock:
+            future, batch = self._add(record_id, Future)
+            if batch is None and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch is not None:
+            self._dispatch(batch)
+        return future
+
+    def close(self):
+        """Sends the pending batch and waits for every batch to be resolved"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self, batch):
+        self._executor.submit(self._resolve, batch)
+
+    def _resolve(self, batch):
+        # Futures cancelled by their callers are dropped, the others can no
+        #  longer be cancelled so that they are all settled below
+        for key, future in list(batch.futures.items()):
+            if not future.set_running_or_notify_cancel():
+                del batch.futures[key]
+        batch.ids = [record_id for record_id in batch.ids if str(record_id) in batch.futures]
+        if not batch.ids:
+            return
+
+        try:
+            records = self.api_object.get(ids=batch.ids)
+        except BaseException as e:
+            self._settle(batch, error=e)
+        else:
+            self._settle(batch, records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AsyncBatchLoader(_BaseBatchLoader):
+    """
+    asyncio counterpart of `BatchLoader`, for `AsyncGuildWars2Client` endpoints.
+
+    `load` returns an `asyncio.Future`, batches are sent as tasks of the
+     running event loop.
+
+    >>> loader = client.items.loader()
+    >>> items = await asyncio.gather(*loader.load_many(item_ids))
+    """
+
+    def __init__(self, api_object, window=0.005, max_batch_size=None):
+        """
+        :param api_object: The `AsyncAPIObject` to resolve ids with
+        :param window: Seconds to wait for more ids after the first one of a batch
+        :param max_batch_size: Number of ids after which a batch is sent right
+                                away, defaults to `MAX_IDS_PER_REQUEST`
+        """
+        super().__init__(api_object, window=window, max_batch_size=max_batch_size)
+
+        self._tasks = set()
+
+    def load(self, record_id):
+        """Requests the record of `record_id`, returning an `asyncio.Future` of it"""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            future, batch = self._add(record_id, loop.create_future)
+            if batch is None and self._timer is None:
+                self._timer = loop.call_later(self.window, self.flush)
+
+        if batch is not None:
+            self._dispatch(batch)
+        return future
+
+    async def close(self):
+        """Sends the pending batch and waits for every batch to be resolved"""
+        self.flush()
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+    def _dispatch(self, batch):
+        task = asyncio.ensure_future(self._resolve(batch))
+        # The loop only keeps weak references to its tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch):
+        try:
+            records = await self.api_object.get(ids=batch.ids)
+        except asyncio.CancelledError:
+            for future in batch.futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            self._settle(batch, error=e)
+        else:
+            self._settle(batch, records)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
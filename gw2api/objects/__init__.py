@@ -0,0 +1,21 @@
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def api_objects(version):
+    """
+    Returns the API objects of a version of the API, keyed by the name of the
+     client attribute they are exposed as (i.e. `commercetransactions`).
+
+    The objects are only built once per process, and only hold the route of
+     their endpoint. Clients copy them on first access and attach their session.
+    """
+    if version == 'v1':
+        from gw2api.objects.api_version_1 import API_OBJECTS
+    elif version == 'v2':
+        from gw2api.objects.api_version_2 import API_OBJECTS
+    else:
+        raise ValueError('Unable to import API Objects, make '
+                         'sure the version passed is valid - ' + version)
+
+    return {object_.__class__.__name__.lower(): object_ for object_ in API_OBJECTS}
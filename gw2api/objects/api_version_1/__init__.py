@@ -5,28 +5,28 @@ class Build(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('build_id')
+        return self._decode(response).get('build_id')
 
 
 class Colors(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('colors')
+        return self._decode(response).get('colors')
 
 
 class Continents(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('continents')
+        return self._decode(response).get('continents')
 
 
 class EventDetails(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('events')
+        return self._decode(response).get('events')
 
 
 class EventNames(BaseAPIObject):
@@ -45,7 +45,7 @@ class Files(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json()
+        return self._decode(response)
 
 
 class GuildDetails(BaseAPIObject):
@@ -75,14 +75,14 @@ class GuildDetails(BaseAPIObject):
         endpoint_url.rstrip('&')
 
         response = self.session.get(endpoint_url)
-        return response.json()
+        return self._decode(response)
 
 
 class Items(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('items')
+        return self._decode(response).get('items')
 
 
 class ItemDetails(BaseAPIObject):
@@ -90,7 +90,7 @@ class ItemDetails(BaseAPIObject):
     def get(self, item_id):
         endpoint_url = self._build_endpoint_base_url() + '?item_id=%s' % item_id
         response = self.session.get(endpoint_url)
-        return response.json()
+        return self._decode(response)
 
 
 class Maps(BaseAPIObject):
@@ -102,14 +102,14 @@ class Maps(BaseAPIObject):
             endpoint_url += '?%s' % map_id
 
         response = self.session.get(endpoint_url)
-        return response.json().get('maps')
+        return self._decode(response).get('maps')
 
 
 class MapNames(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json()
+        return self._decode(response)
 
 
 class MapFloor(BaseAPIObject):
@@ -117,14 +117,14 @@ class MapFloor(BaseAPIObject):
     def get(self, continent_id, floor):
         endpoint_url = self._build_endpoint_base_url() + '?continent_id=%s&floor=%s' % (continent_id, floor)
         response = self.session.get(endpoint_url)
-        return response.json()
+        return self._decode(response)
 
 
 class Recipes(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('recipes')
+        return self._decode(response).get('recipes')
 
 
 class RecipeDetails(BaseAPIObject):
@@ -132,14 +132,14 @@ class RecipeDetails(BaseAPIObject):
     def get(self, recipe_id):
         endpoint_url = self._build_endpoint_base_url() + '?recipe_id=%s' % recipe_id
         response = self.session.get(endpoint_url)
-        return response.json()
+        return self._decode(response)
 
 
 class Skins(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('skins')
+        return self._decode(response).get('skins')
 
 
 class SkinDetails(BaseAPIObject):
@@ -147,21 +147,21 @@ class SkinDetails(BaseAPIObject):
     def get(self, skin_id):
         endpoint_url = self._build_endpoint_base_url() + '?skin_id=%s' % skin_id
         response = self.session.get(endpoint_url)
-        return response.json()
+        return self._decode(response)
 
 
 class WorldNames(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json()
+        return self._decode(response)
 
 
 class WvWMatches(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json().get('wvw_matches')
+        return self._decode(response).get('wvw_matches')
 
 
 class WvWMatchDetails(BaseAPIObject):
@@ -169,14 +169,14 @@ class WvWMatchDetails(BaseAPIObject):
     def get(self, match_id):
         endpoint_url = self._build_endpoint_base_url() + '?match_id=%s' % match_id
         response = self.session.get(endpoint_url)
-        return response.json()
+        return self._decode(response)
 
 
 class WvWObjectiveNames(BaseAPIObject):
 
     def get(self):
         response = super().get()
-        return response.json()
+        return self._decode(response)
 
 
 API_OBJECTS = [Build('build'),
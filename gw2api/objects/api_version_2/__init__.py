@@ -1,15 +1,266 @@
+import collections
+import copy
+import functools
+import hashlib
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote
+
+import requests
+
+from gw2api.continents import ContinentsCrawler
+from gw2api.loader import BatchLoader
 from gw2api.objects.base_object import BaseAPIObject
+from gw2api.stream import iter_json
 
 
 class BaseAPIv2Object(BaseAPIObject):
     """Extends the base API handler to automatically handle pagination and id parameters"""
 
+    # The API refuses to resolve more ids than this in a single request
+    MAX_IDS_PER_REQUEST = 200
+    # Largest `page_size` the API accepts
+    MAX_PAGE_SIZE = 200
+    # Default number of requests sent concurrently when fanning out
+    MAX_WORKERS = 8
+    # Permissions (scopes) an API key needs for the endpoint, if authenticated
+    PERMISSIONS = ()
+
     def get(self, **kwargs):
-        return super().get(id=kwargs.get('id'),
-                           ids=kwargs.get('ids'),
-                           url=kwargs.get('url'),
-                           page=kwargs.get('page'),
-                           page_size=kwargs.get('page_size')).json()
+        disk_cache = getattr(self.session, 'disk_cache', None)
+        if disk_cache is not None and self.object_type in disk_cache.endpoints:
+            return self._get_through_disk_cache(disk_cache, **kwargs)
+
+        return self._get(**kwargs)
+
+    def _get(self, **kwargs):
+        ids = kwargs.get('ids')
+        if ids is not None and not isinstance(ids, str):
+            try:
+                ids = list(ids)
+            except TypeError:
+                pass  # Leave it to the base object to report the invalid `ids`
+            else:
+                if len(ids) > self.MAX_IDS_PER_REQUEST:
+                    return list(self.iter_ids(ids, url=kwargs.get('url'), max_workers=kwargs.get('max_workers')))
+
+        response = super().get(id=kwargs.get('id'),
+                               ids=ids,
+                               url=kwargs.get('url'),
+                               page=kwargs.get('page'),
+                               page_size=kwargs.get('page_size'))
+        return self._decode(response)
+
+    def _get_through_disk_cache(self, disk_cache, **kwargs):
+        """Serves a request from a `PersistentCache`, only requesting what it is missing from the API"""
+        if disk_cache.build_id is None:
+            disk_cache.set_build_id(self._get_build_id())
+        namespace = disk_cache.namespace(self.session.headers.get('Accept-Language'))
+
+        _id = kwargs.get('id')
+        ids = kwargs.get('ids')
+        url = kwargs.get('url')
+
+        if url is None and _id:
+            records = disk_cache.get_records(namespace, self.object_type, [_id])
+            if str(_id) not in records:
+                records[str(_id)] = self._get(id=_id)
+                disk_cache.set_records(namespace, self.object_type, [records[str(_id)]])
+
+            return records[str(_id)]
+
+        if url is None and ids and not isinstance(ids, str):
+            ids = list(ids)
+            records = disk_cache.get_records(namespace, self.object_type, ids)
+            missing = [_ for _ in ids if str(_) not in records]
+
+            if missing:
+                try:
+                    fetched = self._get(ids=missing, max_workers=kwargs.get('max_workers'))
+                except requests.HTTPError as e:
+                    # The API answers with a 404 when none of the ids exist,
+                    #  which only matters if none of them were cached either
+                    if not records or e.response is None or e.response.status_code != 404:
+                        raise
+                    fetched = []
+
+                disk_cache.set_records(namespace, self.object_type, fetched)
+                records.update((str(record['id']), record) for record in fetched)
+
+            return [records[str(_)] for _ in ids if str(_) in records]
+
+        request_url = self._build_request_url(**kwargs)
+        payload = disk_cache.get_response(namespace, request_url)
+        if payload is None:
+            payload = self._get(**kwargs)
+            disk_cache.set_response(namespace, request_url, payload)
+
+        return payload
+
+    def _get_build_id(self):
+        """Requests the id of the current game build"""
+        return self._decode(BaseAPIObject.get(self, url='{}/v2/build'.format(self.base_url)))['id']
+
+    def iter_ids(self, ids, url=None, max_workers=None, ordered=True):
+        """Streams the records for any number of ids
+
+        The ids are split into requests of `MAX_IDS_PER_REQUEST` ids which are
+        sent concurrently, records are yielded as soon as their chunk arrives.
+
+            Args:
+                ids: iterable, the ids to resolve.
+                url: string, the url to use instead of building a base url.
+                max_workers: int, the number of requests sent concurrently,
+                             defaults to `MAX_WORKERS`.
+                ordered: bool, whether to yield records in the order of `ids`
+                         (default) or in the order their chunks complete.
+        """
+        get_chunk = functools.partial(self._get_chunk, url=url)
+
+        for records in self._map_concurrently(get_chunk, self._split_ids(ids), max_workers, ordered):
+            yield from records
+
+    def iter_pages(self, url=None, page_size=MAX_PAGE_SIZE, max_workers=None, ordered=False):
+        """Streams every item of a paginated endpoint
+
+        The first page is requested to learn the number of pages from the
+        `X-Page-Total` (or `X-Result-Total`) header, the remaining pages are
+        then sent concurrently and their items yielded as they arrive.
+
+        Note that pages are not a snapshot: items added to the endpoint while
+        walking it (i.e. new trading post transactions) shift later pages.
+
+            Args:
+                url: string, the url to use instead of building a base url.
+                page_size: int, the number of items per page, defaults to `MAX_PAGE_SIZE`.
+                max_workers: int, the number of requests sent concurrently,
+                             defaults to `MAX_WORKERS`.
+                ordered: bool, whether to yield pages in order rather than
+                         as they complete (default).
+        """
+        first_page = BaseAPIObject.get(self, url=url, page_size=page_size)
+        yield from self._decode(first_page)
+
+        get_page = functools.partial(self._get_page, url=url, page_size=page_size)
+        pages = range(1, self._page_total(first_page, page_size))
+
+        for items in self._map_concurrently(get_page, pages, max_workers, ordered):
+            yield from items
+
+    def get_all_pages(self, url=None, page_size=MAX_PAGE_SIZE, max_workers=None):
+        """Returns every item of a paginated endpoint, in page order. See `iter_pages`"""
+        return list(self.iter_pages(url=url, page_size=page_size, max_workers=max_workers, ordered=True))
+
+    def iter_stream(self, url=None, chunk_size=64 * 1024, **kwargs):
+        """Streams the elements of a response while it is being downloaded
+
+        The response is decoded incrementally as chunks arrive from the socket,
+        so only the element being received is held in memory rather than the
+        whole body. Arrays yield their elements, objects yield `(key, value)`
+        pairs. Streamed responses bypass the response cache.
+
+            Args:
+                url: string, the url to use instead of building a base url.
+                chunk_size: int, the number of bytes read from the socket at a time.
+                **kwargs: the same parameters as `get` (`ids`, `page`, `page_size`...).
+        """
+        assert self.session is not None, "BaseObject.session is not yet instantiated. Make sure an instance " \
+                                         "of GuildWars2APIClient is created first to be able to send requests."
+
+        response = self.session.get(self._build_request_url(url, **kwargs), stream=True)
+        try:
+            response.raise_for_status()
+            yield from iter_json(response.iter_content(chunk_size))
+        finally:
+            response.close()
+
+    def loader(self, window=0.005, max_batch_size=None, max_workers=None):
+        """Returns a `BatchLoader` resolving single ids of this endpoint in batched `ids=` requests
+
+            Args:
+                window: float, the seconds to wait for more ids after the first one of a batch.
+                max_batch_size: int, the number of ids after which a batch is sent
+                                right away, defaults to `MAX_IDS_PER_REQUEST`.
+                max_workers: int, the number of batches sent concurrently,
+                             defaults to `MAX_WORKERS`.
+        """
+        return BatchLoader(self, window=window, max_batch_size=max_batch_size, max_workers=max_workers)
+
+    def _split_ids(self, ids):
+        """Splits `ids` into chunks of at most `MAX_IDS_PER_REQUEST` ids"""
+        ids = list(ids)
+        return [ids[i:i + self.MAX_IDS_PER_REQUEST] for i in range(0, len(ids), self.MAX_IDS_PER_REQUEST)]
+
+    @staticmethod
+    def _order_records(records, ids):
+        """Sorts the records of a single request in the order their ids were requested.
+
+        Ids the API does not know of are simply missing from the response,
+        records without an `id` are left in the order they were received.
+        """
+        try:
+            by_id = {str(record['id']): record for record in records}
+        except (KeyError, TypeError):
+            return records
+
+        return [by_id[str(_id)] for _id in ids if str(_id) in by_id]
+
+    @staticmethod
+    def _page_total(response, page_size):
+        """Reads the number of pages from the pagination headers of a response"""
+        page_total = response.headers.get('X-Page-Total')
+        if page_total is not None:
+            return int(page_total)
+
+        result_total = response.headers.get('X-Result-Total')
+        if result_total is not None:
+            return -(-int(result_total) // page_size)
+
+        return 1
+
+    def _get_chunk(self, chunk, url=None):
+        try:
+            response = super().get(url=url, ids=chunk)
+        except requests.HTTPError as e:
+            # The API answers with a 404 when none of the ids exist, which
+            #  should not fail the other chunks
+            if e.response is None or e.response.status_code != 404:
+                raise
+            return []
+
+        return self._order_records(self._decode(response), chunk)
+
+    def _get_page(self, page, url=None, page_size=MAX_PAGE_SIZE):
+        return self._decode(super().get(url=url, page=page, page_size=page_size))
+
+    def _map_concurrently(self, func, args, max_workers=None, ordered=True):
+        """Calls `func` for every item of `args` on a bounded thread pool, yielding the results"""
+        args = list(args)
+        max_workers = min(max_workers or self.MAX_WORKERS, len(args)) or 1
+        args = iter(args)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Only keep a couple of calls queued per worker so that streaming
+            #  large results does not buffer all of them in memory
+            pending = collections.deque(executor.submit(func, arg)
+                                        for arg in itertools.islice(args, max_workers * 2))
+            try:
+                while pending:
+                    if ordered:
+                        future = pending.popleft()
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        future = done.pop()
+                        pending.remove(future)
+
+                    for arg in itertools.islice(args, 1):
+                        pending.append(executor.submit(func, arg))
+
+                    yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
 
 
 class Account(BaseAPIv2Object):
@@ -17,7 +268,7 @@ class Account(BaseAPIv2Object):
         This returns information about the player's account.
         Authenticated Endpoint.
     """
-    pass
+    PERMISSIONS = ('account',)
 
 
 class AccountAchievements(BaseAPIv2Object):
@@ -25,7 +276,7 @@ class AccountAchievements(BaseAPIv2Object):
         This returns information about the player's progress on achievements.
         Authenticated Endpoint.
     """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountBank(BaseAPIv2Object):
@@ -33,7 +284,7 @@ class AccountBank(BaseAPIv2Object):
         This returns the items stored in a player's vault.
         Authenticated Endpoint.
     """
-    pass
+    PERMISSIONS = ('account', 'inventories')
 
 
 class AccountBuildStorage(BaseAPIv2Object):
@@ -41,7 +292,7 @@ class AccountBuildStorage(BaseAPIv2Object):
          This returns the templates stored in a player's build storage.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'builds')
 
 
 class AccountDailyCrafting(BaseAPIv2Object):
@@ -49,7 +300,7 @@ class AccountDailyCrafting(BaseAPIv2Object):
          This returns information about time-gated recipes that have been crafted by the account since daily-reset.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountDungeons(BaseAPIv2Object):
@@ -57,7 +308,7 @@ class AccountDungeons(BaseAPIv2Object):
          This resource returns the dungeons completed since daily dungeon reset.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountDyes(BaseAPIv2Object):
@@ -65,7 +316,7 @@ class AccountDyes(BaseAPIv2Object):
          This returns the unlocked dyes of the account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountEmote(BaseAPIv2Object):
@@ -73,7 +324,7 @@ class AccountEmote(BaseAPIv2Object):
          This returns the player's unlocked emotes.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountFinishers(BaseAPIv2Object):
@@ -81,7 +332,7 @@ class AccountFinishers(BaseAPIv2Object):
          This returns information about finishers that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountGliders(BaseAPIv2Object):
@@ -89,7 +340,7 @@ class AccountGliders(BaseAPIv2Object):
          This returns information about gliders that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountHomeCats(BaseAPIv2Object):
@@ -97,7 +348,7 @@ class AccountHomeCats(BaseAPIv2Object):
          This returns information about unlocked home instance cats.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountHomeNodes(BaseAPIv2Object):
@@ -105,7 +356,7 @@ class AccountHomeNodes(BaseAPIv2Object):
          This returns information about unlocked home instance nodes.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountInventory(BaseAPIv2Object):
@@ -113,7 +364,7 @@ class AccountInventory(BaseAPIv2Object):
          This returns the shared inventory slots in an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'inventories')
 
 
 class AccountLuck(BaseAPIv2Object):
@@ -121,7 +372,7 @@ class AccountLuck(BaseAPIv2Object):
          This returns the total amount of luck consumed on an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountMailCarriers(BaseAPIv2Object):
@@ -129,7 +380,7 @@ class AccountMailCarriers(BaseAPIv2Object):
          This returns information about mail carriers that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountMapChests(BaseAPIv2Object):
@@ -137,7 +388,7 @@ class AccountMapChests(BaseAPIv2Object):
          This returns information about Hero's Choice Chests acquired by the account since daily-reset.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountMasteries(BaseAPIv2Object):
@@ -145,7 +396,7 @@ class AccountMasteries(BaseAPIv2Object):
          This returns information about masteries that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountMasteryPoints(BaseAPIv2Object):
@@ -153,7 +404,7 @@ class AccountMasteryPoints(BaseAPIv2Object):
          This returns information about the total amount of masteries that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountMaterials(BaseAPIv2Object):
@@ -161,7 +412,7 @@ class AccountMaterials(BaseAPIv2Object):
          This returns the materials stored in a player's vault.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'inventories')
 
 
 class AccountMinis(BaseAPIv2Object):
@@ -169,7 +420,7 @@ class AccountMinis(BaseAPIv2Object):
          This returns the unlocked miniatures of the account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountMountsSkins(BaseAPIv2Object):
@@ -177,7 +428,7 @@ class AccountMountsSkins(BaseAPIv2Object):
          This returns the unlocked mount skins of the account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountMountsTypes(BaseAPIv2Object):
@@ -185,7 +436,7 @@ class AccountMountsTypes(BaseAPIv2Object):
          This returns the unlocked mounts of the account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountNovelties(BaseAPIv2Object):
@@ -193,7 +444,7 @@ class AccountNovelties(BaseAPIv2Object):
          This returns information about novelties that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountOutfits(BaseAPIv2Object):
@@ -201,7 +452,7 @@ class AccountOutfits(BaseAPIv2Object):
          This returns information about outfits that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountPvPHeroes(BaseAPIv2Object):
@@ -209,7 +460,7 @@ class AccountPvPHeroes(BaseAPIv2Object):
          This returns information about pvp heroes that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountRaids(BaseAPIv2Object):
@@ -217,7 +468,7 @@ class AccountRaids(BaseAPIv2Object):
          This returns the completed raid encounters since weekly raid reset.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class AccountRecipes(BaseAPIv2Object):
@@ -225,7 +476,7 @@ class AccountRecipes(BaseAPIv2Object):
          This returns information about recipes that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountSkins(BaseAPIv2Object):
@@ -233,7 +484,7 @@ class AccountSkins(BaseAPIv2Object):
          This returns the unlocked skins of the account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountTitles(BaseAPIv2Object):
@@ -241,7 +492,7 @@ class AccountTitles(BaseAPIv2Object):
          This returns information about titles that are unlocked for an account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'unlocks')
 
 
 class AccountWallet(BaseAPIv2Object):
@@ -249,7 +500,7 @@ class AccountWallet(BaseAPIv2Object):
          This returns the currencies of the account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'wallet')
 
 
 class AccountWorldBosses(BaseAPIv2Object):
@@ -257,7 +508,7 @@ class AccountWorldBosses(BaseAPIv2Object):
          This returns information about which world bosses have been killed by the account since daily-reset.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'progression')
 
 
 class Achievements(BaseAPIv2Object):
@@ -321,7 +572,73 @@ class Characters(BaseAPIv2Object):
          This returns information about characters attached to a specific account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'characters')
+
+    # Schema of the records of `characters?ids=all` that `iter_all` relies on
+    SCHEMA_VERSION = '2019-12-19T00:00:00.000Z'
+    # Sub-endpoints whose data is part of those records, and the field it is found in
+    RECORD_FIELDS = {
+        'backstory': 'backstory',
+        'buildtabs': 'build_tabs',
+        'core': None,  # The top-level fields of the record
+        'crafting': 'crafting',
+        'equipment': 'equipment',
+        'equipmenttabs': 'equipment_tabs',
+        'inventory': 'bags',
+        'recipes': 'recipes',
+        'training': 'training',
+    }
+
+    def iter_all(self, sub_endpoints=(), max_workers=None):
+        """Streams every character of the account along with the sub-endpoints asked for
+
+        All characters are requested at once with `ids=all`, whose records
+        already hold the data of most sub-endpoints (see `RECORD_FIELDS`).
+        The other sub-endpoints (i.e. 'heropoints', 'quests', 'sab') are
+        requested concurrently for every character, and stored in the record
+        under the name of the sub-endpoint. Characters are yielded as soon as
+        their sub-endpoints have all arrived.
+
+            Args:
+                sub_endpoints: iterable, the names of the sub-endpoints needed,
+                               as in `characters/:id/<name>`.
+                max_workers: int, the number of requests sent concurrently,
+                             defaults to `MAX_WORKERS`.
+
+            Yields:
+                The name of each character along with its record.
+        """
+        sub_endpoints = list(sub_endpoints)
+        known = {api_object.object_type[len('characters/:id/'):] for api_object in API_OBJECTS
+                 if api_object.object_type.startswith('characters/:id/')}
+        unknown = set(sub_endpoints) - known
+        if unknown:
+            raise ValueError(f'Unknown character sub-endpoints: {", ".join(sorted(unknown))}')
+
+        requested = [name for name in sub_endpoints if name not in self.RECORD_FIELDS]
+        characters = self._decode(BaseAPIObject.get(self, ids='all', schema_version=self.SCHEMA_VERSION))
+
+        if not requested:
+            for character in characters:
+                yield character['name'], character
+            return
+
+        # Decoded records may be shared with the response cache, so sub-endpoints are added to copies
+        by_name = {character['name']: dict(character) for character in characters}
+        remaining = collections.Counter({name: len(requested) for name in by_name})
+
+        pairs = [(name, sub_endpoint) for name in by_name for sub_endpoint in requested]
+        for name, sub_endpoint, payload in self._map_concurrently(self._get_sub_endpoint, pairs, max_workers,
+                                                                  ordered=False):
+            by_name[name][sub_endpoint] = payload
+            remaining[name] -= 1
+            if not remaining[name]:
+                yield name, by_name.pop(name)
+
+    def _get_sub_endpoint(self, pair):
+        name, sub_endpoint = pair
+        url = '{}/{}/{}'.format(self._build_endpoint_base_url(), quote(name, safe=''), sub_endpoint)
+        return name, sub_endpoint, self._decode(BaseAPIObject.get(self, url=url))
 
 
 class CharactersBackstory(BaseAPIv2Object):
@@ -329,6 +646,8 @@ class CharactersBackstory(BaseAPIv2Object):
          This returns information about the backstory of a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -350,6 +669,8 @@ class CharactersBuildTabs(BaseAPIv2Object):
          This returns information about an accounts build template tabs.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -372,6 +693,8 @@ class CharactersBuildTabsActive(BaseAPIv2Object):
          Only those flagged True in is_active are returned.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -393,6 +716,8 @@ class CharactersCore(BaseAPIv2Object):
          This returns core information about a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -415,6 +740,8 @@ class CharactersCrafting(BaseAPIv2Object):
          to a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -436,6 +763,8 @@ class CharactersEquipment(BaseAPIv2Object):
          This returns information about the equipment on a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -457,6 +786,8 @@ class CharactersEquipmentTabs(BaseAPIv2Object):
          This returns information about an accounts equipment template tabs.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -479,6 +810,8 @@ class CharactersEquipmentTabsActive(BaseAPIv2Object):
          Only those flagged True in is_active are returned.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -500,6 +833,8 @@ class CharactersHeroPoints(BaseAPIv2Object):
          This returns information about the hero points obtained by a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'progression')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -521,6 +856,8 @@ class CharactersInventory(BaseAPIv2Object):
          This returns information about the inventory of a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'inventories')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -542,6 +879,8 @@ class CharactersQuests(BaseAPIv2Object):
          This returns information about the quests selected that by a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'progression')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -563,6 +902,8 @@ class CharactersRecipes(BaseAPIv2Object):
          This returns information about recipes that the given character can use.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'inventories')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -584,6 +925,8 @@ class CharactersSab(BaseAPIv2Object):
          This returns information about Super Adventure Box on a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'progression')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -605,6 +948,8 @@ class CharactersSkills(BaseAPIv2Object):
          This returns information about the skills equipped on a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -626,6 +971,8 @@ class CharactersSpecialization(BaseAPIv2Object):
          This returns information about the specializations equipped on a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
+
     def get(self, char_id, **kwargs):
         """
             This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -647,6 +994,7 @@ class CharactersTraining(BaseAPIv2Object):
          This returns information about the training of a character attached to a specific account.
          Authenticated Endpoint.
      """
+    PERMISSIONS = ('account', 'characters', 'builds')
 
     def get(self, char_id, **kwargs):
         """
@@ -676,7 +1024,7 @@ class CommerceDelivery(BaseAPIv2Object):
          This provides access to the current items and coins available for pickup on this account.
          Authenticated Endpoint.
      """
-    pass
+    PERMISSIONS = ('account', 'tradingpost')
 
 
 class CommerceExchangeCoins(BaseAPIv2Object):
@@ -720,18 +1068,69 @@ class CommerceListings(BaseAPIv2Object):
     """
          This returns current buy and sell listings from the trading post.
      """
-    pass
+    def order_book(self, ids, max_workers=None):
+        """Returns the listings of items as an array-backed `OrderBook` (requires NumPy)
+
+        The responses are decoded straight into arrays rather than into a dict
+        per item and price level, which takes a fraction of the memory.
+
+            Args:
+                ids: iterable, the ids of the items, any number of them.
+                max_workers: int, the number of requests sent concurrently,
+                             defaults to `MAX_WORKERS`.
+        """
+        from gw2api.commerce import OrderBook  # Imports NumPy, only when needed
+
+        return OrderBook.from_responses(self._map_concurrently(self._get_chunk_body, self._split_ids(ids),
+                                                               max_workers))
+
+    def _get_chunk_body(self, chunk):
+        return self._send(self._build_request_url(ids=chunk), decode=False).content
 
 
 class CommercePrices(BaseAPIv2Object):
     """
          This returns current aggregated buy and sell listing information from the trading post.
      """
-    pass
+    def sweep(self, max_workers=None, sink=None):
+        """Reads the prices of every tradable item
+
+        The list of tradable ids is requested first, then their prices in
+        requests of `MAX_IDS_PER_REQUEST` ids sent concurrently (through the
+        client's rate limiter, if any). Rows are kept in id order.
+
+            Args:
+                max_workers: int, the number of requests sent concurrently,
+                             defaults to `MAX_WORKERS`.
+                sink: callable, called with a `PriceSweep` of every request's
+                      rows (sharing the sweep's timestamp) as they arrive, in
+                      id order, instead of collecting them.
+
+            Returns:
+                A `PriceSweep` holding every row, or none when streamed to a
+                `sink`, along with the timestamp and duration of the sweep.
+        """
+        from gw2api.commerce import PriceSweep  # Imports NumPy, only when needed
+
+        started_at, start = time.time(), time.perf_counter()
+        result = PriceSweep(started_at)
+
+        for records in self._map_concurrently(self._get_chunk, self._split_ids(self.get()), max_workers):
+            if sink is None:
+                result.add_records(records)
+            else:
+                batch = PriceSweep(started_at)
+                batch.add_records(records)
+                sink(batch)
+
+        result.duration = time.perf_counter() - start
+        return result
 
 
 class CommerceTransactions(BaseAPIv2Object):
     """Returns information on an account's past and current trading post transactions"""
+    PERMISSIONS = ('account', 'tradingpost')
+
     @property
     def session(self):
         return self._session
@@ -768,9 +1167,105 @@ class CommerceTransactions(BaseAPIv2Object):
         self.history.sells = BaseAPIv2Object(self.history.object_type + "/sells")
         self.current.buys = BaseAPIv2Object(self.current.object_type + "/buys")
         self.current.sells = BaseAPIv2Object(self.current.object_type + "/sells")
+        for api_object in (self.history, self.current, self.history.buys, self.history.sells,
+                           self.current.buys, self.current.sells):
+            api_object.PERMISSIONS = self.PERMISSIONS
 
         super().__init__(object_type)
 
+    def __copy__(self):
+        """
+        Copies the second and third-level endpoints along with the object itself,
+         so that every client ends up with its own sessions on them.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+
+        clone.history = copy.copy(self.history)
+        clone.current = copy.copy(self.current)
+        clone.history.buys = copy.copy(self.history.buys)
+        clone.history.sells = copy.copy(self.history.sells)
+        clone.current.buys = copy.copy(self.current.buys)
+        clone.current.sells = copy.copy(self.current.sells)
+
+        return clone
+
+    def sync(self, checkpoints, account=None, sides=('buys', 'sells')):
+        """Returns the transactions of the history completed since the last sync
+
+        The history of each side is paginated newest first. Pages are read
+        one at a time until the newest transaction of the previous sync is
+        reached (or one purchased before it, if it dropped out of the 90 days
+        of history), so an hourly sync usually requests a single page. The
+        first sync of an account reads every page concurrently.
+
+        The checkpoint of a side is only moved once all of its new
+        transactions were read, so a sync that fails is retried in full.
+
+            Args:
+                checkpoints: `TransactionCheckpoints`, the high-water marks
+                             read and moved.
+                account: string, the name checkpoints are stored under,
+                         defaults to a hash of the client's API key.
+                sides: iterable, the sides to sync among 'buys' and 'sells'.
+
+            Returns:
+                A dictionary of each side to its new transactions, newest first.
+        """
+        if account is None:
+            authorization = self.session.headers.get('Authorization')
+            if not authorization:
+                raise ValueError('Syncing transactions requires an API key')
+            account = hashlib.sha256(authorization.encode('utf-8')).hexdigest()
+
+        new = {}
+        for side in sides:
+            if side not in checkpoints.SIDES:
+                raise ValueError(f'Unknown side {side!r}, expected one of {", ".join(checkpoints.SIDES)}')
+
+            transactions = self._transactions_since(getattr(self.history, side), checkpoints.get(account, side))
+            if transactions:
+                checkpoints.set(account, side, transactions[0]['id'], transactions[0]['purchased'])
+            new[side] = transactions
+
+        return new
+
+    def _transactions_since(self, endpoint, checkpoint):
+        """Reads the history of a side until the transaction of `checkpoint`"""
+        # Pages would otherwise be served from the cache until it expires
+        cache = getattr(self.session, 'cache', None)
+        if cache is not None:
+            cache.invalidate(endpoint.object_type)
+
+        # Transactions completed while paging push older ones to the next page, where they are read twice
+        transactions, seen = [], set()
+        if checkpoint is None:
+            for transaction in endpoint.get_all_pages():
+                if transaction['id'] not in seen:
+                    seen.add(transaction['id'])
+                    transactions.append(transaction)
+            return transactions
+
+        last_id, last_purchased = checkpoint
+        page, page_total = 0, 1
+
+        while page < page_total:
+            response = BaseAPIObject.get(endpoint, page=page, page_size=self.MAX_PAGE_SIZE)
+            page_total = self._page_total(response, self.MAX_PAGE_SIZE)
+
+            for transaction in endpoint._decode(response):
+                # Timestamps share the same ISO 8601 format, and so sort as strings
+                if transaction['id'] == last_id or transaction['purchased'] < last_purchased:
+                    return transactions
+
+                if transaction['id'] not in seen:
+                    seen.add(transaction['id'])
+                    transactions.append(transaction)
+
+            page += 1
+
+        return transactions
+
 
 class Continents(BaseAPIv2Object):
     """
@@ -893,6 +1388,34 @@ class Continents(BaseAPIv2Object):
 
         return super().get(url=request_url)
 
+    def get_continents(self, ids='all'):
+        """Gets the records of continents, all of them by default
+
+            Args:
+                ids: list, the ids of the continents, or 'all'.
+        """
+        return super().get(ids=ids)
+
+    def get_floors(self, continent_id, ids='all'):
+        """Gets whole floors of a continent, with their regions, maps, sectors, points of interest and tasks
+
+            Args:
+                continent_id: int, the id of the continent.
+                ids: list, the ids of the floors, or 'all'.
+        """
+        return super().get(url='{}/{}/floors'.format(self._build_endpoint_base_url(), continent_id), ids=ids)
+
+    def crawler(self, max_workers=None, floors_per_request=None):
+        """Returns a `ContinentsCrawler` requesting every continent and floor concurrently
+
+            Args:
+                max_workers: int, the number of requests sent concurrently,
+                             defaults to `MAX_WORKERS`.
+                floors_per_request: int, the number of floors per request,
+                                    defaults to `ContinentsCrawler.FLOORS_PER_REQUEST`.
+        """
+        return ContinentsCrawler(self, max_workers=max_workers, floors_per_request=floors_per_request)
+
 
 class CreateSubToken(BaseAPIv2Object):
     """
@@ -900,6 +1423,8 @@ class CreateSubToken(BaseAPIv2Object):
         which can be used as a substitute for them.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account',)
+
     def get(self, expire, permissions,  **kwargs):
         """
              This appends the match_id and guild_id to the endpoint and then passes it to the parent get() function.
@@ -1029,6 +1554,8 @@ class GuildIdLog(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1036,15 +1563,15 @@ class GuildIdLog(BaseAPIv2Object):
              Args:
                  guild_id: string, the id of the guild to add to the endpoint.
                  **kwargs:
-                    since: int, the id to use as a ceiling for return values.
+                    since: int, only return the entries with an id greater than this one.
          """
         try:
             endpoint_url = self._build_endpoint_base_url()
             endpoint_url = endpoint_url.replace(':id', guild_id)
 
             since = kwargs.get('since')
-            if since:
-                endpoint_url += f'?since=={since}'
+            if since is not None:
+                endpoint_url += f'?since={since}'
 
         except TypeError:
             return super().get(**kwargs)
@@ -1058,6 +1585,8 @@ class GuildIdMembers(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1080,6 +1609,8 @@ class GuildIdRanks(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1102,6 +1633,8 @@ class GuildIdStash(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1124,6 +1657,8 @@ class GuildIdStorage(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1146,6 +1681,8 @@ class GuildIdTeams(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1168,6 +1705,8 @@ class GuildIdTreasury(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1190,6 +1729,8 @@ class GuildIdUpgrades(BaseAPIv2Object):
         The endpoint requires the scope guilds, and will only work if the API key is from the guild leader's account.
         Authenticated Endpoint.
     """
+    PERMISSIONS = ('account', 'guilds')
+
     def get(self, guild_id, **kwargs):
         """
              This appends the 'id' to the endpoint and then passes it to the parent get() function.
@@ -1371,7 +1912,7 @@ class PvPGames(BaseAPIv2Object):
         This returns information about past PvP matches the player has participated in.
         Authenticated Endpoint.
     """
-    pass
+    PERMISSIONS = ('account', 'pvp')
 
 
 class PvPHeroes(BaseAPIv2Object):
@@ -1440,7 +1981,7 @@ class PvPStandings(BaseAPIv2Object):
         This returns information about player pips.
         Authenticated Endpoint.
     """
-    pass
+    PERMISSIONS = ('account', 'pvp')
 
 
 class PvPStats(BaseAPIv2Object):
@@ -1448,7 +1989,7 @@ class PvPStats(BaseAPIv2Object):
         This returns information about wins and losses in the account's PvP matches.
         Authenticated Endpoint.
     """
-    pass
+    PERMISSIONS = ('account', 'pvp')
 
 
 class Quaggans(BaseAPIv2Object):
@@ -1,5 +1,5 @@
-from requests import Session
 from gw2api import GuildWars2Client
+from gw2api.cache import ResponseCache
 
 
 class BaseAPIObject:
@@ -55,9 +55,13 @@ class BaseAPIObject:
                 AssertionError: if page_size is less than 1 or greater than 200
         """
 
-        assert isinstance(self.session, Session), "BaseObject.session is not yet instantiated. Make sure an instance" \
-                                                  "of GuildWars2APIClient is created first to be able to send requests."
+        assert self.session is not None, "BaseObject.session is not yet instantiated. Make sure an instance " \
+                                         "of GuildWars2APIClient is created first to be able to send requests."
 
+        return self._send(self._build_request_url(url, **kwargs))
+
+    def _build_request_url(self, url=None, **kwargs):
+        """Builds the final request URL out of the arguments accepted by `get`"""
         _id = kwargs.get('id')
         ids = kwargs.get('ids')
         page = kwargs.get('page')
@@ -96,9 +100,68 @@ class BaseAPIObject:
         request_url = request_url.strip('&')  # Remove any trailing '&'
         request_url = request_url.strip('?')  # Remove any trailing '&'
 
-        response = self.session.get(request_url)
+        return request_url
+
+    def _send(self, request_url, decode=True):
+        """
+        Sends a GET request through the session, going through the response cache if there is one.
+
+        When the session coalesces requests, callers sending the same request
+         concurrently wait for the first one and share its (decoded) response.
+         Callers only reading the raw body pass `decode=False`, so that it is
+         not decoded on their behalf.
+        """
+        cache = getattr(self.session, 'cache', None)
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key(request_url, self.session.headers)
+            response = cache.get(cache_key)
+            if response is not None:
+                return response
+
+        flights = getattr(self.session, 'flights', None)
+        if flights is None:
+            return self._fetch(request_url, cache, cache_key)
+
+        def fetch():
+            response = self._fetch(request_url, cache, cache_key)
+            if decode:
+                self._decode(response)  # Once, before the followers get hold of it
+            return response
+
+        return flights.do(cache_key or ResponseCache.make_key(request_url, self.session.headers), fetch)
+
+    def _fetch(self, request_url, cache=None, cache_key=None):
+        """Requests a URL missing from the cache, revalidating the stale response if there is one"""
+        stale = cache.get_stale(cache_key) if cache is not None else None
+        if stale is not None:
+            response = self.session.get(request_url, headers=cache.validators(stale))
+            if response.status_code == 304:
+                cache.revalidate(cache_key, self.object_type)
+                return stale
+        else:
+            response = self.session.get(request_url)
+
         response.raise_for_status()
-        return response    
+        if cache is not None:
+            cache.set(cache_key, response, self.object_type)
+        return response
+
+    def _decode(self, response):
+        """
+        Decodes the JSON body of a response, with the decoder of the session if
+         it has one. The payload is kept on the response, so that cached
+         responses are only ever decoded once.
+        """
+        try:
+            return response.gw2api_payload
+        except AttributeError:
+            json_decoder = getattr(self.session, 'json_decoder', None)
+            if json_decoder is not None:
+                response.gw2api_payload = json_decoder(response.content)
+            else:
+                response.gw2api_payload = response.json()
+            return response.gw2api_payload
 
     def _build_endpoint_base_url(self):
         """Construct the base URL to access an API object"""
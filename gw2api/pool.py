@@ -0,0 +1,204 @@
+"""Scheduling of authenticated requests across many API keys"""
+
+import collections
+import threading
+from concurrent.futures import Future, as_completed
+
+from gw2api import GuildWars2Client
+from gw2api.ratelimit import CompositeRateLimiter, TokenBucket
+
+
+class ClientPool:
+    """
+    Holds a `GuildWars2Client` per API key behind a single transport.
+
+    Every client sends its requests through the same connection pool and
+     takes a token from its key's own budget as well as from the budget
+     shared by every key. Work submitted for a key runs on the pool's worker
+     threads, which serve keys in turn (round-robin) so that a key with a
+     long backlog (i.e. paging through years of trading post history) does
+     not hold back the others.
+
+    >>> pool = ClientPool(api_keys, max_workers=32, rate_limit=50, key_rate_limit=5)
+    >>> for api_key, future in pool.map(lambda client: client.account.get()):
+    ...     accounts[api_key] = future.result()
+    """
+
+    def __init__(self, api_keys=(), max_workers=16, rate_limit=None, burst=None, rate_limiter=None,
+                 key_rate_limit=None, key_burst=None, http_adapter=None, **client_kwargs):
+        """
+        :param api_keys: The API keys to start with, more can be added with `add_key`
+        :param max_workers: Number of calls run at the same time, across keys
+        :param rate_limit: Maximum sustained number of requests per second, across keys
+        :param burst: Number of requests that may be sent at once across keys,
+                       defaults to `rate_limit`
+        :param rate_limiter: A `TokenBucket` shared by every key instead of
+                              building one from `rate_limit` and `burst`, i.e. a
+                              `FileTokenBucket` to share it with other processes
+        :param key_rate_limit: Maximum sustained number of requests per second
+                                of a single key
+        :param key_burst: Number of requests a single key may send at once,
+                           defaults to `key_rate_limit`
+        :param http_adapter: The `HTTPAdapter` every client sends requests
+                              through, defaults to one pooling `max_workers`
+                              connections
+        :param client_kwargs: Any other setting of `GuildWars2Client` (i.e.
+                               `cache`, `retry`, `lang`), applied to every client
+        """
+        for name in ('api_key', 'rate_limit', 'burst'):
+            if name in client_kwargs:
+                raise TypeError(f'ClientPool manages `{name}` of its clients itself')
+
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        if self.rate_limiter is None and rate_limit:
+            self.rate_limiter = TokenBucket(rate_limit, capacity=burst)
+        self.key_rate_limit = key_rate_limit
+        self.key_burst = key_burst
+        self.http_adapter = http_adapter or GuildWars2Client.build_http_adapter(pool_maxsize=max_workers,
+                                                                                pool_block=True)
+        self.client_kwargs = client_kwargs
+
+        self._clients = {}
+        self._queues = {}
+        # Keys with queued calls, in the order they are served. A key is in
+        #  there exactly when its queue is not empty
+        self._ready = collections.deque()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._closed = False
+
+        for api_key in api_keys:
+            self.add_key(api_key)
+
+    @property
+    def api_keys(self):
+        with self._condition:
+            return list(self._clients)
+
+    def add_key(self, api_key):
+        """Adds an API key to the pool, returning its client"""
+        with self._condition:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = self._clients[api_key] = self._build_client(api_key)
+            return client
+
+    def remove_key(self, api_key):
+        """Removes an API key from the pool, cancelling its queued calls"""
+        with self._condition:
+            self._clients.pop(api_key, None)
+            queue = self._queues.pop(api_key, ())
+            if queue:
+                self._ready.remove(api_key)
+
+        for future, *_ in queue:
+            future.cancel()
+
+    def client(self, api_key):
+        """Returns the client of an API key of the pool"""
+        with self._condition:
+            return self._clients[api_key]
+
+    def submit(self, api_key, func, *args, **kwargs):
+        """
+        Queues `func(client, *args, **kwargs)` for the client of `api_key`.
+
+        :returns: A `concurrent.futures.Future` of the result
+        :raises KeyError: If `api_key` is not part of the pool
+        """
+        future = Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Cannot submit calls to a closed ClientPool')
+            if api_key not in self._clients:
+                raise KeyError(api_key)
+
+            queue = self._queues.setdefault(api_key, collections.deque())
+            if not queue:
+                self._ready.append(api_key)
+            queue.append((future, func, args, kwargs))
+
+            if len(self._workers) < self.max_workers:
+                self._start_worker()
+            self._condition.notify()
+
+        return future
+
+    def map(self, func, api_keys=None, ordered=False):
+        """
+        Calls `func(client)` for every API key of the pool (or of `api_keys`).
+
+        :param ordered: Whether to yield in the order of the keys rather than as calls complete
+        :returns: An iterator of `(api_key, future)` pairs
+        """
+        futures = {self.submit(api_key, func): api_key
+                   for api_key in (api_keys if api_keys is not None else self.api_keys)}
+
+        for future in (futures if ordered else as_completed(futures)):
+            yield futures[future], future
+
+    def close(self, wait=True):
+        """Stops accepting calls, then waits for the queued ones to complete if `wait`"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _build_client(self, api_key):
+        rate_limiter = self.rate_limiter
+        if self.key_rate_limit:
+            key_bucket = TokenBucket(self.key_rate_limit, capacity=self.key_burst)
+            rate_limiter = CompositeRateLimiter(key_bucket, rate_limiter) if rate_limiter else key_bucket
+
+        return GuildWars2Client(api_key=api_key, http_adapter=self.http_adapter, rate_limiter=rate_limiter,
+                                **self.client_kwargs)
+
+    def _start_worker(self):
+        worker = threading.Thread(target=self._work, name=f'gw2api-pool-{len(self._workers)}', daemon=True)
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._ready and not self._closed:
+                    self._condition.wait()
+                if not self._ready:
+                    return
+
+                # Serve the key at the front, then move it to the back of the line
+                api_key = self._ready.popleft()
+                queue = self._queues[api_key]
+                future, func, args, kwargs = queue.popleft()
+                if queue:
+                    self._ready.append(api_key)
+                client = self._clients[api_key]
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = func(client, *args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def __len__(self):
+        with self._condition:
+            return len(self._clients)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return '<ClientPool %r keys\nWorkers: %r>' % (len(self), self.max_workers)
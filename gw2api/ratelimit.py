@@ -0,0 +1,156 @@
+"""Client-side rate limiting, to stay below the request rate enforced by the API"""
+
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    The bucket holds up to `capacity` tokens and is refilled with `rate` tokens
+     per second. Every request takes a token, waiting for one to be refilled
+     when the bucket is empty, so that bursts of up to `capacity` requests go
+     through immediately while the sustained rate never exceeds `rate`.
+
+    Waiting callers reserve their token up front, so they are served in the
+     order they arrived rather than racing each other once tokens are refilled.
+
+    >>> bucket = TokenBucket(rate=5, capacity=300)
+    >>> clients = [GuildWars2Client(api_key=key, rate_limiter=bucket) for key in api_keys]
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param rate: Tokens refilled per second, i.e. the sustained request rate
+        :param capacity: Maximum number of tokens, i.e. the largest burst of
+                          requests. Defaults to `rate`
+        :param clock: Callable returning the current time in seconds
+        :param sleep: Callable used to wait for tokens
+        """
+        if rate <= 0:
+            raise ValueError('TokenBucket requires a positive `rate`')
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.clock = clock
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated_at = self.clock()
+
+    def reserve(self, tokens=1):
+        """
+        Takes `tokens` from the bucket, going into debt if there are not enough.
+
+        :returns: The seconds to wait before the tokens may be used
+        """
+        with self._lock:
+            self._tokens, self._updated_at, delay = self._take(self._tokens, self._updated_at, tokens)
+            return delay
+
+    def acquire(self, tokens=1):
+        """Takes `tokens` from the bucket, blocking until they are available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self.sleep(delay)
+
+    def _take(self, available, updated_at, tokens):
+        """Refills and takes from a bucket state, returning the new state along with the delay"""
+        now = self.clock()
+        available = min(self.capacity, available + (now - updated_at) * self.rate) - tokens
+        delay = -available / self.rate if available < 0 else 0.0
+        return available, now, delay
+
+    def __repr__(self):
+        return '<%s %r/s\nCapacity: %r>' % (self.__class__.__name__, self.rate, self.capacity)
+
+
+class CompositeRateLimiter:
+    """
+    Takes tokens from several buckets at once, waiting for the slowest of them.
+
+    Used to enforce more than one budget on the same requests, i.e. the
+     budget of an API key along with a budget shared by every key.
+
+    >>> shared = TokenBucket(rate=50, capacity=300)
+    >>> limiter = CompositeRateLimiter(TokenBucket(rate=5, capacity=30), shared)
+    """
+
+    def __init__(self, *limiters, sleep=time.sleep):
+        """
+        :param limiters: The `TokenBucket` (or `CompositeRateLimiter`) to take tokens from
+        :param sleep: Callable used to wait for tokens
+        """
+        self.limiters = limiters
+        self.sleep = sleep
+
+    def reserve(self, tokens=1):
+        """Takes `tokens` from every bucket, returning the seconds to wait for all of them"""
+        return max((limiter.reserve(tokens) for limiter in self.limiters), default=0.0)
+
+    def acquire(self, tokens=1):
+        """Takes `tokens` from every bucket, blocking until they are all available"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self.sleep(delay)
+
+    def __repr__(self):
+        return '<CompositeRateLimiter %r>' % (self.limiters,)
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket shared by every process on a host.
+
+    The state of the bucket is kept in a small file which is locked while
+     tokens are taken. Placing it on a memory-backed filesystem (i.e.
+     `/dev/shm`) avoids touching the disk. Only available on POSIX systems.
+
+    >>> bucket = FileTokenBucket('/dev/shm/gw2api.bucket', rate=5, capacity=300)
+    """
+
+    _STATE = struct.Struct('<dd')
+
+    def __init__(self, path, rate, capacity=None, clock=time.time, sleep=time.sleep):
+        """
+        :param path: Path of the file holding the bucket state, created if it
+                      does not exist. Every process must use the same settings
+        :param clock: Callable returning the current time in seconds, it must
+                       be the same across processes (i.e. wall-clock time)
+        """
+        if fcntl is None:
+            raise ImportError('FileTokenBucket requires the `fcntl` module, which is only available on POSIX')
+
+        super().__init__(rate, capacity=capacity, clock=clock, sleep=sleep)
+        self.path = path
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def reserve(self, tokens=1):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                state = os.pread(self._fd, self._STATE.size, 0)
+                if len(state) == self._STATE.size:
+                    available, updated_at = self._STATE.unpack(state)
+                else:
+                    available, updated_at = self.capacity, self.clock()
+
+                available, updated_at, delay = self._take(available, updated_at, tokens)
+                os.pwrite(self._fd, self._STATE.pack(available, updated_at), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        return delay
+
+    def close(self):
+        os.close(self._fd)
@@ -0,0 +1,127 @@
+"""Retrying of requests that failed because of transient API errors"""
+
+import collections
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+
+RetryStats = collections.namedtuple('RetryStats', ['retries', 'backoff'])
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to retry a request.
+
+    Only idempotent requests (`GET` by default) are retried, on connection
+     errors and on the statuses the API uses for transient failures. The delay
+     before each retry grows exponentially with "full jitter" so that clients
+     failing together do not retry in lockstep, unless the API sent a
+     `Retry-After` header, which is honored.
+
+    The number of retries and the total time spent backing off are recorded
+     per endpoint, see `stats`.
+
+    >>> policy = RetryPolicy(max_attempts=5, backoff_factor=0.5)
+    >>> client = GuildWars2Client(retry=policy)
+    >>> policy.stats()
+    {'/v2/commerce/prices': RetryStats(retries=3, backoff=2.71)}
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+    RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, max_attempts=3, backoff_factor=0.5, max_backoff=30, statuses=RETRY_STATUSES,
+                 methods=RETRY_METHODS, respect_retry_after=True, sleep=time.sleep, jitter=random.random):
+        """
+        :param max_attempts: Total number of attempts, including the first one
+        :param backoff_factor: Upper bound of the delay before the first retry,
+                                doubled for every following one
+        :param max_backoff: Upper bound of any delay, including `Retry-After`
+        :param statuses: HTTP statuses worth retrying
+        :param methods: HTTP methods that are safe to retry
+        :param respect_retry_after: Whether to wait as long as the `Retry-After`
+                                     header asks for
+        :param sleep: Callable used to wait between attempts
+        :param jitter: Callable returning a float in [0, 1) to scale delays by
+        """
+        if max_attempts < 1:
+            raise ValueError('RetryPolicy requires a `max_attempts` of at least 1')
+
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.respect_retry_after = respect_retry_after
+        self.sleep = sleep
+        self.jitter = jitter
+
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def should_retry(self, method, attempt, response=None, error=None):
+        """Whether a request that has been attempted `attempt` times should be sent again"""
+        if attempt >= self.max_attempts or method.upper() not in self.methods:
+            return False
+
+        if error is not None:
+            return isinstance(error, self.RETRY_EXCEPTIONS)
+
+        return response is not None and response.status_code in self.statuses
+
+    def backoff(self, attempt, response=None):
+        """Returns the seconds to wait before sending a request again after `attempt` attempts"""
+        retry_after = self._retry_after(response) if self.respect_retry_after else None
+        if retry_after is not None:
+            # Spread clients told to come back at the same time a little
+            return min(self.max_backoff, retry_after + self.jitter() * self.backoff_factor)
+
+        return self.jitter() * min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+
+    def record(self, url, delay):
+        """Records a retry of a request to `url` after waiting `delay` seconds"""
+        endpoint = urlsplit(url).path
+
+        with self._lock:
+            retries, backoff = self._stats.get(endpoint, (0, 0.0))
+            self._stats[endpoint] = RetryStats(retries + 1, backoff + delay)
+
+    def stats(self):
+        """Returns the retries and seconds spent backing off so far, per endpoint path"""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    @staticmethod
+    def _retry_after(response):
+        """Parses the `Retry-After` header (seconds or HTTP date) of a response into seconds"""
+        if response is None:
+            return None
+
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        return max(0.0, retry_at.timestamp() - time.time())
+
+    def __repr__(self):
+        return '<RetryPolicy %r attempts\nBackoff: %r>' % (self.max_attempts, self.backoff_factor)
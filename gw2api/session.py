@@ -0,0 +1,58 @@
+import itertools
+
+import requests
+
+
+class GuildWars2Session(requests.Session):
+    """
+    Session used by `GuildWars2Client` to send all HTTP requests.
+
+    On top of a plain `requests.Session` it carries the client-wide settings
+     that the API objects consult when sending requests, so that they only
+     need a reference to their session.
+    """
+
+    def __init__(self, cache=None, disk_cache=None, rate_limiter=None, retry=None, flights=None,
+                 json_decoder=None):
+        """
+        :param cache: Optional `gw2api.cache.ResponseCache` responses are
+                       looked up in and stored to
+        :param disk_cache: Optional `gw2api.cache.PersistentCache` static
+                            endpoints are read through
+        :param rate_limiter: Optional `gw2api.ratelimit.TokenBucket` every
+                              request takes a token from
+        :param retry: Optional `gw2api.retry.RetryPolicy` deciding whether
+                       to send failed requests again
+        :param flights: Optional `gw2api.singleflight.SingleFlight` concurrent
+                         identical requests are coalesced through
+        :param json_decoder: Optional callable decoding JSON response bodies
+                              from `bytes`, instead of `Response.json()`
+        """
+        super().__init__()
+
+        self.cache = cache
+        self.disk_cache = disk_cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.flights = flights
+        self.json_decoder = json_decoder
+
+    def request(self, method, url, *args, **kwargs):
+        for attempt in itertools.count(1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.RequestException as e:
+                if self.retry is None or not self.retry.should_retry(method, attempt, error=e):
+                    raise
+                response = None
+            else:
+                if self.retry is None or not self.retry.should_retry(method, attempt, response=response):
+                    return response
+                response.close()
+
+            delay = self.retry.backoff(attempt, response)
+            self.retry.record(url, delay)
+            self.retry.sleep(delay)
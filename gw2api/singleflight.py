@@ -0,0 +1,96 @@
+"""Coalescing of concurrent identical requests into a single outstanding one"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+
+class SingleFlight:
+    """
+    Lets concurrent callers asking for the same key share a single call.
+
+    The first caller of a key (the leader) runs the call, callers arriving
+     while it is in flight wait for it and receive the same result, or the
+     same exception. Nothing is kept once the call completes, later callers
+     start a new one - keeping results around is the job of `ResponseCache`.
+
+    Both threads (`do`) and coroutines (`do_async`) are supported, coroutines
+     only ever share calls made on the same event loop.
+
+    >>> flights = SingleFlight()
+    >>> client = GuildWars2Client(coalesce=flights)
+    >>> flights.shared  # Callers served by a request another caller sent
+    498
+    """
+
+    def __init__(self):
+        self.shared = 0
+
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Calls `func`, unless a call for `key` is already in flight in which case its result is returned"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key, func):
+        """Awaits `func()`, unless a call for `key` is already in flight in which case its result is returned"""
+        loop = asyncio.get_running_loop()
+        key = (loop, key)  # Futures cannot be awaited from another loop
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = loop.create_future()
+            else:
+                self.shared += 1
+
+        if not leader:
+            # Followers being cancelled must not cancel the call they wait on
+            return await asyncio.shield(future)
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Marks it retrieved, there may be no follower to do so
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def __len__(self):
+        """Number of calls currently in flight"""
+        with self._lock:
+            return len(self._calls)
+
+    def __repr__(self):
+        return '<SingleFlight %r in flight\nShared: %r>' % (len(self), self.shared)
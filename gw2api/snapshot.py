@@ -0,0 +1,110 @@
+"""Concurrent snapshots of everything an API key can read about its account"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gw2api.objects import api_objects
+
+
+class AccountSnapshot:
+    """
+    Result of `GuildWars2Client.account_snapshot`.
+
+    `data` maps the route of every endpoint read (i.e. 'account/bank') to its
+     payload, `timings` to the seconds its request took and `errors` to the
+     exception it failed with, if any. `skipped` lists the endpoints the API key
+     lacks permissions for, which were not requested at all.
+    """
+
+    def __init__(self, tokeninfo, data, timings, errors, skipped, duration):
+        self.tokeninfo = tokeninfo
+        self.data = data
+        self.timings = timings
+        self.errors = errors
+        self.skipped = skipped
+        self.duration = duration
+
+    @property
+    def permissions(self):
+        return self.tokeninfo.get('permissions', [])
+
+    def __getitem__(self, route):
+        return self.data[route]
+
+    def __contains__(self, route):
+        return route in self.data
+
+    def __repr__(self):
+        return '<AccountSnapshot %r\nEndpoints: %r\nDuration: %r>' % (self.tokeninfo.get('name'), len(self.data),
+                                                                     self.duration)
+
+
+def account_endpoints(permissions, version='v2'):
+    """
+    Returns the names of the client attributes of the `Account*` endpoints
+     readable with `permissions`, along with those that are not.
+    """
+    readable, skipped = [], []
+
+    for name, api_object in api_objects(version).items():
+        if not api_object.object_type.startswith('account'):
+            continue
+
+        if set(api_object.PERMISSIONS) <= set(permissions):
+            readable.append(name)
+        else:
+            skipped.append(name)
+
+    return readable, skipped
+
+
+def take_account_snapshot(client, max_workers=None):
+    """Reads every `Account*` endpoint of a `GuildWars2Client` concurrently, see `GuildWars2Client.account_snapshot`"""
+    start = time.perf_counter()
+    tokeninfo = client.tokeninfo.get()
+    readable, skipped = account_endpoints(tokeninfo.get('permissions', []), client.version)
+
+    def read(name):
+        endpoint_start = time.perf_counter()
+        try:
+            return name, getattr(client, name).get(), None, time.perf_counter() - endpoint_start
+        except Exception as e:
+            return name, None, e, time.perf_counter() - endpoint_start
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(readable) or 1) as executor:
+        results = list(executor.map(read, readable))
+
+    return _build_snapshot(client, tokeninfo, results, skipped, time.perf_counter() - start)
+
+
+async def take_account_snapshot_async(client):
+    """Asynchronous counterpart of `take_account_snapshot`, for an `AsyncGuildWars2Client`"""
+    start = time.perf_counter()
+    tokeninfo = await client.tokeninfo.get()
+    readable, skipped = account_endpoints(tokeninfo.get('permissions', []), client.version)
+
+    async def read(name):
+        endpoint_start = time.perf_counter()
+        try:
+            return name, await getattr(client, name).get(), None, time.perf_counter() - endpoint_start
+        except Exception as e:
+            return name, None, e, time.perf_counter() - endpoint_start
+
+    results = await asyncio.gather(*[read(name) for name in readable])
+
+    return _build_snapshot(client, tokeninfo, results, skipped, time.perf_counter() - start)
+
+
+def _build_snapshot(client, tokeninfo, results, skipped, duration):
+    routes = {name: api_object.object_type for name, api_object in api_objects(client.version).items()}
+
+    data, timings, errors = {}, {}, {}
+    for name, payload, error, seconds in results:
+        timings[routes[name]] = seconds
+        if error is not None:
+            errors[routes[name]] = error
+        else:
+            data[routes[name]] = payload
+
+    return AccountSnapshot(tokeninfo, data, timings, errors, [routes[name] for name in skipped], duration)
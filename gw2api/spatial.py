@@ -0,0 +1,325 @@
+"""Spatial index of the points of interest, tasks, sectors and maps of a continent"""
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SpatialIndex:
+    """
+    Grid of the floors of a continent, answering location queries without walking floor records.
+
+    Points (points of interest by `type`, and `task`s) are bucketed in square
+     cells of `cell_size` continent units, per floor and kind, and stored in
+     flat arrays sorted by cell: the points of a cell are a slice of them.
+     Sectors and maps are registered in every cell their bounding box
+     overlaps, so that a point is only tested against the few polygons (or
+     rectangles) of its own cell. Requires NumPy.
+
+    The index can be saved to a single `.npz` file and loaded back by other
+     processes without building it again.
+
+    >>> world = client.continents.crawler().crawl()
+    >>> index = SpatialIndex.build(world[1]['floors'].values())
+    >>> index.nearest(7200, 9800, floor=1)
+    (72, 164.9)
+    >>> index.within(7200, 9800, 500, floor=1, kind='vista')
+    [('vista', 80, 321.7), ...]
+    >>> index.sector_at(7200, 9800, floor=1), index.map_at(7200, 9800, floor=1)
+    (513, 15)
+    >>> index.save('tyria.npz')
+    >>> index = SpatialIndex.load('tyria.npz')
+    """
+
+    KINDS = ('landmark', 'waypoint', 'vista', 'unlock', 'task')
+    CELL_SIZE = 1024
+
+    def __init__(self, arrays):
+        """
+        :param arrays: The arrays of an index, as built by `build` or read by `load`
+        """
+        if numpy is None:
+            raise ImportError('SpatialIndex requires numpy, install it with '
+                              '`pip install GuildWars2-API-Client[numpy]`')
+
+        self.arrays = arrays
+        for name, values in arrays.items():
+            setattr(self, name, values)
+
+        self.cell_size = float(self.grid[0])
+        self.origin = (float(self.grid[1]), float(self.grid[2]))
+        self.shape = (int(self.grid[3]), int(self.grid[4]))  # Rows, columns
+        self._floors = {int(floor_id): position for position, floor_id in enumerate(self.floor_ids.tolist())}
+
+    @classmethod
+    def build(cls, floors, cell_size=CELL_SIZE):
+        """
+        Builds the index of floors of a single continent.
+
+        :param floors: Floor records, as returned by `Continents.get_floors`
+                        or held by the tree of a `ContinentsCrawler`
+        :param cell_size: Side of the grid cells, in continent units
+        """
+        if numpy is None:
+            raise ImportError('SpatialIndex requires numpy, install it with '
+                              '`pip install GuildWars2-API-Client[numpy]`')
+
+        kinds = {kind: position for position, kind in enumerate(cls.KINDS)}
+        points, sectors, maps = {}, {}, {}
+
+        for floor in floors:
+            floor_id = floor['id']
+            for region in floor.get('regions', {}).values():
+                for map_ in region.get('maps', {}).values():
+                    map_id = map_['id']
+                    (left, top), (right, bottom) = map_['continent_rect']
+                    maps.setdefault((floor_id, map_id), (left, top, right, bottom))
+
+                    for poi in map_.get('points_of_interest', {}).values():
+                        if poi.get('type') in kinds:
+                            points.setdefault((floor_id, kinds[poi['type']], poi['id']), (map_id, *poi['coord']))
+                    for task in map_.get('tasks', {}).values():
+                        points.setdefault((floor_id, kinds['task'], task['id']), (map_id, *task['coord']))
+                    for sector in map_.get('sectors', {}).values():
+                        if len(sector.get('bounds', ())) >= 3:
+                            sectors.setdefault((floor_id, sector['id']), (map_id, sector['bounds']))
+
+        floor_ids = numpy.array(sorted({key[0] for key in (*points, *sectors, *maps)}), dtype=numpy.int32)
+        floor_positions = {int(floor_id): position for position, floor_id in enumerate(floor_ids.tolist())}
+
+        # The grid spans the bounding box of everything indexed
+        xs = [x for _, x, _ in points.values()] + [rect[i] for rect in maps.values() for i in (0, 2)]
+        ys = [y for _, _, y in points.values()] + [rect[i] for rect in maps.values() for i in (1, 3)]
+        for _, bounds in sectors.values():
+            xs.extend(x for x, _ in bounds)
+            ys.extend(y for _, y in bounds)
+        left, top = (min(xs), min(ys)) if xs else (0, 0)
+        columns = int((max(xs) - left) // cell_size) + 1 if xs else 1
+        rows = int((max(ys) - top) // cell_size) + 1 if ys else 1
+        grid = numpy.array([cell_size, left, top, rows, columns], dtype=numpy.float64)
+        cells_per_floor = rows * columns
+
+        def cells(x, y):
+            return (numpy.clip(((y - top) // cell_size).astype(numpy.int64), 0, rows - 1) * columns
+                    + numpy.clip(((x - left) // cell_size).astype(numpy.int64), 0, columns - 1))
+
+        def cell(x, y):
+            return (min(max(int((y - top) // cell_size), 0), rows - 1),
+                    min(max(int((x - left) // cell_size), 0), columns - 1))
+
+        arrays = {'grid': grid, 'floor_ids': floor_ids}
+
+        # Points, sorted by floor, kind then cell
+        keys = list(points)
+        point_x = numpy.array([points[key][1] for key in keys], dtype=numpy.float64)
+        point_y = numpy.array([points[key][2] for key in keys], dtype=numpy.float64)
+        buckets = ((numpy.array([floor_positions[key[0]] for key in keys], dtype=numpy.int64) * len(cls.KINDS)
+                    + numpy.array([key[1] for key in keys], dtype=numpy.int64)) * cells_per_floor
+                   + cells(point_x, point_y))
+        order = numpy.argsort(buckets, kind='stable')
+        arrays.update(
+            point_ids=numpy.array([key[2] for key in keys], dtype=numpy.int64)[order],
+            point_kinds=numpy.array([key[1] for key in keys], dtype=numpy.int8)[order],
+            point_maps=numpy.array([points[key][0] for key in keys], dtype=numpy.int32)[order],
+            point_x=point_x[order],
+            point_y=point_y[order],
+            point_offsets=_offsets(buckets, len(floor_ids) * len(cls.KINDS) * cells_per_floor),
+        )
+
+        # Sectors, as polygons whose edges are stored one after the other
+        keys = list(sectors)
+        edges = [numpy.asarray(sectors[key][1], dtype=numpy.float64) for key in keys]
+        arrays.update(
+            sector_ids=numpy.array([key[1] for key in keys], dtype=numpy.int64),
+            sector_maps=numpy.array([sectors[key][0] for key in keys], dtype=numpy.int32),
+            sector_edges=_offsets(numpy.repeat(numpy.arange(len(keys)), [len(bounds) for bounds in edges]),
+                                  len(keys)),
+            edge_start=numpy.concatenate(edges) if edges else numpy.zeros((0, 2)),
+            edge_end=(numpy.concatenate([numpy.roll(bounds, -1, axis=0) for bounds in edges]) if edges
+                      else numpy.zeros((0, 2))),
+        )
+        boxes = [(bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 0].max(), bounds[:, 1].max()) for bounds in edges]
+        arrays['sector_boxes'] = numpy.array(boxes, dtype=numpy.float64).reshape(-1, 4)
+        arrays.update(_cell_lists('sector', [floor_positions[key[0]] for key in keys], boxes, cell, columns,
+                                  cells_per_floor, len(floor_ids)))
+
+        # Maps, as rectangles
+        keys = list(maps)
+        arrays.update(
+            map_ids=numpy.array([key[1] for key in keys], dtype=numpy.int64),
+            map_rects=numpy.array([maps[key] for key in keys], dtype=numpy.float64).reshape(-1, 4),
+        )
+        arrays.update(_cell_lists('map', [floor_positions[key[0]] for key in keys], [maps[key] for key in keys],
+                                  cell, columns, cells_per_floor, len(floor_ids)))
+
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Loads an index saved with `save`"""
+        with numpy.load(path, allow_pickle=False) as arrays:
+            return cls({name: arrays[name] for name in arrays.files})
+
+    def save(self, path):
+        """Saves the arrays of the index to a `.npz` file"""
+        numpy.savez(path, **self.arrays)
+
+    def nearest(self, x, y, floor, kind='waypoint', max_distance=math.inf):
+        """
+        Finds the point of a kind closest to `(x, y)` on a floor.
+
+        :returns: The `(id, distance)` of the point, or `None` if there is
+                   none within `max_distance`
+        """
+        floor_position = self._floors.get(floor)
+        if floor_position is None:
+            return None
+
+        base = (floor_position * len(self.KINDS) + self.KINDS.index(kind)) * self.shape[0] * self.shape[1]
+        row, column = self._cell(x, y)
+        best, best_distance = None, max_distance
+
+        # Rings of cells around the one of the point, until no cell of the
+        #  next ring can be closer than the best point found
+        for ring in range(max(self.shape)):
+            if ring > 0 and (ring - 1) * self.cell_size >= best_distance:
+                break
+
+            for start, end in self._ring_ranges(base, row, column, ring):
+                if start == end:
+                    continue
+                distances = numpy.hypot(self.point_x[start:end] - x, self.point_y[start:end] - y)
+                position = int(distances.argmin())
+                if distances[position] <= best_distance:
+                    best, best_distance = start + position, float(distances[position])
+
+        if best is None:
+            return None
+        return int(self.point_ids[best]), best_distance
+
+    def within(self, x, y, radius, floor, kind=None):
+        """
+        Finds the points within `radius` of `(x, y)` on a floor, of a kind or of every kind.
+
+        :returns: A list of `(kind, id, distance)` tuples, closest first
+        """
+        floor_position = self._floors.get(floor)
+        if floor_position is None:
+            return []
+
+        first_row, first_column = self._cell(x - radius, y - radius)
+        last_row, last_column = self._cell(x + radius, y + radius)
+        cells_per_floor = self.shape[0] * self.shape[1]
+
+        found = []
+        for kind_position in (range(len(self.KINDS)) if kind is None else [self.KINDS.index(kind)]):
+            base = (floor_position * len(self.KINDS) + kind_position) * cells_per_floor
+            for row in range(first_row, last_row + 1):
+                # The cells of a row are next to each other, and so are their points
+                start = self.point_offsets[base + row * self.shape[1] + first_column]
+                end = self.point_offsets[base + row * self.shape[1] + last_column + 1]
+                if start == end:
+                    continue
+                distances = numpy.hypot(self.point_x[start:end] - x, self.point_y[start:end] - y)
+                for position in numpy.flatnonzero(distances <= radius).tolist():
+                    found.append((self.KINDS[kind_position], int(self.point_ids[start + position]),
+                                  float(distances[position])))
+
+        return sorted(found, key=lambda point: point[2])
+
+    def sector_at(self, x, y, floor):
+        """Returns the id of the sector containing `(x, y)` on a floor, or `None`"""
+        for sector in self._candidates('sector', x, y, floor):
+            left, top, right, bottom = self.sector_boxes[sector].tolist()
+            if not (left <= x <= right and top <= y <= bottom):
+                continue
+            start, end = self.sector_edges[sector], self.sector_edges[sector + 1]
+            if _contains(self.edge_start[start:end], self.edge_end[start:end], x, y):
+                return int(self.sector_ids[sector])
+        return None
+
+    def map_at(self, x, y, floor):
+        """Returns the id of the smallest map containing `(x, y)` on a floor, or `None`"""
+        best, best_area = None, math.inf
+        for map_position in self._candidates('map', x, y, floor):
+            left, top, right, bottom = self.map_rects[map_position]
+            area = (right - left) * (bottom - top)
+            if left <= x <= right and top <= y <= bottom and area < best_area:
+                best, best_area = int(self.map_ids[map_position]), area
+        return best
+
+    def _cell(self, x, y):
+        rows, columns = self.shape
+        row = min(max(int((y - self.origin[1]) // self.cell_size), 0), rows - 1)
+        column = min(max(int((x - self.origin[0]) // self.cell_size), 0), columns - 1)
+        return row, column
+
+    def _ring_ranges(self, base, row, column, ring):
+        """Yields the slices of the points of the cells at `ring` cells from `(row, column)`"""
+        rows, columns = self.shape
+        first_column, last_column = max(column - ring, 0), min(column + ring, columns - 1)
+
+        for ring_row in range(row - ring, row + ring + 1):
+            if not 0 <= ring_row < rows:
+                continue
+            offset = base + ring_row * columns
+            if ring_row in (row - ring, row + ring):
+                # Top and bottom rows of the ring, whole
+                yield self.point_offsets[offset + first_column], self.point_offsets[offset + last_column + 1]
+            else:
+                for ring_column in (column - ring, column + ring):
+                    if 0 <= ring_column < columns:
+                        yield self.point_offsets[offset + ring_column], self.point_offsets[offset + ring_column + 1]
+
+    def _candidates(self, name, x, y, floor):
+        floor_position = self._floors.get(floor)
+        if floor_position is None:
+            return []
+
+        row, column = self._cell(x, y)
+        cell = floor_position * self.shape[0] * self.shape[1] + row * self.shape[1] + column
+        offsets, entries = getattr(self, name + '_cell_offsets'), getattr(self, name + '_cell_entries')
+        return entries[offsets[cell]:offsets[cell + 1]].tolist()
+
+    def __len__(self):
+        return len(self.point_ids)
+
+    def __repr__(self):
+        return '<SpatialIndex %r points\nSectors: %r\nMaps: %r>' % (len(self), len(self.sector_ids), len(self.map_ids))
+
+
+def _offsets(buckets, count):
+    """Returns where every bucket starts among `buckets` sorted, followed by their total"""
+    offsets = numpy.zeros(count + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.bincount(numpy.asarray(buckets, dtype=numpy.int64), minlength=count), out=offsets[1:])
+    return offsets
+
+
+def _cell_lists(name, floor_positions, boxes, cell, columns, cells_per_floor, floor_count):
+    """Registers shapes in every cell their `(left, top, right, bottom)` box overlaps"""
+    buckets, entries = [], []
+    for position, (floor_position, (left, top, right, bottom)) in enumerate(zip(floor_positions, boxes)):
+        (first_row, first_column), (last_row, last_column) = cell(left, top), cell(right, bottom)
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                buckets.append(floor_position * cells_per_floor + row * columns + column)
+                entries.append(position)
+
+    buckets = numpy.array(buckets, dtype=numpy.int64)
+    order = numpy.argsort(buckets, kind='stable')
+    return {
+        name + '_cell_offsets': _offsets(buckets, floor_count * cells_per_floor),
+        name + '_cell_entries': numpy.array(entries, dtype=numpy.int32)[order],
+    }
+
+
+def _contains(starts, ends, x, y):
+    """Whether `(x, y)` is inside the polygon made of the edges from `starts` to `ends` (ray casting)"""
+    x1, y1, x2, y2 = starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]
+    crossing = (y1 > y) != (y2 > y)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        intersections = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return bool(numpy.count_nonzero(crossing & (x < intersections)) % 2)
@@ -0,0 +1,192 @@
+"""Incremental decoding of large JSON responses"""
+
+import codecs
+import json
+import re
+
+
+# Same definition of whitespace as the `json` module
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Characters that may follow a complete value
+_DELIMITERS = frozenset(' \t\n\r,:]}')
+
+# What the parser expects next within a container
+_VALUE_OR_CLOSE, _VALUE, _SEPARATOR_OR_CLOSE, _COLON = range(4)
+
+
+class _Incomplete(Exception):
+    """Raised when the buffered text ends before the value being decoded"""
+
+
+class _Container:
+    """An array or object being received, along with what is expected next within it"""
+
+    def __init__(self, opening, value):
+        self.closing = ']' if opening == '[' else '}'
+        self.value = value  # Members decoded so far, `None` for the top-level container
+        self.expecting = _VALUE_OR_CLOSE
+        self.key = None  # Key of the object member whose value is expected
+
+
+class JSONStreamParser:
+    """
+    Incremental parser for a JSON document made of a top-level array or object.
+
+    Bytes are fed as they are received, and every element of the top-level
+     array - or `(key, value)` pair of the top-level object - is returned as
+     soon as it is complete. Only the text not decoded yet is buffered, so
+     elements can be processed (and discarded) while the rest of the
+     document is still being downloaded.
+
+    An element spread over several chunks is assembled member by member:
+     the arrays and objects left incomplete by a chunk are opened, and only
+     their last, incomplete member is decoded again once more bytes are
+     received. Large elements (i.e. whole continent floors) are thus decoded
+     in linear time rather than from their start on every chunk.
+
+    >>> parser = JSONStreamParser()
+    >>> parser.feed(b'[{"id": 1}, {"id"')
+    [{'id': 1}]
+    >>> parser.feed(b': 2}]')
+    [{'id': 2}]
+    >>> parser.close()
+    []
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+
+        self._buffer = ''
+        self._containers = []  # Containers opened and not closed yet, the top-level one first
+        self._done = False
+
+    def feed(self, data):
+        """Feeds the next bytes of the document, returning the elements they complete"""
+        self._buffer += self._text_decoder.decode(data)
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Signals the end of the document, returning the elements left.
+
+        :raises ValueError: If the document is truncated or malformed
+        """
+        self._buffer += self._text_decoder.decode(b'', final=True)
+        elements = self._parse(final=True)
+
+        if not self._done:
+            raise ValueError('Truncated JSON document')
+        return elements
+
+    def _parse(self, final):
+        buffer, index, elements = self._buffer, 0, []
+
+        while True:
+            index = _WHITESPACE.match(buffer, index).end()
+            if index == len(buffer):
+                break
+
+            char = buffer[index]
+            if self._done:
+                raise ValueError(f'Extra data after the JSON document at {char!r}')
+
+            if not self._containers:
+                if char not in '[{':
+                    raise ValueError('Only JSON documents made of an array or an object can be streamed')
+                self._containers.append(_Container(char, None))
+                index += 1
+                continue
+
+            container = self._containers[-1]
+            if char == container.closing and container.expecting in (_VALUE_OR_CLOSE, _SEPARATOR_OR_CLOSE):
+                self._containers.pop()
+                index += 1
+                if self._containers:
+                    self._add(container.value, elements)
+                else:
+                    self._done = True
+                continue
+
+            if container.expecting == _SEPARATOR_OR_CLOSE:
+                if char != ',':
+                    raise ValueError(f'Expected "," or {container.closing!r}, got {char!r}')
+                container.expecting = _VALUE
+                index += 1
+                continue
+
+            if container.expecting == _COLON:
+                if char != ':':
+                    raise ValueError(f'Expected ":" after the object key {container.key!r}')
+                container.expecting = _VALUE
+                index += 1
+                continue
+
+            try:
+                value, index = self._decode_value(buffer, index, final)
+            except _Incomplete:
+                if char not in '[{' or (container.closing == '}' and container.key is None):
+                    break
+                # Keep the members received so far rather than decoding them again with the next chunk
+                self._containers.append(_Container(char, [] if char == '[' else {}))
+                index += 1
+                continue
+
+            if container.closing == '}' and container.key is None:
+                if not isinstance(value, str):
+                    raise ValueError(f'Expected an object key, got {value!r}')
+                container.key = value
+                container.expecting = _COLON
+                continue
+
+            self._add(value, elements)
+
+        self._buffer = buffer[index:]
+        return elements
+
+    def _add(self, value, elements):
+        """Adds a complete value to the innermost container, or to `elements` for the top-level one"""
+        container = self._containers[-1]
+
+        if container.closing == ']':
+            if container.value is None:
+                elements.append(value)
+            else:
+                container.value.append(value)
+        elif container.value is None:
+            elements.append((container.key, value))
+        else:
+            container.value[container.key] = value
+
+        container.key = None
+        container.expecting = _SEPARATOR_OR_CLOSE
+
+    def _decode_value(self, buffer, index, final):
+        if index == len(buffer):
+            if final:
+                raise ValueError('Truncated JSON document')
+            raise _Incomplete
+
+        try:
+            value, end = self._decoder.raw_decode(buffer, index)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            raise _Incomplete
+
+        # A number is only complete once followed by a delimiter, as `12` at
+        #  the end of the buffer may be the start of `12.5e3` in the next chunk
+        if not final and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+            raise _Incomplete
+        return value, end
+
+
+def iter_json(chunks):
+    """Yields the elements of the JSON array (or members of the object) spread over `chunks` of bytes"""
+    parser = JSONStreamParser()
+
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+    yield from parser.close()
@@ -0,0 +1,87 @@
+"""Checkpoints of the trading post transactions already synced, per account"""
+
+import os
+import sqlite3
+import threading
+
+
+class TransactionCheckpoints:
+    """
+    High-water marks of `CommerceTransactions.sync`, stored in SQLite.
+
+    For every account and side ('buys' or 'sells'), the id and `purchased`
+     timestamp of the newest transaction synced. The next sync only reads
+     history pages until it reaches that transaction.
+
+    >>> checkpoints = TransactionCheckpoints('~/.cache/gw2api-transactions.sqlite3')
+    >>> new = client.commercetransactions.sync(checkpoints)
+    >>> new['buys'], new['sells']
+    ([{'id': 4912864196, 'item_id': 20759, ...}], [])
+    """
+
+    SIDES = ('buys', 'sells')
+
+    def __init__(self, path=':memory:'):
+        """
+        :param path: Path of the SQLite database, created if it does not
+                      exist. Checkpoints are only kept in memory by default
+        """
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path if path == ':memory:' else os.path.expanduser(path),
+                                           check_same_thread=False, isolation_level=None)
+
+        with self._lock:
+            self._connection.execute('''
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    account TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    transaction_id INTEGER NOT NULL,
+                    purchased TEXT NOT NULL,
+                    PRIMARY KEY (account, side)
+                )
+            ''')
+
+    def get(self, account, side):
+        """Returns the `(transaction_id, purchased)` of the newest transaction synced, or `None`"""
+        with self._lock:
+            row = self._connection.execute('SELECT transaction_id, purchased FROM checkpoints '
+                                           'WHERE account = ? AND side = ?', (account, side)).fetchone()
+
+        return tuple(row) if row else None
+
+    def set(self, account, side, transaction_id, purchased):
+        """Moves the high-water mark of an account's side to a transaction"""
+        if side not in self.SIDES:
+            raise ValueError(f'Unknown side {side!r}, expected one of {", ".join(self.SIDES)}')
+
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)',
+                                     (account, side, transaction_id, purchased))
+
+    def reset(self, account=None):
+        """Forgets the checkpoints of an account, or of every account, so that it is synced in full again"""
+        with self._lock:
+            if account is None:
+                self._connection.execute('DELETE FROM checkpoints')
+            else:
+                self._connection.execute('DELETE FROM checkpoints WHERE account = ?', (account,))
+
+    def accounts(self):
+        """Returns the accounts with at least one checkpoint"""
+        with self._lock:
+            return [row[0] for row in self._connection.execute('SELECT DISTINCT account FROM checkpoints')]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return '<TransactionCheckpoints %r\nAccounts: %r>' % (self.path, len(self.accounts()))
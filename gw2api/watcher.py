@@ -0,0 +1,135 @@
+"""Polling of the game build, to invalidate cached static data when the game is patched"""
+
+import logging
+import threading
+
+from gw2api.cache import PersistentCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class BuildWatcher:
+    """
+    Polls the `build` endpoint of a `GuildWars2Client` on an interval.
+
+    Whenever the build id changes, the static endpoints are dropped from the
+     client's `ResponseCache`, its `PersistentCache` is moved to the new build
+     (dropping every entry of the old one) and the registered callbacks are
+     called with the old and new build ids, i.e. to refetch static data only
+     when the game has actually been patched.
+
+    >>> def refresh(old_build_id, new_build_id):
+    ...     client.items.get(ids=client.items.get())
+    >>>
+    >>> watcher = BuildWatcher(client, interval=300, callbacks=[refresh])
+    >>> watcher.start()
+    """
+
+    def __init__(self, client, interval=300, callbacks=(), static_endpoints=None):
+        """
+        :param client: The `GuildWars2Client` to poll and whose caches to invalidate
+        :param interval: Seconds between two polls
+        :param callbacks: Callables taking the old and new build ids, called
+                           after the caches have been invalidated
+        :param static_endpoints: Endpoints whose cached responses belong to a
+                                  build, defaults to the endpoints of the
+                                  client's `PersistentCache` (or its defaults)
+        """
+        self.client = client
+        self.interval = interval
+        self.callbacks = list(callbacks)
+
+        disk_cache = getattr(client, 'disk_cache', None)
+        if static_endpoints is None:
+            static_endpoints = disk_cache.endpoints if disk_cache is not None else PersistentCache.DEFAULT_ENDPOINTS
+        self.static_endpoints = frozenset(static_endpoints)
+
+        # Picking up the persisted build lets the first poll detect a patch
+        #  released while the process was not running
+        self.build_id = disk_cache.build_id if disk_cache is not None else None
+
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add_callback(self, callback):
+        """Registers a callable taking the old and new build ids"""
+        self.callbacks.append(callback)
+
+    def check(self):
+        """
+        Polls the build once, invalidating caches and calling the callbacks if it changed.
+
+        :returns: Whether a new build has been detected
+        """
+        cache = getattr(self.client, 'cache', None)
+        if cache is not None:
+            cache.invalidate('build')
+
+        build = self.client.build.get()
+        build_id = build['id'] if isinstance(build, dict) else build  # v1 returns the id itself
+
+        old_build_id, self.build_id = self.build_id, build_id
+        if old_build_id is None:
+            disk_cache = getattr(self.client, 'disk_cache', None)
+            if disk_cache is not None:
+                disk_cache.set_build_id(build_id)
+            return False
+
+        if build_id == old_build_id:
+            return False
+
+        self.invalidate()
+
+        for callback in self.callbacks:
+            callback(old_build_id, build_id)
+
+        return True
+
+    def invalidate(self):
+        """Drops every cached entry tied to a previous build"""
+        cache = getattr(self.client, 'cache', None)
+        if cache is not None:
+            for object_type in self.static_endpoints:
+                cache.invalidate(object_type)
+
+        disk_cache = getattr(self.client, 'disk_cache', None)
+        if disk_cache is not None:
+            disk_cache.set_build_id(self.build_id)
+
+    def start(self):
+        """Starts polling on a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError('BuildWatcher is already running')
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='gw2api-build-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stops polling, waiting up to `timeout` seconds for an ongoing poll to finish"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.check()
+            except Exception:
+                # Never let a failed poll (i.e. the API being down during
+                #  maintenance) kill the watcher, simply try again later
+                logger.exception('Failed to poll the game build')
+
+            self._stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def __repr__(self):
+        return '<BuildWatcher %r\nInterval: %r>' % (self.build_id, self.interval)
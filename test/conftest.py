@@ -8,6 +8,8 @@ import functools
 import json
 import os
 import pathlib
+import re
+from urllib.parse import parse_qs, urlparse
 import pytest
 import requests_mock
 
@@ -71,6 +73,128 @@ def register_urls_to_files(adapter, url_to_file):
         adapter.register_uri('GET', url, text=response)
 
 
+def build_client(mock_adapter, **kwargs):
+    """Creates a GuildWars2Client instance with the mock adapter mounted onto its
+    session.
+
+    Args:
+        mock_adapter: The mock adapter to mount.
+        kwargs: The settings of the client, i.e. its `cache` or `retry`.
+    Returns:
+        A GuildWars2Client instance with a mock session.
+    """
+    client = GuildWars2Client(**kwargs)
+    client.session.mount('https://', mock_adapter)
+    return client
+
+
+def register_items(mock_adapter, missing=()):
+    """Registers an `items` endpoint that answers with one record per known id, in reverse order
+
+    Args:
+        mock_adapter: The mock adapter to register the endpoint against.
+        missing: Ids the mocked API does not know of.
+    Returns:
+        The list of `ids` query parameters received, one per request.
+    """
+    received = []
+
+    def items(request, context):
+        ids = parse_qs(urlparse(request.url).query)['ids'][0].split(',')
+        received.append(ids)
+        records = [{'id': int(_id), 'name': 'Item {}'.format(_id)} for _id in reversed(ids) if int(_id) not in missing]
+        if not records:
+            context.status_code = 404
+            return {'text': 'all ids provided are invalid'}
+        return records
+
+    mock_adapter.register_uri('GET', re.compile(re.escape(GuildWars2Client.BASE_URL + '/v2/items')), json=items)
+    return received
+
+
+def register_prices(mock_adapter, item_ids, delisted=()):
+    """Registers a `commerce/prices` endpoint listing `item_ids` and answering with made up prices
+
+    Args:
+        mock_adapter: The mock adapter to register the endpoint against.
+        item_ids: The ids of the tradable items.
+        delisted: Ids listed but no longer returned when their prices are requested.
+    Returns:
+        The list of `ids` query parameters received, one per request.
+    """
+    received = []
+
+    def prices(request, context):
+        query = parse_qs(urlparse(request.url).query)
+        if 'ids' not in query:
+            return list(item_ids)
+
+        ids = [int(_id) for _id in query['ids'][0].split(',')]
+        received.append(ids)
+        records = [{'id': _id, 'whitelisted': False,
+                    'buys': {'quantity': _id * 10, 'unit_price': _id + 1},
+                    'sells': {'quantity': _id * 20, 'unit_price': _id + 2}}
+                   for _id in reversed(ids) if _id not in delisted]
+        if not records:
+            context.status_code = 404
+            return {'text': 'all ids provided are invalid'}
+        return records
+
+    mock_adapter.register_uri('GET', re.compile(re.escape(GuildWars2Client.BASE_URL + '/v2/commerce/prices')),
+                              json=prices)
+    return received
+
+
+class FakeClock:
+    """Clock that only moves when told to, or when slept on"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeAioResponse:
+    """Minimal stand-in for `aiohttp.ClientResponse`"""
+
+    def __init__(self, status, text):
+        self.status = status
+        self.reason = 'OK' if status == 200 else 'Not Found'
+        self.headers = {'Content-Type': 'application/json; charset=utf-8'}
+        self.charset = 'utf-8'
+        self._text = text
+
+    async def read(self):
+        return self._text.encode('utf-8')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeAioSession:
+    """Minimal stand-in for `aiohttp.ClientSession` serving files from test/mocks"""
+
+    def __init__(self, url_to_file):
+        self.url_to_file = {'{}/v2/{}'.format(GuildWars2Client.BASE_URL, url): filename_stem
+                            for url, filename_stem in url_to_file.items()}
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        if url not in self.url_to_file:
+            return FakeAioResponse(404, '{"text": "no such endpoint"}')
+        return FakeAioResponse(200, load_mock_text(self.url_to_file[url]))
+
+
 @pytest.fixture
 def mock_adapter():
     """Creates a mock adapter instance.
@@ -0,0 +1,61 @@
+"""
+Tests functionality of the asyncio client
+"""
+
+import asyncio
+
+import pytest
+import requests
+
+from gw2api import AsyncGuildWars2Client, GuildWars2Client
+from test.conftest import FakeAioSession, load_mock_json
+
+
+def test_async_get(gw2_client):
+    """Tests that plain and nested endpoints resolve to the same data as the blocking client
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+    """
+    session = FakeAioSession({
+        "commerce/exchange/coins?quantity=100000": "coinstogems_quantity100000",
+        "commerce/transactions/history/buys": "commerce_historybuys",
+        "continents/2/floors/15": "continents2floors15",
+    })
+    client = AsyncGuildWars2Client(api_key="empty-api-key", session=session)
+
+    async def fetch():
+        return await asyncio.gather(client.commerceexchangecoins.get(quantity=100000),
+                                    client.commercetransactions.history.buys.get(),
+                                    client.continents.get(continents=2, floors='15'))
+
+    coins, buys, floor = asyncio.run(fetch())
+
+    assert coins["coins_per_gem"] == 2941
+    assert buys == load_mock_json("commerce_historybuys")
+    assert floor == load_mock_json("continents2floors15")
+    assert len(session.requested) == 3
+
+    # The blocking client must not have been rewired by the async one
+    assert isinstance(gw2_client.commercetransactions.history.buys.session, requests.Session)
+
+
+def test_async_get_errors():
+    """Tests that HTTP errors and argument validation behave like the blocking client"""
+    session = FakeAioSession({})
+    client = AsyncGuildWars2Client(session=session)
+
+    with pytest.raises(requests.HTTPError):
+        asyncio.run(client.items.get(id=1))
+
+    with pytest.raises(KeyError):
+        asyncio.run(client.continents.get(regions=1))
+
+    assert session.requested == ['{}/v2/items?id=1'.format(GuildWars2Client.BASE_URL)]
+
+    # Blocking methods of the wrapped objects are not forwarded, metadata is
+    with pytest.raises(AttributeError, match='sweep'):
+        client.commerceprices.sweep()
+    assert not hasattr(client.items, 'iter_stream') and getattr(client.items, 'iter_stream', None) is None
+    assert client.items.object_type == 'items'
+    assert session.requested == ['{}/v2/items?id=1'.format(GuildWars2Client.BASE_URL)]
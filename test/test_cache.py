@@ -0,0 +1,101 @@
+"""
+Tests the in-memory response cache
+"""
+
+import asyncio
+
+from gw2api import AsyncGuildWars2Client, GuildWars2Client, ResponseCache
+from test.conftest import FakeAioSession, FakeClock, build_client, register_urls_to_files
+
+
+def test_cache_hits_and_expiry(mock_adapter):
+    """Tests that repeated requests are served from the cache until their endpoint TTL expires
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    register_urls_to_files(mock_adapter, {"continents/2": "continents2",
+                                          "commerce/transactions": "commerce_transactions"})
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, ttls={'continents': 100}, clock=clock)
+    client = build_client(mock_adapter, cache=cache, api_key='empty-api-key')
+
+    for _ in range(3):
+        client.continents.get(continents=2)
+        client.commercetransactions.get()
+
+    assert mock_adapter.call_count == 2
+    assert cache.info() == (4, 2, cache.maxsize, 2)
+
+    clock.now = 50
+    client.continents.get(continents=2)
+    client.commercetransactions.get()
+    assert mock_adapter.call_count == 3
+
+
+def test_cache_keyed_by_api_key_and_bounded(mock_adapter):
+    """Tests that clients sharing a cache do not see each other's responses, and that the cache is bounded
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    register_urls_to_files(mock_adapter, {"continents/2": "continents2",
+                                          "continents/2/floors": "continents2floors"})
+    cache = ResponseCache(maxsize=2)
+    first, second = (build_client(mock_adapter, cache=cache, api_key='first-key'),
+                     build_client(mock_adapter, cache=cache, api_key='second-key'))
+
+    first.continents.get(continents=2)
+    second.continents.get(continents=2)
+    first.continents.get(continents=2, floors='all')
+    assert mock_adapter.call_count == 3
+    assert len(cache) == 2
+
+    # The least recently used entry (first client, continents/2) has been evicted
+    second.continents.get(continents=2)
+    first.continents.get(continents=2)
+    assert mock_adapter.call_count == 4
+
+
+def test_cache_async():
+    """Tests that the asynchronous client looks responses up in the cache too"""
+    session = FakeAioSession({"continents/2": "continents2"})
+    cache = ResponseCache()
+    client = AsyncGuildWars2Client(session=session, cache=cache)
+
+    async def fetch():
+        for _ in range(3):
+            await client.continents.get(continents=2)
+
+    asyncio.run(fetch())
+    assert len(session.requested) == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_conditional_requests(mock_adapter):
+    """Tests that expired responses carrying an ETag are revalidated rather than downloaded again
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    etags = []
+
+    def prices(request, context):
+        etags.append(request.headers.get('If-None-Match'))
+        context.headers['ETag'] = '"v1"'
+        if request.headers.get('If-None-Match') == '"v1"':
+            context.status_code = 304
+            return ''
+        return '[{"id": 19684, "buys": {"quantity": 1, "unit_price": 100}}]'
+
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/commerce/prices?ids=19684', text=prices)
+    clock = FakeClock()
+    cache = ResponseCache(ttls={'commerce/prices': 0}, clock=clock)
+    client = build_client(mock_adapter, cache=cache, api_key='empty-api-key')
+
+    first = client.commerceprices.get(ids=[19684])
+    second = client.commerceprices.get(ids=[19684])
+
+    assert etags == [None, '"v1"']
+    assert second is first  # Served from the cache without decoding it again
+    assert (cache.hits, cache.misses, cache.revalidations) == (1, 1, 1)
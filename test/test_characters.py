@@ -0,0 +1,92 @@
+"""
+Tests bulk loading of characters
+"""
+
+import re
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from gw2api import GuildWars2Client, ResponseCache
+from test.conftest import build_client
+
+CHARACTERS_SCHEMA = '2019-12-19T00:00:00.000Z'
+CHARACTERS = [{'name': 'Zojja Asura', 'profession': 'Elementalist', 'bags': [{'id': 8932, 'size': 20}]},
+              {'name': 'Rytlock', 'profession': 'Revenant', 'bags': []}]
+
+
+def register_characters(mock_adapter):
+    """Registers the characters endpoint along with the sub-endpoints of every character
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+
+    Returns:
+        The list of paths requested.
+    """
+    requested = []
+
+    def characters(request, context):
+        url = urlparse(request.url)
+        requested.append(unquote(url.path))
+        if url.path == '/v2/characters':
+            assert parse_qs(url.query) == {'ids': ['all'], 'v': [CHARACTERS_SCHEMA]}
+            return CHARACTERS
+        name, sub_endpoint = unquote(url.path).split('/')[3:]
+        return {'character': name, 'sub_endpoint': sub_endpoint}
+
+    mock_adapter.register_uri('GET', re.compile(re.escape(GuildWars2Client.BASE_URL + '/v2/characters')),
+                              json=characters)
+    return requested
+
+
+def test_iter_all_characters(gw2_client, mock_adapter):
+    """Tests that sub-endpoints missing from the records are requested for every character, and no others
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    requested = register_characters(mock_adapter)
+
+    # Any iterable of names, i.e. a generator
+    sub_endpoints = (name for name in ['inventory', 'heropoints', 'sab'])
+    characters = dict(gw2_client.characters.iter_all(sub_endpoints=sub_endpoints))
+
+    assert sorted(characters) == ['Rytlock', 'Zojja Asura']
+    assert characters['Zojja Asura']['bags'] == [{'id': 8932, 'size': 20}]
+    assert characters['Zojja Asura']['sab'] == {'character': 'Zojja Asura', 'sub_endpoint': 'sab'}
+    assert characters['Rytlock']['heropoints'] == {'character': 'Rytlock', 'sub_endpoint': 'heropoints'}
+    assert sorted(requested) == ['/v2/characters', '/v2/characters/Rytlock/heropoints', '/v2/characters/Rytlock/sab',
+                                 '/v2/characters/Zojja Asura/heropoints', '/v2/characters/Zojja Asura/sab']
+
+
+def test_iter_all_characters_from_records_only(gw2_client, mock_adapter):
+    """Tests that a single request is sent when the records cover every sub-endpoint asked for
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    requested = register_characters(mock_adapter)
+
+    assert [name for name, _ in gw2_client.characters.iter_all(['inventory', 'equipment'])] == \
+        ['Zojja Asura', 'Rytlock']
+    assert requested == ['/v2/characters']
+
+    with pytest.raises(ValueError):
+        next(gw2_client.characters.iter_all(['wallet']))
+
+
+def test_iter_all_characters_through_cache(mock_adapter):
+    """Tests that sub-endpoints are not added to the records held by the response cache
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    requested = register_characters(mock_adapter)
+    client = build_client(mock_adapter, api_key='empty-api-key', cache=ResponseCache())
+
+    assert all('heropoints' in character for _, character in client.characters.iter_all(['heropoints']))
+    assert all('heropoints' not in character for _, character in client.characters.iter_all([]))
+    assert requested.count('/v2/characters') == 1
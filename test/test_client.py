@@ -0,0 +1,71 @@
+"""
+Tests settings of the client itself
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+import gw2api
+from gw2api import GuildWars2Client
+from gw2api.aio import AsyncGuildWars2Client
+
+
+def test_connection_pool_settings():
+    """Tests that the pool settings reach the adapter mounted on the session"""
+    client = GuildWars2Client(pool_connections=4, pool_maxsize=64, pool_block=True, keep_alive=False)
+
+    adapter = client.session.get_adapter(GuildWars2Client.BASE_URL)
+    assert adapter is client.http_adapter
+    assert adapter.poolmanager.connection_pool_kw['maxsize'] == 64
+    assert adapter.poolmanager.connection_pool_kw['block'] is True
+    assert client.session.headers['Connection'] == 'close'
+
+
+def test_shared_connection_pool():
+    """Tests that clients built with the same adapter share one pool but keep their own credentials"""
+    adapter = GuildWars2Client.build_http_adapter(pool_maxsize=32)
+    clients = [GuildWars2Client(api_key='key-{}'.format(i), http_adapter=adapter) for i in range(3)]
+
+    assert all(client.session.get_adapter(GuildWars2Client.BASE_URL) is adapter for client in clients)
+    assert len({client.session.headers['Authorization'] for client in clients}) == 3
+
+
+def test_api_objects_created_on_access():
+    """Tests that API objects are only created when first accessed, and never shared between clients"""
+    first, second = GuildWars2Client(api_key='first-key'), GuildWars2Client(api_key='second-key')
+    assert 'items' not in vars(first)
+    assert 'commercetransactions' in dir(first)
+
+    assert first.items is first.items
+    assert first.items is not second.items
+    assert first.items.session is first.session
+    assert first.commercetransactions.history.buys.session is first.session
+    assert second.commercetransactions.history.buys.session is second.session
+
+    with pytest.raises(AttributeError):
+        first.no_such_endpoint
+
+
+def test_authenticated_endpoints_permissions():
+    """Tests that authenticated endpoints, sub-endpoints included, list the permissions they need"""
+    client = GuildWars2Client()
+
+    assert client.charactersinventory.PERMISSIONS == ('account', 'characters', 'inventories')
+    assert client.commercetransactions.history.buys.PERMISSIONS == ('account', 'tradingpost')
+    assert client.guildidlog.PERMISSIONS == ('account', 'guilds')
+    assert client.pvpstats.PERMISSIONS == ('account', 'pvp')
+    assert client.items.PERMISSIONS == ()
+
+
+def test_optional_dependencies_imported_lazily():
+    """Tests that the blocking client does not import aiohttp or NumPy until they are needed"""
+    code = ('import sys, gw2api; gw2api.GuildWars2Client().commerceprices; '
+            'print(sorted({"aiohttp", "numpy"} & set(sys.modules)))')
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
+
+    assert gw2api.AsyncGuildWars2Client is AsyncGuildWars2Client
+    with pytest.raises(AttributeError):
+        gw2api.NoSuchClient
@@ -2,7 +2,13 @@
 Tests functionality of commerce API for version 2
 """
 
-from test.conftest import register_urls_to_files, load_mock_json
+import re
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from gw2api import GuildWars2Client, ResponseCache, TransactionCheckpoints
+from test.conftest import build_client, register_prices, register_urls_to_files, load_mock_json
 
 
 def test_coins_to_gems(gw2_client, mock_adapter):
@@ -105,3 +111,162 @@ def test_transactions(gw2_client, mock_adapter):
     expected = load_mock_json("commerce_currentsells")
     result = gw2_client.commercetransactions.current.sells.get()
     assert result == expected
+
+
+def test_price_sweep(gw2_client, mock_adapter):
+    """Tests that every listed item is swept in 200-id requests into columns ordered by id
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    # The whole last request is delisted, which the API answers with a 404
+    delisted = {300, *range(401, 451)}
+    received = register_prices(mock_adapter, range(1, 451), delisted=delisted)
+
+    sweep = gw2_client.commerceprices.sweep(max_workers=3)
+
+    assert sorted(len(ids) for ids in received) == [50, 200, 200]
+    assert len(sweep) == 399
+    assert list(sweep.item_id) == [_id for _id in range(1, 451) if _id not in delisted]
+    assert next(sweep.rows()) == (1, 2, 10, 3, 20)
+    assert sweep.timestamp > 0 and sweep.duration >= 0
+
+
+def test_price_sweep_to_sink(gw2_client, mock_adapter):
+    """Tests that a sweep can be streamed to a sink one request at a time
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    register_prices(mock_adapter, range(1, 451))
+    batches = []
+
+    sweep = gw2_client.commerceprices.sweep(sink=batches.append)
+
+    assert len(sweep) == 0
+    assert [len(batch) for batch in batches] == [200, 200, 50]
+    assert all(batch.timestamp == sweep.timestamp for batch in batches)
+    assert batches[-1].sell_qty[-1] == 450 * 20
+
+
+def test_order_book(gw2_client, mock_adapter):
+    """Tests that listings are decoded into arrays, sorted by price, and queried per item or as a whole
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    numpy = pytest.importorskip('numpy')
+    listings = [
+        {'id': 19684,
+         'buys': [{'listings': 3, 'unit_price': 184, 'quantity': 600},
+                  {'listings': 1, 'unit_price': 183, 'quantity': 50}],
+         'sells': [{'listings': 2, 'unit_price': 189, 'quantity': 300},
+                   {'listings': 5, 'unit_price': 190, 'quantity': 2000},
+                   {'listings': 1, 'unit_price': 195, 'quantity': 10}]},
+        # Sides in the other order, and levels out of order
+        {'sells': [{'listings': 1, 'unit_price': 12, 'quantity': 7}, {'listings': 1, 'unit_price': 9, 'quantity': 1}],
+         'buys': [],
+         'id': 24},
+    ]
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/commerce/listings?ids=19684,24', json=listings)
+
+    book = gw2_client.commercelistings.order_book(ids=[19684, 24])
+
+    assert list(book.item_ids) == [19684, 24]
+    assert list(book.offsets) == [0, 2, 5, 5, 7]
+    assert list(book.asks(24)[0]) == [9, 12]
+    assert (book.best_bid(19684), book.best_ask(19684), book.spread(19684)) == (184, 189, 5)
+    assert list(book.best_bid()) == [184, 0] and list(book.spread()) == [5, 0]
+    assert book.depth(19684, 190) == 2300 and book.depth(19684, 183, side='buys') == 650
+    assert book.cost_to_buy(19684, 500) == 300 * 189 + 200 * 190
+    assert book.cost_to_buy(24, 100) is None
+    assert book.price.dtype == numpy.int32
+
+    # Bodies are parsed by the order book only, even when requests are coalesced
+    decoded = []
+    client = build_client(mock_adapter, coalesce=True, json_decoder=lambda body: decoded.append(body) or [])
+    assert list(client.commercelistings.order_book(ids=[19684, 24]).item_ids) == [19684, 24]
+    assert decoded == []
+
+
+def test_transactions_sync(gw2_client, mock_adapter, tmp_path):
+    """Tests that syncs only read history pages until the transactions synced before
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    # Newest first, as served by the API
+    history = [{'id': 1000 + n, 'item_id': 24, 'price': 10, 'quantity': 1,
+                'created': '2019-12-01T00:00:00+00:00', 'purchased': '2019-12-%02dT00:00:00+00:00' % (1 + n // 20)}
+               for n in reversed(range(450))]
+    requested = []
+
+    def pages(request, context):
+        query = parse_qs(urlparse(request.url).query)
+        page, page_size = int(query.get('page', ['0'])[0]), int(query['page_size'][0])
+        requested.append(page)
+
+        context.headers['X-Page-Total'] = str(-(-len(history) // page_size))
+        return history[page * page_size:(page + 1) * page_size]
+
+    mock_adapter.register_uri('GET', re.compile(re.escape(GuildWars2Client.BASE_URL + '/v2/commerce/transactions/'
+                                                          'history/buys?')), json=pages)
+    checkpoints = TransactionCheckpoints(str(tmp_path / 'checkpoints.sqlite3'))
+
+    new = gw2_client.commercetransactions.sync(checkpoints, sides=['buys'])
+    assert new['buys'] == history and sorted(requested) == [0, 1, 2]
+    assert checkpoints.get('tests', 'buys') is None and len(checkpoints.accounts()) == 1
+
+    # Nothing new since
+    del requested[:]
+    assert gw2_client.commercetransactions.sync(checkpoints, sides=['buys']) == {'buys': []}
+    assert requested == [0]
+
+    # Three transactions completed since, read from the first page only
+    history[:0] = [dict(history[0], id=2000 + n, purchased='2019-12-31T00:00:00+00:00') for n in range(3)]
+    del requested[:]
+    new = gw2_client.commercetransactions.sync(TransactionCheckpoints(checkpoints.path), sides=['buys'])
+    assert [transaction['id'] for transaction in new['buys']] == [2000, 2001, 2002]
+    assert requested == [0]
+    assert checkpoints.get(checkpoints.accounts()[0], 'buys') == (2000, '2019-12-31T00:00:00+00:00')
+
+    # More than a page of them, read until the page holding the checkpoint
+    history[:0] = [dict(history[0], id=3000 + n) for n in range(250)]
+    del requested[:]
+    new = gw2_client.commercetransactions.sync(checkpoints, sides=['buys'])
+    assert len(new['buys']) == 250 and requested == [0, 1]
+
+
+def test_transactions_sync_while_paging(mock_adapter):
+    """Tests that transactions read twice across pages are kept once, and that cached pages are not synced
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    history = [{'id': 1000 + n, 'purchased': '2019-12-01T00:00:00+00:00'} for n in reversed(range(450))]
+    completed = []
+
+    def pages(request, context):
+        query = parse_qs(urlparse(request.url).query)
+        page, page_size = int(query.get('page', ['0'])[0]), int(query['page_size'][0])
+        # A transaction completed once the first page was read
+        shown = history if page == 0 else completed + history
+
+        context.headers['X-Page-Total'] = str(-(-len(shown) // page_size))
+        return shown[page * page_size:(page + 1) * page_size]
+
+    mock_adapter.register_uri('GET', re.compile(re.escape(GuildWars2Client.BASE_URL + '/v2/commerce/transactions/'
+                                                          'history/sells?')), json=pages)
+    client = build_client(mock_adapter, api_key='empty-api-key', cache=ResponseCache(ttl=3600))
+    checkpoints = TransactionCheckpoints()
+
+    completed.append({'id': 5000, 'purchased': '2019-12-31T00:00:00+00:00'})
+    assert client.commercetransactions.sync(checkpoints, sides=['sells']) == {'sells': history}
+
+    history[:0] = completed
+    assert client.commercetransactions.sync(checkpoints, sides=['sells']) == {'sells': completed}
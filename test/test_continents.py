@@ -1,7 +1,13 @@
 import collections
+import copy
 import itertools
+import re
+import threading
+from urllib.parse import parse_qs, urlparse
+
 import pytest
 
+from gw2api import GuildWars2Client
 from test.conftest import register_urls_to_files, load_mock_json
 
 
@@ -253,3 +259,100 @@ def test_continents_backwards_compatibility_ids(gw2_client, mock_adapter):
     register_urls_to_files(mock_adapter, {'continents?ids=1,2': 'continents1_2'})
     expected_multi_id = load_mock_json('continents1_2')
     assert gw2_client.continents.get(ids=[1, 2]) == expected_multi_id, '/continents?ids=1,2 failed'
+
+
+def register_world(mock_adapter, floors):
+    """Registers the continents and floors of a made up world
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+        floors: Mapping of continent id to the mapping of its floor ids to floors.
+
+    Returns:
+        The list of paths (with their query) requested.
+    """
+    requested = []
+
+    def continents(request, context):
+        requested.append(request.path_url)
+        return [{'id': continent_id, 'name': str(continent_id), 'floors': list(continent_floors)}
+                for continent_id, continent_floors in floors.items()]
+
+    def continent_floors(request, context):
+        requested.append(request.path_url)
+        continent_id = int(request.path.split('/')[-2])
+        ids = parse_qs(urlparse(request.url).query)['ids'][0]
+        return [floors[continent_id][floor_id] for floor_id in floors[continent_id]
+                if ids == 'all' or str(floor_id) in ids.split(',')]
+
+    base_url = GuildWars2Client.BASE_URL + '/v2/continents'
+    mock_adapter.register_uri('GET', base_url + '?ids=all', json=continents)
+    mock_adapter.register_uri('GET', re.compile(re.escape(base_url) + r'/\d+/floors\?'), json=continent_floors)
+    return requested
+
+
+def test_continents_crawler(gw2_client, mock_adapter):
+    """Tests that every floor is crawled, then only the floors new or invalidated
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    floor = load_mock_json('continents2floors15')
+    floors = {1: {n: dict(copy.deepcopy(floor), id=n) for n in (1, 2)}, 2: {1: dict(copy.deepcopy(floor), id=1)}}
+    requested = register_world(mock_adapter, floors)
+
+    crawler = gw2_client.continents.crawler()
+    world = crawler.crawl()
+
+    assert sorted(requested) == ['/v2/continents/1/floors?ids=1,2', '/v2/continents/2/floors?ids=1',
+                                 '/v2/continents?ids=all']
+    assert crawler.changed == {(1, 1), (1, 2), (2, 1)}
+    assert list(world[1]['floors']) == [1, 2] and world[2]['floors'][1]['id'] == 1
+    assert world[1]['floors'][2]['regions']['26']['maps']['1205']['sectors']['1478']['name'] == 'Shattered Observatory'
+
+    # Identical maps are shared by every floor
+    maps = [world[continent_id]['floors'][floor_id]['regions']['26']['maps']['1205']
+            for continent_id, floor_id in ((1, 1), (1, 2), (2, 1))]
+    assert maps[0] is maps[1] is maps[2]
+
+    # Nothing new
+    del requested[:]
+    crawler.crawl()
+    assert requested == ['/v2/continents?ids=all'] and crawler.changed == set()
+
+    # A new floor, and a floor invalidated which changed in the meantime
+    floors[1][3] = dict(copy.deepcopy(floor), id=3)
+    floors[2][1]['regions']['26']['name'] = 'Renamed'
+    crawler.invalidate(2)
+    del requested[:]
+    world = crawler.crawl()
+    assert sorted(requested) == ['/v2/continents/1/floors?ids=3', '/v2/continents/2/floors?ids=1',
+                                 '/v2/continents?ids=all']
+    assert crawler.changed == {(1, 3), (2, 1)} and crawler.requests == 3
+    assert world[2]['floors'][1]['regions']['26']['name'] == 'Renamed'
+
+
+def test_continents_crawler_concurrency(gw2_client, mock_adapter):
+    """Tests that floors are requested a few at a time, with requests sent concurrently
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    floors = {1: {n: {'id': n, 'regions': {}} for n in range(1, 9)}, 2: {1: {'id': 1, 'regions': {}}}}
+    register_world(mock_adapter, floors)
+    # Every floor request waits for the others, and fails unless all of them are in flight at once
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_others(request):
+        if '/floors' in request.path:
+            barrier.wait()
+
+    mock_adapter.add_matcher(wait_for_others)
+
+    crawler = gw2_client.continents.crawler()
+    world = crawler.crawl()
+
+    assert crawler.requests == 4 and not barrier.broken
+    assert sorted(world[1]['floors']) == list(range(1, 9)) and list(world[2]['floors']) == [1]
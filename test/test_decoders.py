@@ -0,0 +1,59 @@
+"""
+Tests the pluggable JSON decoders
+"""
+
+import json
+
+import pytest
+
+from gw2api import GuildWars2Client
+from gw2api.decoders import available_decoders, get_decoder
+from test.conftest import load_mock_json, load_mock_text, register_urls_to_files
+
+
+@pytest.mark.parametrize('name', available_decoders())
+def test_decoders_agree(name):
+    """Tests that every installed decoder decodes the mock payloads like the standard library
+
+    Args:
+        name: The name of the decoder.
+    """
+    decode = get_decoder(name)
+    for stem in ('continents2floors1_6', 'commerce_historybuys'):
+        assert decode(load_mock_text(stem).encode('utf-8')) == load_mock_json(stem)
+
+
+def test_decoder_names():
+    """Tests that 'auto' falls back to the standard library and that unknown names are rejected"""
+    assert 'json' in available_decoders()
+    assert available_decoders()[0] == next(name for name in ('orjson', 'msgspec', 'simdjson', 'json')
+                                           if name in available_decoders())
+    assert get_decoder('auto')(b'[1]') == [1]
+
+    with pytest.raises(ValueError):
+        get_decoder('yaml')
+
+
+def test_client_json_decoder(mock_adapter):
+    """Tests that the client decodes every response with its decoder, decoding each of them once
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    register_urls_to_files(mock_adapter, {"continents/2": "continents2"})
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v1/build', json={'build_id': 115267})
+    decoded = []
+
+    def decode(content):
+        decoded.append(content)
+        return json.loads(content)
+
+    client = GuildWars2Client(json_decoder=decode)
+    client.session.mount('https://', mock_adapter)
+    assert client.continents.get(continents=2) == load_mock_json('continents2')
+    assert isinstance(decoded[0], bytes)
+
+    client = GuildWars2Client(version='v1', json_decoder=decode)
+    client.session.mount('https://', mock_adapter)
+    assert client.build.get() == 115267
+    assert len(decoded) == 2
@@ -0,0 +1,85 @@
+"""
+Tests the on-disk cache of static endpoints
+"""
+
+import asyncio
+import json
+
+from gw2api import AsyncGuildWars2Client, GuildWars2Client, PersistentCache
+from test.conftest import FakeAioResponse, FakeAioSession, build_client, register_items, register_urls_to_files
+
+
+def test_disk_cache_warm_start(mock_adapter, tmp_path):
+    """Tests that records survive a restart and only missing ids are requested
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/build', json={'id': 115267})
+    received = register_items(mock_adapter, missing={4})
+    path = str(tmp_path / 'cache.sqlite3')
+
+    client = build_client(mock_adapter, disk_cache=PersistentCache(path))
+    assert [item['id'] for item in client.items.get(ids=[1, 2, 3, 4])] == [1, 2, 3]
+    assert client.items.get(id=2)['id'] == 2
+    assert mock_adapter.call_count == 2  # build and items
+
+    # A new process only has to request the id it has never seen
+    client = build_client(mock_adapter, disk_cache=PersistentCache(path))
+    assert [item['id'] for item in client.items.get(ids=[5, 3, 2, 1])] == [5, 3, 2, 1]
+    assert received[-1] == ['5']
+    assert mock_adapter.call_count == 3
+
+    # Ids the API does not know of are not an error when the others are cached
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/items?ids=4', status_code=404,
+                              json={'text': 'all ids provided are invalid'})
+    assert [item['id'] for item in client.items.get(ids=[1, 4])] == [1]
+
+
+def test_disk_cache_new_build(mock_adapter, tmp_path):
+    """Tests that setting a new build id drops the entries of the previous build
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    register_urls_to_files(mock_adapter, {"continents/2": "continents2"})
+    disk_cache = PersistentCache(str(tmp_path / 'cache.sqlite3'))
+    disk_cache.set_build_id(1)
+    client = build_client(mock_adapter, disk_cache=disk_cache)
+
+    client.continents.get(continents=2)
+    client.continents.get(continents=2)
+    assert mock_adapter.call_count == 1
+
+    assert disk_cache.set_build_id(2)
+    assert not disk_cache.set_build_id(2)
+    client.continents.get(continents=2)
+    assert mock_adapter.call_count == 2
+
+
+class BuildAioSession(FakeAioSession):
+    """Fake `aiohttp.ClientSession` that also answers the build endpoint"""
+
+    def get(self, url, **kwargs):
+        if url == GuildWars2Client.BASE_URL + '/v2/build':
+            return FakeAioResponse(200, json.dumps({'id': 7}))
+        return super().get(url, **kwargs)
+
+
+def test_disk_cache_async(tmp_path):
+    """Tests that the asynchronous client can fetch the build id and the data in a single call
+
+    Args:
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    session = BuildAioSession({"continents/2": "continents2"})
+    disk_cache = PersistentCache(str(tmp_path / 'cache.sqlite3'))
+    client = AsyncGuildWars2Client(session=session, disk_cache=disk_cache)
+
+    asyncio.run(client.continents.get(continents=2))
+    asyncio.run(client.continents.get(continents=2))
+
+    assert disk_cache.build_id == 7
+    assert len(session.requested) == 1
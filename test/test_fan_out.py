@@ -0,0 +1,63 @@
+"""
+Tests splitting of large `ids` lists into concurrent requests
+"""
+
+from test.conftest import register_items
+
+
+def test_ids_are_chunked_and_merged_in_order(gw2_client, mock_adapter):
+    """Tests that more than 200 ids are split across requests and merged back in the order requested
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    received = register_items(mock_adapter, missing={7, 450})
+
+    result = gw2_client.items.get(ids=range(1000, 0, -2))
+
+    assert sorted(len(ids) for ids in received) == [100, 200, 200]
+    assert [item['id'] for item in result] == [_id for _id in range(1000, 0, -2) if _id != 450]
+
+
+def test_ids_chunk_with_no_known_id(gw2_client, mock_adapter):
+    """Tests that a chunk the API answers with a 404, as none of its ids exist, does not fail the others
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    register_items(mock_adapter, missing=set(range(201, 401)))
+
+    result = gw2_client.items.get(ids=range(1, 1001))
+
+    assert [item['id'] for item in result] == [*range(1, 201), *range(401, 1001)]
+def test_ids_below_limit_use_single_request(gw2_client, mock_adapter):
+    """Tests that small id lists, including generators, are still sent as a single request
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    received = register_items(mock_adapter)
+
+    result = gw2_client.items.get(ids=(_id for _id in (3, 1, 2)))
+
+    # A single request is returned untouched, in the order the API answered
+    assert received == [['3', '1', '2']]
+    assert [item['id'] for item in result] == [2, 1, 3]
+
+
+def test_iter_ids_streams_unordered(gw2_client, mock_adapter):
+    """Tests the streaming iterator yields every known record exactly once
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    received = register_items(mock_adapter)
+
+    result = list(gw2_client.items.iter_ids(range(1, 1001), max_workers=3, ordered=False))
+
+    assert len(received) == 5
+    assert sorted(item['id'] for item in result) == list(range(1, 1001))
@@ -0,0 +1,86 @@
+"""
+Tests following of guild logs
+"""
+
+import re
+import threading
+from urllib.parse import parse_qs, urlparse
+
+from gw2api import GuildLogFollower, GuildWars2Client, ResponseCache
+
+
+def register_logs(mock_adapter, logs):
+    """Registers the `guild/:id/log` endpoint of the guilds of `logs`
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+        logs: Mapping of guild id to the list of its entries, oldest first.
+
+    Returns:
+        The list of `(guild_id, since)` requested.
+    """
+    requested = []
+    lock = threading.Lock()
+
+    def log(request, context):
+        guild_id = urlparse(request.url).path.split('/')[-2]
+        since = parse_qs(urlparse(request.url).query).get('since')
+        since = int(since[0]) if since else None
+        with lock:
+            requested.append((guild_id, since))
+
+        entries = [entry for entry in logs[guild_id] if since is None or entry['id'] > since]
+        return list(reversed(entries))[:100]
+
+    mock_adapter.register_uri('GET', re.compile(re.escape(GuildWars2Client.BASE_URL + '/v2/guild/') + r'[^/]+/log'),
+                              json=log)
+    return requested
+
+
+def test_guild_log_since(gw2_client, mock_adapter):
+    """Tests that `since` is sent as a single query parameter
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/guild/G1/log?since=5', json=[{'id': 6}])
+
+    assert gw2_client.guildidlog.get('G1', since=5) == [{'id': 6}]
+    assert mock_adapter.last_request.url.endswith('/log?since=5')
+
+
+def test_guild_log_follower(mock_adapter):
+    """Tests that guilds are polled from their last entry, and less often while idle
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    logs = {'G1': [{'id': n, 'type': 'joined'} for n in range(1, 4)], 'G2': [], 'G3': [{'id': 1, 'type': 'kick'}]}
+    requested = register_logs(mock_adapter, logs)
+
+    client = GuildWars2Client(api_key='empty-api-key', cache=ResponseCache())
+    client.session.mount('https://', mock_adapter)
+    follower = GuildLogFollower(client, ['G1', 'G2'], since={'G3': 1}, min_interval=10, max_interval=40,
+                                max_workers=4)
+    follower.add_guild('G3')
+
+    # Entries already in the logs are skipped
+    assert follower.poll() == []
+    assert sorted(requested) == [('G1', None), ('G2', None), ('G3', 1)]
+    assert follower.cursors == {'G1': 3, 'G3': 1}
+
+    logs['G1'].extend([{'id': 4, 'type': 'kick'}, {'id': 5, 'type': 'stash'}])
+    logs['G2'].append({'id': 1, 'type': 'motd'})
+    assert follower.poll() == []  # Nothing is due yet
+
+    del requested[:]
+    new = follower.poll(force=True)
+    assert sorted(requested) == [('G1', 3), ('G2', None), ('G3', 1)]
+    assert [(guild_id, entry['id']) for guild_id, entry in new] == [('G1', 4), ('G1', 5), ('G2', 1)]
+
+    # Active guilds are polled again sooner than idle ones
+    intervals = {cursor.guild_id: cursor.interval for cursor in follower._cursors.values()}
+    assert intervals == {'G1': 10, 'G2': 10, 'G3': 40}
+
+    follower.close()
@@ -0,0 +1,80 @@
+"""
+Tests the on-disk history of trading post prices
+"""
+
+import pytest
+
+from gw2api import PriceHistory, PriceSweep
+from test.conftest import register_prices
+
+numpy = pytest.importorskip('numpy')
+
+
+def make_sweep(timestamp, item_ids, offset=0):
+    """Builds a `PriceSweep` of made up prices, shifted by `offset`"""
+    sweep = PriceSweep(timestamp)
+    sweep.add_records({'id': _id,
+                       'buys': {'quantity': _id * 10, 'unit_price': _id + offset},
+                       'sells': {'quantity': _id * 20, 'unit_price': _id + offset + 1}}
+                      for _id in item_ids)
+    return sweep
+
+
+def test_history_from_sweeps(gw2_client, mock_adapter, tmp_path):
+    """Tests that sweeps appended across segments are read back by item or by time window
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    register_prices(mock_adapter, range(1, 251))
+    history = PriceHistory(str(tmp_path), segment_records=300)
+
+    first = int(gw2_client.commerceprices.sweep(sink=history.append).timestamp)
+    second, third = first + 1000, first + 2000
+    for offset, timestamp in ((1000, second), (2000, third)):
+        history.append(make_sweep(timestamp, range(1, 251), offset=offset))
+
+    assert len(history) == 750
+    assert history.last_timestamp == third
+
+    records = history.item(42)
+    assert list(records['buy_price']) == [43, 1042, 2042]
+    assert list(records['sell_qty']) == [42 * 20] * 3
+
+    window = history.window(start=second, end=third)
+    assert len(window) == 250 and set(window['timestamp']) == {second}
+    assert list(history.item(42, start=second + 1)['timestamp']) == [third]
+    assert len(history.item(251)) == 0
+
+    # Within a single segment, reads are views of the file
+    assert isinstance(next(history.iter_window(start=third)), numpy.memmap)
+    sealed = history.item(7, end=second)
+    assert isinstance(sealed, numpy.memmap) and len(sealed) == 1
+
+    # A history opened again keeps its segment size and finds every record
+    reopened = PriceHistory(str(tmp_path), segment_records=10)
+    assert reopened.segment_records == 300
+    assert numpy.array_equal(reopened.item(42), records)
+
+
+def test_history_appends_in_order(tmp_path):
+    """Tests that older records are refused and that a torn write is dropped
+
+    Args:
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    history = PriceHistory(str(tmp_path), segment_records=100)
+    history.append(make_sweep(2000, range(1, 11)))
+
+    with pytest.raises(ValueError):
+        history.append(make_sweep(1000, range(1, 11)))
+
+    # Half a record, as left by a process killed while appending
+    with open(str(tmp_path / '000000.prices'), 'ab') as f:
+        f.write(b'\0' * (history.dtype.itemsize // 2))
+
+    assert len(history) == 10
+    history.append(make_sweep(3000, range(1, 11)))
+    assert list(history.item(5)['timestamp']) == [2000, 3000]
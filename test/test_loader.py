@@ -0,0 +1,116 @@
+"""
+Tests the batching of single-id lookups
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from gw2api import AsyncGuildWars2Client, GuildWars2Client, RecordNotFound
+from test.conftest import FakeAioResponse, register_items
+
+
+def test_loader_batches_and_dedupes(gw2_client, mock_adapter):
+    """Tests that ids loaded one by one are resolved by `ids=` requests of at most 200 ids
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    received = register_items(mock_adapter, missing={13})
+
+    with gw2_client.items.loader(window=60) as loader:
+        futures = loader.load_many(range(1, 251))
+        duplicate = loader.load(250)
+
+    assert sorted(len(ids) for ids in received) == [50, 200]
+    assert [future.result()['id'] for future in futures if future is not futures[12]] == \
+        [_id for _id in range(1, 251) if _id != 13]
+    assert duplicate is futures[-1]
+
+    with pytest.raises(RecordNotFound) as e:
+        futures[12].result()
+    assert (e.value.object_type, e.value.record_id) == ('items', 13)
+
+
+def test_loader_window(gw2_client, mock_adapter):
+    """Tests that a partial batch is sent once its window ends
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    received = register_items(mock_adapter)
+    loader = gw2_client.items.loader(window=0.01)
+
+    futures = [loader.load(_id) for _id in (3, 1, 3, 2)]
+    assert [future.result(timeout=5)['id'] for future in futures] == [3, 1, 3, 2]
+    assert received == [['3', '1', '2']]
+    loader.close()
+
+
+def test_loader_all_missing(gw2_client, mock_adapter):
+    """Tests that ids resolve to `RecordNotFound` when the API rejects all of them
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/items?ids=0', status_code=404,
+                              json={'text': 'all ids provided are invalid'})
+
+    with gw2_client.items.loader() as loader:
+        future = loader.load(0)
+
+    with pytest.raises(RecordNotFound):
+        future.result()
+
+
+def test_loader_cancelled_futures(gw2_client, mock_adapter):
+    """Tests that cancelled ids are not requested, and that ids being requested can no longer be cancelled
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    received = register_items(mock_adapter)
+    loader = gw2_client.items.loader(window=60)
+    first, second = loader.load(1), loader.load(2)
+    assert first.cancel()
+
+    cancelled = []
+    mock_adapter.add_matcher(lambda request: cancelled.append(second.cancel()))
+    loader.close()
+
+    assert second.result(timeout=5)['id'] == 2
+    assert received == [['2']] and cancelled == [False]
+
+
+class ItemsAioSession:
+    """Fake `aiohttp.ClientSession` answering `items?ids=` requests"""
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        ids = url.rsplit('ids=', 1)[1].split(',')
+        return FakeAioResponse(200, json.dumps([{'id': int(_id)} for _id in ids]))
+
+
+def test_loader_async():
+    """Tests that coroutines loading ids within the window share a single request"""
+    session = ItemsAioSession()
+    client = AsyncGuildWars2Client(session=session)
+
+    async def load(loader, _id):
+        await asyncio.sleep(0)
+        return await loader.load(_id)
+
+    async def fetch():
+        async with client.items.loader() as loader:
+            return await asyncio.gather(*[load(loader, _id) for _id in (5, 4, 5)])
+
+    assert [item['id'] for item in asyncio.run(fetch())] == [5, 4, 5]
+    assert session.requested == [GuildWars2Client.BASE_URL + '/v2/items?ids=5,4']
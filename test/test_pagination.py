@@ -0,0 +1,66 @@
+"""
+Tests walking paginated endpoints
+"""
+
+import re
+from urllib.parse import parse_qs, urlparse
+
+from gw2api import GuildWars2Client
+
+
+def register_pages(mock_adapter, endpoint, total, header='X-Page-Total'):
+    """Registers a paginated endpoint serving the integers `0..total-1`
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+        endpoint: The endpoint to register, relative to the v2 base url.
+        total: The number of items served by the endpoint.
+        header: The pagination header to send, `X-Page-Total` or `X-Result-Total`.
+
+    Returns:
+        The list of pages requested.
+    """
+    requested = []
+
+    def pages(request, context):
+        query = parse_qs(urlparse(request.url).query)
+        page = int(query.get('page', ['0'])[0])
+        page_size = int(query['page_size'][0])
+        requested.append(page)
+
+        context.headers[header] = str(-(-total // page_size) if header == 'X-Page-Total' else total)
+        return list(range(page * page_size, min(total, (page + 1) * page_size)))
+
+    url = '{}/v2/{}'.format(GuildWars2Client.BASE_URL, endpoint)
+    mock_adapter.register_uri('GET', re.compile(re.escape(url) + r'\?'), json=pages)
+    return requested
+
+
+def test_get_all_pages(gw2_client, mock_adapter):
+    """Tests that every page of a nested endpoint is fetched and returned in order
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    requested = register_pages(mock_adapter, 'commerce/transactions/history/buys', 1234)
+
+    result = gw2_client.commercetransactions.history.buys.get_all_pages()
+
+    assert result == list(range(1234))
+    assert sorted(requested) == [0, 1, 2, 3, 4, 5, 6]
+
+
+def test_iter_pages_result_total(gw2_client, mock_adapter):
+    """Tests that the page count falls back to `X-Result-Total`
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    requested = register_pages(mock_adapter, 'pvp/games', 25, header='X-Result-Total')
+
+    result = list(gw2_client.pvpgames.iter_pages(page_size=10))
+
+    assert sorted(result) == list(range(25))
+    assert sorted(requested) == [0, 1, 2]
@@ -0,0 +1,60 @@
+"""
+Tests the scheduling of calls across many API keys
+"""
+
+import threading
+
+import pytest
+
+from gw2api import ClientPool, CompositeRateLimiter, GuildWars2Client
+
+
+def test_pool_shares_transport(mock_adapter):
+    """Tests that every key gets its own credentials over the same connection pool
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/account',
+                              text=lambda request, context: '{"name": "%s"}' % request.headers['Authorization'])
+    api_keys = ['key-{}'.format(i) for i in range(20)]
+
+    with ClientPool(api_keys, max_workers=4, http_adapter=mock_adapter, rate_limit=1000,
+                    key_rate_limit=100) as pool:
+        accounts = {api_key: future.result() for api_key, future in pool.map(lambda client: client.account.get())}
+
+        assert all(pool.client(api_key).session.get_adapter(GuildWars2Client.BASE_URL) is mock_adapter
+                   for api_key in api_keys)
+        assert isinstance(pool.client('key-0').rate_limiter, CompositeRateLimiter)
+
+    assert accounts == {api_key: {'name': 'Bearer ' + api_key} for api_key in api_keys}
+    assert mock_adapter.call_count == 20
+
+
+def test_pool_round_robin():
+    """Tests that keys are served in turn, however many calls each of them has queued"""
+    started = threading.Event()
+    release = threading.Event()
+    served = []
+
+    def block(client):
+        started.set()
+        release.wait(timeout=5)
+
+    def record(client):
+        served.append(client.api_key)
+
+    pool = ClientPool(['a', 'b', 'c'], max_workers=1)
+    pool.submit('a', block)
+    started.wait(timeout=5)
+
+    futures = [pool.submit(api_key, record) for api_key in 'aaaabbc']
+    pool.remove_key('c')
+    release.set()
+    pool.close()
+
+    assert served == ['a', 'b', 'a', 'b', 'a', 'a']
+    assert futures[-1].cancelled()
+
+    with pytest.raises(RuntimeError):
+        pool.submit('a', record)
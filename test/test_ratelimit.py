@@ -0,0 +1,92 @@
+"""
+Tests client-side rate limiting
+"""
+
+import threading
+
+import pytest
+
+from gw2api import CompositeRateLimiter, FileTokenBucket, GuildWars2Client, TokenBucket
+from test.conftest import FakeClock, register_urls_to_files
+
+
+def test_token_bucket_burst_and_refill():
+    """Tests that a burst goes through at once, after which requests are spaced by the rate"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        bucket.acquire()
+
+    assert clock.slept == [0.5, 0.5]
+
+    # Refilling never exceeds the capacity
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_token_bucket_is_thread_safe():
+    """Tests that concurrent callers reserve distinct tokens"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=10, clock=clock)
+    delays = []
+
+    def reserve():
+        for _ in range(50):
+            delays.append(bucket.reserve())
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(delays) == [max(0, i - 9) / 10 for i in range(200)]
+
+
+def test_file_token_bucket_is_shared(tmp_path):
+    """Tests that buckets backed by the same file share their tokens
+
+    Args:
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    clock = FakeClock(now=1000.0)
+    path = str(tmp_path / 'bucket')
+    first = FileTokenBucket(path, rate=1, capacity=2, clock=clock)
+    second = FileTokenBucket(path, rate=1, capacity=2, clock=clock)
+
+    assert [first.reserve(), second.reserve(), first.reserve(), second.reserve()] == [0, 0, 1, 2]
+
+
+def test_client_rate_limit(mock_adapter):
+    """Tests that every request sent by a client takes a token
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    register_urls_to_files(mock_adapter, {"continents/2": "continents2"})
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+    client = GuildWars2Client(rate_limiter=bucket)
+    client.session.mount('https://', mock_adapter)
+
+    for _ in range(4):
+        client.continents.get(continents=2)
+
+    assert clock.slept == [1, 1]
+    assert GuildWars2Client(rate_limit=5, burst=100).rate_limiter.capacity == 100
+
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_composite_rate_limiter():
+    """Tests that a composite limiter takes from every bucket and waits for the slowest one"""
+    clock = FakeClock()
+    key_bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+    shared_bucket = TokenBucket(rate=10, capacity=3, clock=clock, sleep=clock.sleep)
+    limiter = CompositeRateLimiter(key_bucket, shared_bucket, sleep=clock.sleep)
+
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 1]
+    # Tokens were taken from the shared bucket too, leaving none for other keys
+    assert shared_bucket.reserve() == pytest.approx(0.1)
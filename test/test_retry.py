@@ -0,0 +1,94 @@
+"""
+Tests the retrying of requests failing with transient errors
+"""
+
+import asyncio
+import json
+
+import pytest
+import requests
+
+from gw2api import AsyncGuildWars2Client, GuildWars2Client, RetryPolicy
+from test.conftest import FakeAioResponse, build_client
+
+
+def test_retry_with_backoff(mock_adapter):
+    """Tests that 429 and 5xx responses are retried, honoring `Retry-After`
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/build', [
+        {'status_code': 503, 'headers': {'Retry-After': '2'}},
+        {'status_code': 429},
+        {'json': {'id': 115267}},
+    ])
+    delays = []
+    retry = RetryPolicy(max_attempts=3, backoff_factor=1, sleep=delays.append, jitter=lambda: 0.5)
+    client = build_client(mock_adapter, retry=retry)
+
+    assert client.build.get() == {'id': 115267}
+    assert delays == [2.5, 1.0]
+    assert retry.stats() == {'/v2/build': (2, 3.5)}
+
+
+def test_retry_gives_up(mock_adapter):
+    """Tests that the last failed response is raised once every attempt has been used
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/build', status_code=502)
+    delays = []
+    client = build_client(mock_adapter, retry=RetryPolicy(max_attempts=4, backoff_factor=1, max_backoff=3,
+                                                          sleep=delays.append, jitter=lambda: 1))
+
+    with pytest.raises(requests.HTTPError):
+        client.build.get()
+
+    assert mock_adapter.call_count == 4
+    assert delays == [1, 2, 3]
+
+
+def test_retry_only_idempotent_methods(mock_adapter):
+    """Tests that requests which may have had side effects are never sent twice
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('POST', GuildWars2Client.BASE_URL + '/v2/build', status_code=503)
+    client = build_client(mock_adapter, retry=RetryPolicy(sleep=lambda delay: None))
+
+    assert client.session.post(GuildWars2Client.BASE_URL + '/v2/build').status_code == 503
+    assert mock_adapter.call_count == 1
+
+
+class FlakyAioSession:
+    """Fake `aiohttp.ClientSession` answering with the given statuses before succeeding"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def get(self, url, **kwargs):
+        if self.statuses:
+            return FakeAioResponse(self.statuses.pop(0), '{"text": "too many requests"}')
+        return FakeAioResponse(200, json.dumps({'id': 115267}))
+
+
+def test_retry_async(monkeypatch):
+    """Tests that the asynchronous client retries without blocking the event loop
+
+    Args:
+        monkeypatch: The pytest "monkeypatch" fixture.
+    """
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+    retry = RetryPolicy(backoff_factor=1, sleep=None, jitter=lambda: 1)
+    client = AsyncGuildWars2Client(session=FlakyAioSession([429, 500]), retry=retry)
+
+    assert asyncio.run(client.build.get()) == {'id': 115267}
+    assert delays == [1, 2]
@@ -0,0 +1,111 @@
+"""
+Tests the coalescing of concurrent identical requests
+"""
+
+import asyncio
+import threading
+import time
+
+from gw2api import AsyncGuildWars2Client, GuildWars2Client, SingleFlight
+from test.conftest import FakeAioSession
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_coalesce_threads(mock_adapter):
+    """Tests that threads requesting the same URL concurrently share a single request and its payload
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    flights = SingleFlight()
+
+    def items(request, context):
+        # Hold the request until every other thread waits on it
+        wait_until(lambda: flights.shared == 4)
+        return '[{"id": 1}, {"id": 2}]'
+
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/items?ids=1,2', text=items)
+    client = GuildWars2Client(coalesce=flights)
+    client.session.mount('https://', mock_adapter)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.items.get(ids=[1, 2]))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert mock_adapter.call_count == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert len(flights) == 0
+
+    # Nothing is kept once the request completed
+    client.items.get(ids=[1, 2])
+    assert mock_adapter.call_count == 2
+
+
+def test_coalesce_keyed_by_api_key(mock_adapter):
+    """Tests that requests sent with different API keys are never shared
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    flights = SingleFlight()
+    barrier = threading.Barrier(2)
+
+    def account(request, context):
+        barrier.wait(timeout=5)  # Both requests are in flight at the same time
+        return '{"name": "%s"}' % request.headers['Authorization']
+
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/account', text=account)
+    clients = [GuildWars2Client(api_key=key, coalesce=flights) for key in ('first-key', 'second-key')]
+    for client in clients:
+        client.session.mount('https://', mock_adapter)
+
+    results = {}
+    threads = [threading.Thread(target=lambda c=client: results.update({c.api_key: c.account.get()}))
+               for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {'first-key': {'name': 'Bearer first-key'}, 'second-key': {'name': 'Bearer second-key'}}
+    assert flights.shared == 0
+
+
+class SlowAioSession(FakeAioSession):
+    """Fake `aiohttp.ClientSession` whose responses take a few event loop iterations to read"""
+
+    def get(self, url, **kwargs):
+        response = super().get(url, **kwargs)
+        read = response.read
+
+        async def slow_read():
+            for _ in range(3):
+                await asyncio.sleep(0)
+            return await read()
+
+        response.read = slow_read
+        return response
+
+
+def test_coalesce_async():
+    """Tests that coroutines requesting the same URL concurrently await a single request"""
+    session = SlowAioSession({"continents/2": "continents2", "continents/2/floors": "continents2floors"})
+    client = AsyncGuildWars2Client(session=session, coalesce=True)
+
+    async def fetch():
+        return await asyncio.gather(*[client.continents.get(continents=2) for _ in range(5)],
+                                    client.continents.get(continents=2, floors='all'))
+
+    results = asyncio.run(fetch())
+    assert sorted(session.requested) == [GuildWars2Client.BASE_URL + '/v2/continents/2',
+                                         GuildWars2Client.BASE_URL + '/v2/continents/2/floors']
+    assert all(result is results[0] for result in results[:5])
+    assert client.flights.shared == 4
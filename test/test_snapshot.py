@@ -0,0 +1,62 @@
+"""
+Tests concurrent snapshots of an account
+"""
+
+import asyncio
+import json
+import re
+from urllib.parse import urlparse
+
+from gw2api import AsyncGuildWars2Client, GuildWars2Client
+from test.conftest import FakeAioResponse
+
+TOKENINFO = {'id': 'key-id', 'name': 'snapshots', 'permissions': ['account', 'inventories', 'wallet']}
+
+
+def test_account_snapshot(gw2_client, mock_adapter):
+    """Tests that the endpoints the key has permissions for are all read, and the others skipped
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/tokeninfo', json=TOKENINFO)
+    mock_adapter.register_uri('GET', re.compile(re.escape(GuildWars2Client.BASE_URL + '/v2/account')),
+                              json=lambda request, context: {'route': urlparse(request.url).path})
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/account/bank', status_code=503)
+
+    snapshot = gw2_client.account_snapshot()
+
+    assert sorted(snapshot.data) == ['account', 'account/inventory', 'account/materials', 'account/wallet']
+    assert snapshot['account/wallet'] == {'route': '/v2/account/wallet'}
+    assert list(snapshot.errors) == ['account/bank']
+    assert sorted(snapshot.timings) == sorted([*snapshot.data, 'account/bank'])
+    assert 'account/dyes' in snapshot.skipped and 'account/wallet' not in snapshot.skipped
+    assert snapshot.permissions == TOKENINFO['permissions']
+    # Only the endpoints that were not skipped have been requested
+    assert mock_adapter.call_count == 1 + 5
+
+
+class AccountAioSession:
+    """Fake `aiohttp.ClientSession` answering `tokeninfo` and `account/*` requests"""
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        path = urlparse(url).path
+        if path == '/v2/tokeninfo':
+            return FakeAioResponse(200, json.dumps(dict(TOKENINFO, permissions=['account'])))
+        return FakeAioResponse(200, json.dumps({'route': path}))
+
+
+def test_account_snapshot_async():
+    """Tests that the asynchronous client reads the endpoints concurrently as well"""
+    session = AccountAioSession()
+    client = AsyncGuildWars2Client(api_key='empty-api-key', session=session)
+
+    snapshot = asyncio.run(client.account_snapshot())
+
+    assert snapshot.data == {'account': {'route': '/v2/account'}}
+    assert len(session.requested) == 2
@@ -0,0 +1,83 @@
+"""
+Tests the spatial index of continent floors
+"""
+
+import math
+import random
+
+import pytest
+
+from gw2api import SpatialIndex
+from test.conftest import load_mock_json
+
+numpy = pytest.importorskip('numpy')
+
+
+def make_floor(floor_id, waypoints, vistas=(), tasks=(), sectors=(), rect=((0, 0), (4000, 4000))):
+    """Builds a floor record holding a single map
+
+    Args:
+        floor_id: The id of the floor.
+        waypoints: Mapping of waypoint id to its coordinates.
+        vistas: Mapping of vista id to its coordinates.
+        tasks: Mapping of task id to its coordinates.
+        sectors: Mapping of sector id to its bounds.
+        rect: The continent rectangle of the map.
+    """
+    points = {**{_id: {'id': _id, 'type': 'waypoint', 'coord': list(coord)} for _id, coord in dict(waypoints).items()},
+              **{_id: {'id': _id, 'type': 'vista', 'coord': list(coord)} for _id, coord in dict(vistas).items()}}
+    map_ = {'id': 15, 'continent_rect': [list(corner) for corner in rect],
+            'points_of_interest': {str(_id): poi for _id, poi in points.items()},
+            'tasks': {str(_id): {'id': _id, 'coord': list(coord)} for _id, coord in dict(tasks).items()},
+            'sectors': {str(_id): {'id': _id, 'bounds': [list(vertex) for vertex in bounds]}
+                        for _id, bounds in dict(sectors).items()}}
+    return {'id': floor_id, 'regions': {'4': {'id': 4, 'maps': {'15': map_}}}}
+
+
+def test_spatial_index_queries(tmp_path):
+    """Tests nearest, radius, sector and map queries, before and after a round trip to disk
+
+    Args:
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    floors = [
+        make_floor(1, waypoints={1: (100, 100), 2: (3000, 3000)}, vistas={3: (500, 500)}, tasks={4: (2000, 2000)},
+                   sectors={10: [(0, 0), (2000, 0), (2000, 2000), (0, 2000)],
+                            11: [(2000, 0), (4000, 0), (3000, 2000)]}),
+        make_floor(2, waypoints={5: (3900, 100)}),
+    ]
+    built = SpatialIndex.build(floors, cell_size=256)
+    built.save(str(tmp_path / 'index.npz'))
+
+    for index in (built, SpatialIndex.load(str(tmp_path / 'index.npz'))):
+        assert len(index) == 5
+        assert index.nearest(3000, 2500, floor=1) == (2, 500.0)
+        assert index.nearest(2900, 2500, floor=2)[0] == 5
+        assert index.nearest(2900, 2500, floor=1, max_distance=100) is None
+        assert index.nearest(0, 0, floor=3) is None
+
+        assert index.within(400, 400, 500, floor=1) == [('vista', 3, pytest.approx(141.42, abs=0.01)),
+                                                         ('waypoint', 1, pytest.approx(424.26, abs=0.01))]
+        assert index.within(2000, 2100, 100, floor=1, kind='task') == [('task', 4, 100.0)]
+
+        assert index.sector_at(1000, 1000, floor=1) == 10
+        assert index.sector_at(3000, 1000, floor=1) == 11
+        assert index.sector_at(2100, 1900, floor=1) is None  # Outside of the triangle
+        assert index.map_at(3999, 3999, floor=2) == 15 and index.map_at(4001, 10, floor=2) is None
+
+
+def test_spatial_index_matches_brute_force():
+    """Tests nearest neighbours against a scan of every point, and sectors of a floor of the API"""
+    rng = random.Random(42)
+    waypoints = {_id: (rng.uniform(0, 40000), rng.uniform(0, 30000)) for _id in range(1, 2001)}
+    index = SpatialIndex.build([make_floor(1, waypoints, rect=((0, 0), (40000, 30000)))], cell_size=1024)
+
+    for _ in range(200):
+        x, y = rng.uniform(-1000, 41000), rng.uniform(-1000, 31000)
+        expected = min(waypoints, key=lambda _id: math.hypot(waypoints[_id][0] - x, waypoints[_id][1] - y))
+        assert index.nearest(x, y, floor=1)[0] == expected
+
+    floor = load_mock_json('continents2floors15')
+    index = SpatialIndex.build([floor])
+    assert index.sector_at(12103.9, 5209.01, floor=15) == 1478
+    assert index.map_at(12103.9, 5209.01, floor=15) == 1205
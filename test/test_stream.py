@@ -0,0 +1,77 @@
+"""
+Tests incremental decoding of large responses
+"""
+
+import json
+
+import pytest
+
+from gw2api import GuildWars2Client
+from gw2api.stream import JSONStreamParser, iter_json
+from test.conftest import load_mock_json, load_mock_text
+
+
+def test_parser_any_chunking():
+    """Tests that elements are decoded identically however the document is split"""
+    document = json.dumps([{'id': 1, 'name': 'Ünïcödé "quoted"'}, 12345, -1.5e3, True, None, [1, [2]], 'x'],
+                          ensure_ascii=False).encode('utf-8')
+    expected = json.loads(document)
+
+    for size in (1, 2, 3, 7, len(document)):
+        chunks = [document[i:i + size] for i in range(0, len(document), size)]
+        assert list(iter_json(chunks)) == expected
+
+
+def test_parser_yields_elements_early():
+    """Tests that complete elements are returned before the document ends, and objects yield members"""
+    parser = JSONStreamParser()
+    assert parser.feed(b'[{"id": 1}, {"id"') == [{'id': 1}]
+    assert parser.feed(b': 2}, 3') == [{'id': 2}]
+    assert parser.feed(b'4]') == [34]
+    assert parser.close() == []
+
+    assert list(iter_json([b'{"a": 1, "b"', b': [2]}'])) == [('a', 1), ('b', [2])]
+
+
+def test_parser_large_element():
+    """Tests that an element spread over many chunks is assembled without buffering all of it"""
+    floor = {'id': 1, 'regions': {str(region_id): {'id': region_id, 'maps': {str(map_id): {
+        'id': map_id, 'name': 'Map "{}" \\ {}'.format(map_id, region_id),
+        'points_of_interest': {str(poi_id): {'id': poi_id, 'coord': [poi_id * 1.5, -poi_id], 'type': 'landmark'}
+                               for poi_id in range(50)}} for map_id in range(20)}} for region_id in range(5)}}
+    document = json.dumps({'floor': floor, 'tail': [1, 2.5e3]}).encode('utf-8')
+
+    parser, buffered, members = JSONStreamParser(), 0, []
+    for i in range(0, len(document), 100):
+        members.extend(parser.feed(document[i:i + 100]))
+        buffered = max(buffered, len(parser._buffer))
+    members.extend(parser.close())
+
+    assert members == [('floor', floor), ('tail', [1, 2.5e3])]
+    assert len(document) > 300000 and buffered < 200
+
+
+@pytest.mark.parametrize('document', [b'[1, 2', b'[1 2]', b'[1] [', b'42', b'[1,]'])
+def test_parser_rejects_invalid_documents(document):
+    """Tests that truncated or malformed documents raise a `ValueError`
+
+    Args:
+        document: The JSON document to parse.
+    """
+    with pytest.raises(ValueError):
+        list(iter_json([document]))
+
+
+def test_iter_stream(gw2_client, mock_adapter):
+    """Tests that a response is streamed to the same records as the decoded response
+
+    Args:
+        gw2_client: The pytest "gw2_client" fixture.
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    mock_adapter.register_uri('GET', GuildWars2Client.BASE_URL + '/v2/continents/2/floors?ids=all',
+                              text=load_mock_text('continents2floors1_6'))
+
+    floors = gw2_client.continents.iter_stream(url=GuildWars2Client.BASE_URL + '/v2/continents/2/floors',
+                                               ids='all', chunk_size=512)
+    assert list(floors) == load_mock_json('continents2floors1_6')
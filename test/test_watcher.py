@@ -0,0 +1,61 @@
+"""
+Tests the game build watcher
+"""
+
+import threading
+
+from gw2api import BuildWatcher, GuildWars2Client, PersistentCache, ResponseCache
+from test.conftest import register_urls_to_files
+
+
+BUILD_URL = GuildWars2Client.BASE_URL + '/v2/build'
+
+
+def test_build_change_invalidates_caches(mock_adapter, tmp_path):
+    """Tests that a new build drops static data from both caches and fires the callbacks
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+        tmp_path: The pytest "tmp_path" fixture.
+    """
+    register_urls_to_files(mock_adapter, {"continents/2": "continents2"})
+    mock_adapter.register_uri('GET', BUILD_URL, [{'json': {'id': 1}}, {'json': {'id': 1}}, {'json': {'id': 2}}])
+
+    cache, disk_cache = ResponseCache(), PersistentCache(str(tmp_path / 'cache.sqlite3'))
+    client = GuildWars2Client(cache=cache, disk_cache=disk_cache)
+    client.session.mount('https://', mock_adapter)
+
+    changes = []
+    watcher = BuildWatcher(client, callbacks=[lambda old, new: changes.append((old, new))])
+
+    assert not watcher.check()
+    assert disk_cache.build_id == 1
+
+    client.continents.get(continents=2)
+    assert not watcher.check()
+    client.continents.get(continents=2)
+    assert mock_adapter.call_count == 3  # 2 builds, continents once
+
+    assert watcher.check()
+    assert changes == [(1, 2)]
+    assert disk_cache.build_id == 2
+
+    client.continents.get(continents=2)
+    assert mock_adapter.call_count == 5
+
+
+def test_watcher_thread(mock_adapter):
+    """Tests that the watcher keeps polling in the background, surviving failed polls
+
+    Args:
+        mock_adapter: The pytest "mock_adapter" fixture.
+    """
+    changed = threading.Event()
+    mock_adapter.register_uri('GET', BUILD_URL, [{'json': {'id': 1}}, {'status_code': 503}, {'json': {'id': 2}}])
+    client = GuildWars2Client()
+    client.session.mount('https://', mock_adapter)
+
+    with BuildWatcher(client, interval=0.01, callbacks=[lambda old, new: changed.set()]) as watcher:
+        assert changed.wait(5)
+
+    assert watcher.build_id == 2